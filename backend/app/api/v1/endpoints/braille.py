@@ -1,5 +1,8 @@
+import asyncio
 import logging
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+import time
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
@@ -7,14 +10,19 @@ from app.db.session import get_db
 from app.db.models.user import User
 from app.db.models.document import Document
 from app.db.models.conversion_job import ConversionJob
+from app.core.config import settings
 from app.api.deps import get_current_user
 from app.schemas.braille import (
+    BrailleBulkTranslateItem,
+    BrailleBulkTranslateRequest,
+    BrailleBulkTranslateResponse,
     BrailleConvertRequest,
     BrailleConvertResponse,
     BrailleTranslateRequest,
     BrailleTranslateResponse,
 )
 from app.services.braille_service import BrailleService
+from app.utils.validators import validate_braille_grade
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -28,6 +36,9 @@ async def convert_braille_image(
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
+    valid, error = validate_braille_grade(payload.grade)
+    if not valid:
+        raise HTTPException(status_code=400, detail=error)
     result = await db.execute(
         select(Document).where(
             Document.id == payload.document_id,
@@ -43,6 +54,7 @@ async def convert_braille_image(
         document_id=document.id,
         status="pending",
         job_type="braille_conversion",
+        braille_grade=payload.grade,
     )
     db.add(job)
     await db.commit()
@@ -68,8 +80,11 @@ async def translate_braille_unicode(
     payload: BrailleTranslateRequest,
     current_user: User = Depends(get_current_user),
 ):
+    valid, error = validate_braille_grade(payload.grade)
+    if not valid:
+        raise HTTPException(status_code=400, detail=error)
     try:
-        result = braille_service.translate_braille_to_text(payload.braille_text)
+        result = braille_service.translate_braille_to_text(payload.braille_text, grade=payload.grade)
         return BrailleTranslateResponse(
             original=payload.braille_text,
             translated=result["text"],
@@ -81,6 +96,46 @@ async def translate_braille_unicode(
         raise HTTPException(status_code=500, detail="Translation failed")
 
 
+@router.post("/translate/bulk", response_model=BrailleBulkTranslateResponse)
+async def translate_braille_bulk(
+    payload: BrailleBulkTranslateRequest,
+    current_user: User = Depends(get_current_user),
+):
+    valid, error = validate_braille_grade(payload.grade)
+    if not valid:
+        raise HTTPException(status_code=400, detail=error)
+    if len(payload.items) > settings.BRAILLE_BULK_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {settings.BRAILLE_BULK_MAX_ITEMS} items per request; use /translate/stream for books",
+        )
+    t0 = time.perf_counter()
+    # Whole books can take a while; keep the event loop free
+    results = await asyncio.to_thread(braille_service.translate_many, payload.items, payload.grade)
+    return BrailleBulkTranslateResponse(
+        grade=payload.grade,
+        count=len(results),
+        results=[BrailleBulkTranslateItem(translated=r["text"], confidence=r["confidence"]) for r in results],
+        processing_time_ms=round((time.perf_counter() - t0) * 1000, 2),
+    )
+
+
+@router.post("/translate/stream")
+async def translate_braille_stream(
+    request: Request,
+    grade: int = 1,
+    current_user: User = Depends(get_current_user),
+):
+    """Translate a raw UTF-8 body of Unicode Braille of any size; the text streams back as it is read."""
+    valid, error = validate_braille_grade(grade)
+    if not valid:
+        raise HTTPException(status_code=400, detail=error)
+    return StreamingResponse(
+        braille_service.translate_stream(request.stream(), grade=grade),
+        media_type="text/plain; charset=utf-8",
+    )
+
+
 @router.get("/grades")
 async def get_supported_grades():
     return {
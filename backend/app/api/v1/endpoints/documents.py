@@ -1,5 +1,4 @@
 import logging
-import os
 from typing import List
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -10,9 +9,11 @@ from app.db.models.user import User
 from app.db.models.document import Document
 from app.api.deps import get_current_user
 from app.schemas.document import DocumentResponse, DocumentListResponse
+from app.services.document_service import DocumentService
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
+document_service = DocumentService()
 
 
 @router.get("/", response_model=DocumentListResponse)
@@ -83,17 +84,7 @@ async def delete_document(
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    result = await db.execute(
-        select(Document).where(
-            Document.id == document_id,
-            Document.user_id == current_user.id,
-        )
-    )
-    doc = result.scalar_one_or_none()
-    if not doc:
+    # Uploads are deduplicated; the service keeps the file while other documents use it
+    if not await document_service.delete(db, document_id, current_user.id):
         raise HTTPException(status_code=404, detail="Document not found")
-    if os.path.exists(doc.file_path):
-        os.remove(doc.file_path)
-    await db.delete(doc)
-    await db.commit()
     return {"message": "Document deleted successfully"}
\ No newline at end of file
@@ -7,10 +7,12 @@ from app.db.session import get_db
 from app.db.models.user import User
 from app.db.models.conversion_job import ConversionJob
 from app.api.deps import get_current_user
-from app.schemas.job import JobResponse, JobListResponse
+from app.schemas.job import JobResponse, JobListResponse, JobPagesResponse, PageResultResponse
+from app.services.page_result_service import PageResultService, decode_cells
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
+page_result_service = PageResultService()
 
 
 @router.get("/", response_model=JobListResponse)
@@ -70,18 +72,58 @@ async def get_job(
     job = result.scalar_one_or_none()
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
+    # Unfinished jobs show the text of the pages completed so far
+    result_text = job.result_text
+    if result_text is None:
+        result_text = await page_result_service.assemble_text(db, job.id) or None
     return JobResponse(
         id=job.id,
         document_id=job.document_id,
         status=job.status,
         job_type=job.job_type,
-        result_text=job.result_text,
+        result_text=result_text,
         error_message=job.error_message,
         created_at=job.created_at,
         completed_at=job.completed_at,
     )
 
 
+@router.get("/{job_id}/pages", response_model=JobPagesResponse)
+async def get_job_pages(
+    job_id: int,
+    include_cells: bool = False,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    result = await db.execute(
+        select(ConversionJob).where(
+            ConversionJob.id == job_id,
+            ConversionJob.user_id == current_user.id,
+        )
+    )
+    job = result.scalar_one_or_none()
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    pages = await page_result_service.get_pages(db, job.id)
+    return JobPagesResponse(
+        job_id=job.id,
+        status=job.status,
+        progress=job.progress,
+        pages=[
+            PageResultResponse(
+                page_index=p.page_index,
+                text=p.text,
+                cell_count=p.cell_count,
+                confidence=p.confidence,
+                processing_time_ms=p.processing_time_ms,
+                cells=decode_cells(p.cell_geometry) if include_cells else None,
+                created_at=p.created_at,
+            )
+            for p in pages
+        ],
+    )
+
+
 @router.delete("/{job_id}")
 async def cancel_job(
     job_id: int,
@@ -1,5 +1,5 @@
-import os
 import uuid
+import asyncio
 import logging
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, status
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -9,9 +9,11 @@ from app.db.models.user import User
 from app.db.models.document import Document
 from app.api.deps import get_current_user
 from app.core.config import settings
+from app.services.storage_service import StorageService
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
+storage_service = StorageService()
 
 ALLOWED_MIME_TYPES = {
     "image/jpeg", "image/png", "image/bmp",
@@ -31,41 +33,47 @@ async def upload_image(
             detail=f"Unsupported file type: {file.content_type}",
         )
 
-    content = await file.read()
-    if len(content) > settings.MAX_FILE_SIZE:
+    # Reject on the declared size before reading anything; the stream is checked as it arrives
+    if file.size is not None and file.size > settings.MAX_FILE_SIZE:
         raise HTTPException(
             status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-            detail="File size exceeds maximum allowed size (10MB)",
+            detail=f"File size exceeds maximum allowed size ({settings.MAX_FILE_SIZE // (1024 * 1024)}MB)",
         )
+    stored = await storage_service.save_stream(file, file.filename or "upload.jpg")
 
     file_id = str(uuid.uuid4())
     ext = file.filename.rsplit(".", 1)[-1].lower() if "." in file.filename else "jpg"
+    # stored_filename names the document; file_path is the shared content-addressed file
     filename = f"{file_id}.{ext}"
-    file_path = os.path.join(settings.UPLOAD_DIR, filename)
-
-    os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
-    with open(file_path, "wb") as f:
-        f.write(content)
 
     document = Document(
         user_id=current_user.id,
         original_filename=file.filename,
         stored_filename=filename,
-        file_path=file_path,
-        file_size=len(content),
+        file_path=stored.file_path,
+        file_size=stored.size,
         mime_type=file.content_type,
+        content_sha256=stored.sha256,
         status="uploaded",
     )
     db.add(document)
-    await db.commit()
+    try:
+        await db.commit()
+    except BaseException:
+        await asyncio.to_thread(storage_service.discard, stored)
+        raise
+    # Only now is the shared file safe from deletion; see StorageService.release
+    await asyncio.to_thread(storage_service.release, stored)
     await db.refresh(document)
 
-    logger.info(f"File uploaded: {filename} by user {current_user.id}")
+    logger.info(f"File uploaded: {filename} by user {current_user.id} (deduplicated={stored.deduplicated})")
     return {
         "document_id": document.id,
         "filename": document.original_filename,
         "file_id": file_id,
-        "size": len(content),
+        "size": stored.size,
+        "sha256": stored.sha256,
+        "deduplicated": stored.deduplicated,
         "status": "uploaded",
         "message": "File uploaded successfully",
     }
\ No newline at end of file
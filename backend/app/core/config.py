@@ -61,6 +61,7 @@ class Settings(BaseSettings):
     OUTPUT_DIR: str = "outputs"
     MAX_UPLOAD_SIZE_MB: int = 20
     MAX_FILE_SIZE: int = 10 * 1024 * 1024
+    UPLOAD_CHUNK_SIZE: int = 1024 * 1024
     ALLOWED_EXTENSIONS: List[str] = ["jpg", "jpeg", "png", "tiff", "tif", "bmp", "webp", "pdf"]
 
     # ML Model Paths
@@ -72,6 +73,14 @@ class Settings(BaseSettings):
     CLASSIFIER_QUANTIZED_PATH: str = "./app/ml/artifacts/classifier_quantized.pt"
     DETECTOR_ONNX_PATH: str = "./app/ml/artifacts/detector.onnx"
     CLASSIFIER_ONNX_PATH: str = "./app/ml/artifacts/classifier.onnx"
+    CLASSIFIER_ONNX_INT8_PATH: str = "./app/ml/artifacts/classifier_int8.onnx"
+    CLASSIFIER_TORCHSCRIPT_PATH: str = "./app/ml/artifacts/classifier_torchscript.pt"
+    DOT_DETECTOR_MODEL_PATH: str = "./app/ml/artifacts/dot_detector_best.pt"
+    DOT_DETECTOR_QUANTIZED_PATH: str = "./app/ml/artifacts/dot_detector_quantized.pt"
+    DOT_DETECTOR_TORCHSCRIPT_PATH: str = "./app/ml/artifacts/dot_detector_torchscript.pt"
+    CELL_CLASSIFIER_MODEL_PATH: str = "./app/ml/artifacts/cell_classifier_best.pt"
+    CELL_CLASSIFIER_TORCHSCRIPT_PATH: str = "./app/ml/artifacts/cell_classifier_torchscript.pt"
+    QUANTIZATION_REPORT_PATH: str = "./app/ml/artifacts/quantization_report.json"
     DOT_DETECTOR_WEIGHTS: str = "./app/ml/artifacts/detector_best.pt"
     CELL_CLASSIFIER_WEIGHTS: str = "./app/ml/artifacts/classifier_best.pt"
 
@@ -81,12 +90,88 @@ class Settings(BaseSettings):
     CONFIDENCE_THRESHOLD: float = 0.5
     IMAGE_SIZE: int = 512
     CELL_SIZE: int = 32
+    # Input channels for newly trained cell models; inference reads it from each checkpoint
+    CELL_INPUT_CHANNELS: int = 1
     DOT_GRID_ROWS: int = 3
     DOT_GRID_COLS: int = 2
     DOT_DETECTION_MIN_RADIUS: int = 2
     DOT_DETECTION_MAX_RADIUS: int = 15
+    # Rescale pages so Braille dots are ~TARGET_DOT_PITCH_PX apart (~CELL_SIZE / 3, as in training cells)
+    RESOLUTION_NORMALIZATION: bool = True
+    TARGET_DOT_PITCH_PX: float = 10.0
+    DOT_PITCH_THUMBNAIL_SIZE: int = 1024
+    MAX_RESOLUTION_UPSCALE: float = 2.0
+    # JPEGs longer than this decode at 1/2, 1/4 or 1/8 scale (DCT scaling), never below it.
+    # An A4 page at TARGET_DOT_PITCH_PX is ~1200 px tall, so this keeps 2x headroom.
+    INGEST_MAX_SIDE: int = 2400
+    # PDF pages are rasterised at this DPI (dot pitch ~20 px, normalised down from there).
+    PDF_RENDER_DPI: int = 200
+    # Worker processes for multi-page documents in the API and job runner (0 = one
+    # per CPU core). 1 recognises pages in-process with the service's loaded
+    # models; the batch CLI uses every core by default.
+    DOCUMENT_WORKERS: int = 1
+    # Keep per-page cell boxes/patterns (zlib-compressed) alongside page text
+    STORE_CELL_GEOMETRY: bool = True
+    # Conversion jobs heartbeat while running; the reaper resubmits jobs whose
+    # heartbeat is older than JOB_STALE_SECONDS, up to JOB_MAX_ATTEMPTS runs
+    JOB_HEARTBEAT_SECONDS: int = 15
+    JOB_STALE_SECONDS: int = 120
+    JOB_REAPER_INTERVAL_SECONDS: int = 60
+    JOB_MAX_ATTEMPTS: int = 3
+    # Strings per /braille/translate/bulk request (larger inputs go to /translate/stream)
+    BRAILLE_BULK_MAX_ITEMS: int = 10000
+    # Memoised SymSpell lookups per NLPPostProcessor (distinct words; 0 disables)
+    NLP_CORRECTION_CACHE_SIZE: int = 50000
+    # correct_batch resolves large batches' distinct words on this many processes (0 = one per CPU core)
+    NLP_BATCH_WORKERS: int = 1
+    # Text decoding: argmax (argmax pattern per cell, then SymSpell) | beam (beam search
+    # over each cell's top-k patterns scored with a character n-gram model)
+    TEXT_DECODER: str = "beam"
+    BEAM_WIDTH: int = 4
+    BEAM_TOP_K: int = 3
+    BEAM_LM_WEIGHT: float = 1.0
+    CHAR_LM_PATH: str = "./app/ml/artifacts/char_lm.npy"
+    # Precomputed SymSpell deletes index, memory-mapped and shared by every worker
+    SYMSPELL_INDEX_DIR: str = "./app/ml/artifacts/symspell_index"
+    # Page quad search runs on a thumbnail; skip the warp if corners are within tolerance * diagonal
+    PERSPECTIVE_MAX_SIDE: int = 512
+    PERSPECTIVE_TOLERANCE: float = 0.005
+    # Optional curvature unwarp; skipped when its predicted cost exceeds the budget
+    UNWARP_ENABLED: bool = False
+    UNWARP_BUDGET_MS: float = 50.0
+    UNWARP_MAP_STEP: int = 1
+    # Preprocessing: "auto" estimates the noise level and skips or picks a filter
+    DENOISE_METHOD: str = "auto"
+    DENOISE_SKIP_SIGMA: float = 2.0
+    DENOISE_LIGHT_SIGMA: float = 5.0
+    DENOISE_HEAVY_SIGMA: float = 15.0
+    # Pipeline binarisation: adaptive | otsu | sauvola (fast path for unevenly lit photos)
+    BINARIZE_METHOD: str = "adaptive"
+    # Sauvola works in horizontal strips of this many rows to bound memory (0 = whole page)
+    SAUVOLA_TILE_ROWS: int = 1024
+    # Tile-parallel preprocessing: neighbourhood filters run on overlapping tiles
+    # across a thread pool (0 workers = one per CPU core, 1 = whole page in place)
+    PREPROCESS_TILE_SIZE: int = 512
+    PREPROCESS_WORKERS: int = 0
     NUM_BRAILLE_CLASSES: int = 64
     DEVICE: str = "cpu"
+    QUANTIZATION_CALIBRATION_SAMPLES: int = 512
+
+    # Classifier architecture: auto (follow SERVING_MANIFEST_PATH) | resnet18 | mobilenet_v3_small | tiny
+    CLASSIFIER_ARCH: str = "auto"
+    SERVING_MANIFEST_PATH: str = "./app/ml/artifacts/serving_model.json"
+    DISTILLATION_MAX_ACCURACY_DROP: float = 0.01
+
+    # Classifier serving backend: pytorch | pytorch-int8 | onnx | onnx-int8 | torchscript
+    CLASSIFIER_BACKEND: str = "pytorch"
+    CLASSIFIER_MIN_AGREEMENT: float = 0.9
+    DOT_DETECTOR_BACKEND: str = "pytorch"
+    CELL_CLASSIFIER_BACKEND: str = "pytorch"
+
+    # torch.compile for the eager PyTorch backends (first call pays compile time)
+    TORCH_COMPILE: bool = False
+    TORCH_COMPILE_MODE: str = "default"
+    TORCH_COMPILE_CACHE_DIR: str = "./app/ml/artifacts/torch_compile_cache"
 
     # Tesseract
     TESSERACT_PATH: str = "/usr/bin/tesseract"
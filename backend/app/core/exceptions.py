@@ -42,6 +42,11 @@ class FileProcessingError(BrailleBaseException):
         super().__init__(422, detail, "FILE_ERROR")
 
 
+class FileTooLargeError(BrailleBaseException):
+    def __init__(self, detail: str = "File size exceeds maximum allowed size"):
+        super().__init__(413, detail, "FILE_TOO_LARGE")
+
+
 class StorageError(BrailleBaseException):
     def __init__(self, detail: str = "Storage operation failed"):
         super().__init__(500, detail, "STORAGE_ERROR")
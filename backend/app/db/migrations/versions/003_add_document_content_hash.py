@@ -0,0 +1,23 @@
+"""003 add document content hash
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-19 10:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "003"
+down_revision = "002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("documents", sa.Column("content_sha256", sa.String(64), nullable=True))
+    op.create_index("ix_documents_content_sha256", "documents", ["content_sha256"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_documents_content_sha256", table_name="documents")
+    op.drop_column("documents", "content_sha256")
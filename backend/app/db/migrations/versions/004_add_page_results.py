@@ -0,0 +1,34 @@
+"""004 add page results
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-19 11:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "004"
+down_revision = "003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "page_results",
+        sa.Column("id", sa.Integer, primary_key=True, index=True),
+        sa.Column("job_id", sa.Integer, sa.ForeignKey("conversion_jobs.id", ondelete="CASCADE"), nullable=False, index=True),
+        sa.Column("document_id", sa.Integer, sa.ForeignKey("documents.id", ondelete="CASCADE"), nullable=False, index=True),
+        sa.Column("page_index", sa.Integer, nullable=False),
+        sa.Column("text", sa.Text, nullable=True),
+        sa.Column("cell_count", sa.Integer, default=0, nullable=False),
+        sa.Column("confidence", sa.Float, default=0.0, nullable=False),
+        sa.Column("processing_time_ms", sa.Float, default=0.0, nullable=False),
+        sa.Column("cell_geometry", sa.LargeBinary, nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.UniqueConstraint("job_id", "page_index", name="uq_page_results_job_page"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("page_results")
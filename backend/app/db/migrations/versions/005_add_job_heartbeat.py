@@ -0,0 +1,23 @@
+"""005 add job heartbeat
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-19 12:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "005"
+down_revision = "004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("conversion_jobs", sa.Column("heartbeat_at", sa.DateTime(timezone=True), nullable=True))
+    op.add_column("conversion_jobs", sa.Column("attempts", sa.Integer, nullable=False, server_default="0"))
+
+
+def downgrade() -> None:
+    op.drop_column("conversion_jobs", "attempts")
+    op.drop_column("conversion_jobs", "heartbeat_at")
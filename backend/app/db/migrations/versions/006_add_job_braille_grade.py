@@ -0,0 +1,21 @@
+"""006 add job braille grade
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-19 14:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "006"
+down_revision = "005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("conversion_jobs", sa.Column("braille_grade", sa.Integer, nullable=False, server_default="1"))
+
+
+def downgrade() -> None:
+    op.drop_column("conversion_jobs", "braille_grade")
@@ -3,5 +3,6 @@ from app.db.models.document import Document
 from app.db.models.conversion_job import ConversionJob
 from app.db.models.inference_result import InferenceResult
 from app.db.models.audit_log import AuditLog
+from app.db.models.page_result import PageResult
 
-__all__ = ["User", "Document", "ConversionJob", "InferenceResult", "AuditLog"]
\ No newline at end of file
+__all__ = ["User", "Document", "ConversionJob", "InferenceResult", "AuditLog", "PageResult"]
\ No newline at end of file
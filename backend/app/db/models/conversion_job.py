@@ -22,6 +22,10 @@ class ConversionJob(Base):
     result_text: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     error_message: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     progress: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    braille_grade: Mapped[int] = mapped_column(Integer, default=1, nullable=False)
+    # Refreshed while a worker runs the job; a stale heartbeat means the worker died
+    heartbeat_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    attempts: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), nullable=False
     )
@@ -30,4 +34,7 @@ class ConversionJob(Base):
     )
 
     user: Mapped["User"] = relationship("User", back_populates="conversion_jobs")
-    document: Mapped["Document"] = relationship("Document", back_populates="conversion_jobs")
\ No newline at end of file
+    document: Mapped["Document"] = relationship("Document", back_populates="conversion_jobs")
+    page_results: Mapped[list["PageResult"]] = relationship(
+        "PageResult", back_populates="job", cascade="all, delete-orphan", order_by="PageResult.page_index"
+    )
\ No newline at end of file
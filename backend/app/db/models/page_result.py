@@ -0,0 +1,34 @@
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import (
+    DateTime, Float, ForeignKey, Integer, LargeBinary, Text, UniqueConstraint, func,
+)
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from app.db.base import Base
+
+
+class PageResult(Base):
+    """Recognition result for one page of a conversion job, written as the page completes."""
+
+    __tablename__ = "page_results"
+    __table_args__ = (UniqueConstraint("job_id", "page_index", name="uq_page_results_job_page"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    job_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("conversion_jobs.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    document_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("documents.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    page_index: Mapped[int] = mapped_column(Integer, nullable=False)
+    text: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    cell_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    confidence: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+    processing_time_ms: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+    # zlib-compressed cell boxes/patterns/confidences, see page_result_service.encode_cells
+    cell_geometry: Mapped[Optional[bytes]] = mapped_column(LargeBinary, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+    job: Mapped["ConversionJob"] = relationship("ConversionJob", back_populates="page_results")
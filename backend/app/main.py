@@ -10,8 +10,10 @@ from app.core.config import settings
 from app.core.logging import setup_logging
 from app.core.exceptions import BrailleBaseException
 from app.api.v1.router import api_router
+from app.api.v1.endpoints.braille import braille_service
 from app.db.session import engine
 from app.db.base import Base
+from app.services.job_reaper import JobReaper
 
 setup_logging()
 logger = logging.getLogger(__name__)
@@ -25,8 +27,12 @@ async def lifespan(app: FastAPI):
     logger.info("Database tables created/verified")
     logger.info(f"Environment: {settings.ENVIRONMENT}")
     logger.info(f"ML Artifacts Dir: {settings.MODEL_ARTIFACTS_DIR}")
+    # Resubmits conversion jobs left behind by crashed workers or a previous deploy
+    reaper = JobReaper(braille_service)
+    reaper.start()
     yield
     logger.info("Shutting down Braille Conversion Tool API")
+    await reaper.stop()
     await engine.dispose()
 
 
@@ -0,0 +1,185 @@
+"""
+Beam width vs accuracy and latency for text decoding.
+
+Pages of English text are encoded to Braille patterns and turned into
+classifier-like probability rows: each cell's true pattern keeps most of the
+mass, but with probability --error-rate a pattern one dot away wins the
+argmax, which is the classifier's typical confusion. Each page is then decoded
+by argmax + SymSpell (the default path) and by the beam decoder at several
+widths, and CER and per-page latency are reported.
+
+    python -m app.ml.evaluation.benchmark_decoder --pages 20 --widths 1 2 4 8 16
+
+--grade2 instead times the Grade 2 decoder on long contracted documents of
+growing size, to check that it stays linear in the number of cells.
+
+    python -m app.ml.evaluation.benchmark_decoder --grade2
+"""
+import json
+import time
+import logging
+import argparse
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.ml.evaluation.evaluate_pipeline import character_error_rate
+from app.ml.inference.beam_decoder import BeamDecoder
+from app.ml.inference.grade2 import Grade2Decoder, cells
+from app.ml.inference.postprocess import PATTERN_TO_CHAR, PostProcessor
+from app.ml.nlp.nlp_postprocess import NLPPostProcessor
+
+logger = logging.getLogger(__name__)
+
+REPORT_PATH = Path(settings.MODEL_ARTIFACTS_DIR) / "decoder_benchmark.json"
+GRADE2_REPORT_PATH = Path(settings.MODEL_ARTIFACTS_DIR) / "grade2_benchmark.json"
+CHAR_TO_PATTERN = {c: p for p, c in PATTERN_TO_CHAR.items() if c == " " or c.isalpha()}
+# "The child said that he would rather go out with them, and the people were
+# quite happy. Someone's kindness became their station." in contracted Braille
+GRADE2_PASSAGE = cells(
+    "6-2346-0-16-0-234-145-0-2345-0-125-15-0-2456-145-0-1235-0-1245-0-1256-0-23456-0-"
+    "2346-134-2-0-12346-0-2346-0-1234-0-2356-0-12345-0-125-1-1234-1234-13456-256-0-"
+    "6-5-234-5-135-3-234-0-13-35-145-56-234-0-23-14-1-134-15-0-456-1456-0-34-1-56-1345-256-0"
+)
+
+
+def _vocabulary(size: int = 5000) -> Tuple[List[str], np.ndarray]:
+    from app.ml.nlp.symspell_index import default_dictionary_path
+
+    words, counts = [], []
+    with open(default_dictionary_path(), encoding="utf-8") as f:
+        for line in f:
+            word, count = line.split()[:2]
+            if word.isalpha() and word.isascii():
+                words.append(word)
+                counts.append(float(count))
+            if len(words) == size:
+                break
+    counts = np.array(counts)
+    return words, counts / counts.sum()
+
+
+def synthetic_page(
+    rng: np.random.Generator, words: Sequence[str], weights: np.ndarray, n_words: int, error_rate: float
+) -> Tuple[str, List[Dict], np.ndarray]:
+    """(reference text, page cells, (N, 64) probabilities) for one line of n_words words."""
+    text = " ".join(rng.choice(words, size=n_words, p=weights))
+    patterns = [CHAR_TO_PATTERN[c] for c in text]
+    probs = np.full((len(patterns), 64), 1e-4, dtype=np.float32)
+    for i, pattern in enumerate(patterns):
+        neighbours = [pattern ^ (1 << bit) for bit in range(6)]
+        rng.shuffle(neighbours)
+        top = rng.uniform(0.5, 0.95)
+        if rng.random() < error_rate:
+            # A one-dot confusion wins; the true pattern is the runner-up
+            probs[i, neighbours[0]] = top
+            probs[i, pattern] = (1 - top) * 0.7
+        else:
+            probs[i, pattern] = top
+            probs[i, neighbours[0]] = (1 - top) * 0.7
+        probs[i, neighbours[1]] += (1 - top) * 0.2
+        probs[i] /= probs[i].sum()
+    page_cells = [{"box": [i * 20.0, 0.0, i * 20.0 + 15.0, 25.0], "pattern": int(np.argmax(p))} for i, p in enumerate(probs)]
+    return text, page_cells, probs
+
+
+def _evaluate(name: str, decode, pages) -> Dict:
+    cers, latencies = [], []
+    for text, page_cells, probs in pages:
+        t0 = time.perf_counter()
+        hypothesis = decode(page_cells, probs)
+        latencies.append((time.perf_counter() - t0) * 1000)
+        cers.append(character_error_rate(text, hypothesis.lower()))
+    result = {
+        "decoder": name,
+        "cer": round(float(np.mean(cers)), 4),
+        "mean_ms_per_page": round(float(np.mean(latencies)), 2),
+        "p95_ms_per_page": round(float(np.percentile(latencies, 95)), 2),
+    }
+    logger.info(f"{name:>14}: CER {result['cer']:.4f}  {result['mean_ms_per_page']:.1f} ms/page")
+    return result
+
+
+def run_benchmark(
+    pages: int = 20,
+    words_per_page: int = 150,
+    error_rate: float = 0.08,
+    widths: Sequence[int] = (1, 2, 4, 8, 16),
+    top_k: int = None,
+    seed: int = 0,
+) -> Dict:
+    rng = np.random.default_rng(seed)
+    words, weights = _vocabulary()
+    data = [synthetic_page(rng, words, weights, words_per_page, error_rate) for _ in range(pages)]
+    postprocessor = PostProcessor()
+    nlp = NLPPostProcessor()
+
+    results = [_evaluate("argmax", lambda page_cells, _: postprocessor.decode(page_cells), data)]
+    if nlp.symspell is not None:
+        # Fresh cache so repeated words across pages do not flatter the baseline
+        nlp._lookup_cached.cache_clear()
+        results.append(_evaluate(
+            "argmax+symspell", lambda page_cells, _: nlp.correct(postprocessor.decode(page_cells))[0], data
+        ))
+    for width in widths:
+        decoder = BeamDecoder(beam_width=width, top_k=top_k, postprocessor=postprocessor)
+        results.append(_evaluate(
+            f"beam w={width}", lambda page_cells, probs: nlp.clean(decoder.decode(page_cells, probs)[0]), data
+        ))
+
+    report = {
+        "config": {
+            "pages": pages,
+            "cells_per_page": int(np.mean([len(c) for _, c, _ in data])),
+            "error_rate": error_rate,
+            "top_k": top_k or settings.BEAM_TOP_K,
+            "lm_weight": settings.BEAM_LM_WEIGHT,
+        },
+        "results": results,
+    }
+    return report
+
+
+def benchmark_grade2(sizes: Sequence[int] = (10_000, 100_000, 1_000_000), runs: int = 3) -> Dict:
+    """Grade 2 decode time for documents of about `size` cells each."""
+    decoder = Grade2Decoder()
+    results = []
+    for size in sizes:
+        document = list(GRADE2_PASSAGE) * max(1, size // len(GRADE2_PASSAGE))
+        latencies = []
+        for _ in range(runs):
+            t0 = time.perf_counter()
+            decoder.decode_patterns(document)
+            latencies.append((time.perf_counter() - t0) * 1000)
+        best = min(latencies)
+        results.append({
+            "cells": len(document),
+            "best_ms": round(best, 2),
+            "cells_per_s": round(len(document) / (best / 1000)),
+        })
+        logger.info(f"grade 2: {len(document):>9} cells  {best:8.1f} ms  {results[-1]['cells_per_s']:,} cells/s")
+    return {"grade2": results}
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    parser = argparse.ArgumentParser(description="Beam width vs CER/latency for Braille text decoding")
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--words-per-page", type=int, default=150)
+    parser.add_argument("--error-rate", type=float, default=0.08)
+    parser.add_argument("--widths", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--top-k", type=int, default=None)
+    parser.add_argument("--grade2", action="store_true", help="Benchmark Grade 2 decoding on long documents")
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+    if args.grade2:
+        report = benchmark_grade2()
+    else:
+        report = run_benchmark(args.pages, args.words_per_page, args.error_rate, args.widths, args.top_k)
+    args.output = args.output or str(GRADE2_REPORT_PATH if args.grade2 else REPORT_PATH)
+    Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    logger.info(f"Report saved to {args.output}")
@@ -6,7 +6,12 @@ import torch.nn as nn
 import onnx
 import onnxruntime as ort
 import numpy as np
-from app.ml.training.train_classifier import build_classifier
+from app.ml.inference.model_loader import (
+    build_classifier_arch,
+    infer_in_channels,
+    input_channels,
+    resolve_serving_classifier,
+)
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
@@ -18,18 +23,24 @@ def export_classifier_to_onnx(
     num_classes: int = 64,
     image_size: int = 32,
     opset: int = 17,
+    arch: str = None,
 ) -> str:
-    weights_path = weights_path or settings.CLASSIFIER_MODEL_PATH
-    output_path = output_path or settings.CLASSIFIER_ONNX_PATH
+    serving = resolve_serving_classifier()
+    arch = arch or serving["arch"]
+    weights_path = weights_path or serving["weights_path"]
+    output_path = output_path or serving["onnx_path"]
 
     device = torch.device("cpu")
-    model = build_classifier(num_classes=num_classes)
     if os.path.exists(weights_path):
-        model.load_state_dict(torch.load(weights_path, map_location=device))
-        logger.info(f"Loaded classifier from {weights_path}")
+        state = torch.load(weights_path, map_location=device)
+        model = build_classifier_arch(arch, num_classes=num_classes, in_channels=infer_in_channels(state))
+        model.load_state_dict(state)
+        logger.info(f"Loaded {arch} classifier from {weights_path}")
+    else:
+        model = build_classifier_arch(arch, num_classes=num_classes)
     model.eval().to(device)
 
-    dummy_input = torch.randn(1, 3, image_size, image_size)
+    dummy_input = torch.randn(1, input_channels(model), image_size, image_size)
     torch.onnx.export(
         model,
         dummy_input,
@@ -0,0 +1,122 @@
+"""
+Export frozen, inference-optimised TorchScript artefacts for the per-cell models.
+
+For 32x32 inputs the eager per-op Python dispatch dominates runtime, so tracing,
+freezing and optimize_for_inference give a large share of the achievable CPU
+speedup without changing numerics.
+"""
+import os
+import logging
+from typing import Callable
+
+import torch
+import torch.nn as nn
+import numpy as np
+
+from app.core.config import settings
+from app.ml.inference.cell_classifier_cnn import build_mobilenet_classifier
+from app.ml.inference.dot_detector_cnn import DotDetectorCNNModel
+from app.ml.inference.model_loader import (
+    TORCHSCRIPT_CHANNELS_FILE,
+    build_classifier_arch,
+    infer_in_channels,
+    input_channels,
+    resolve_serving_classifier,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def freeze_torchscript(model: nn.Module, example_input: torch.Tensor) -> torch.jit.ScriptModule:
+    """Trace and freeze an eval-mode module (folds BatchNorm and constants)."""
+    model = model.cpu().eval()
+    with torch.no_grad():
+        traced = torch.jit.trace(model, example_input)
+        return torch.jit.freeze(traced)
+
+
+def export_torchscript(
+    model: nn.Module,
+    output_path: str,
+    cell_size: int = None,
+    in_channels: int = 3,
+) -> str:
+    """
+    Save a frozen TorchScript artefact. optimize_for_inference rewrites the graph
+    into prepacked MKLDNN ops that cannot be serialised, so it is applied at
+    load time by model_loader.load_torchscript_module(optimize=True).
+    """
+    cell_size = cell_size or settings.CELL_SIZE
+    example = torch.randn(1, in_channels, cell_size, cell_size)
+    frozen = freeze_torchscript(model, example)
+
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    torch.jit.save(frozen, output_path, _extra_files={TORCHSCRIPT_CHANNELS_FILE: str(in_channels)})
+
+    # Verify parity with eager on a batch size different from the trace
+    check = torch.randn(4, in_channels, cell_size, cell_size)
+    loaded = torch.jit.optimize_for_inference(torch.jit.load(output_path, map_location="cpu"))
+    with torch.no_grad():
+        max_diff = float(np.abs(loaded(check).numpy() - model(check).numpy()).max())
+    logger.info(f"TorchScript export verified. Max output diff: {max_diff:.6f}")
+    logger.info(f"Saved TorchScript model to {output_path}")
+    return output_path
+
+
+def _load_weights(build: Callable[[int], nn.Module], weights_path: str, name: str) -> nn.Module:
+    """Build a model for the checkpoint's input channels and load its weights."""
+    if os.path.exists(weights_path):
+        state = torch.load(weights_path, map_location="cpu")
+        model = build(infer_in_channels(state))
+        model.load_state_dict(state)
+        logger.info(f"Loaded {name} from {weights_path}")
+    else:
+        model = build(3)
+        logger.warning(f"{name} weights not found at {weights_path}, exporting random weights.")
+    return model.eval()
+
+
+def export_classifier_torchscript(
+    weights_path: str = None,
+    output_path: str = None,
+    num_classes: int = 64,
+    arch: str = None,
+) -> str:
+    serving = resolve_serving_classifier()
+    weights_path = weights_path or serving["weights_path"]
+    output_path = output_path or settings.CLASSIFIER_TORCHSCRIPT_PATH
+    arch = arch or serving["arch"]
+    model = _load_weights(
+        lambda c: build_classifier_arch(arch, num_classes, in_channels=c), weights_path, "classifier"
+    )
+    return export_torchscript(model, output_path, in_channels=input_channels(model))
+
+
+def export_dot_detector_torchscript(
+    weights_path: str = None,
+    output_path: str = None,
+) -> str:
+    weights_path = weights_path or settings.DOT_DETECTOR_MODEL_PATH
+    output_path = output_path or settings.DOT_DETECTOR_TORCHSCRIPT_PATH
+    model = _load_weights(lambda c: DotDetectorCNNModel(in_channels=c), weights_path, "dot detector")
+    return export_torchscript(model, output_path, cell_size=32, in_channels=input_channels(model))
+
+
+def export_cell_classifier_torchscript(
+    weights_path: str = None,
+    output_path: str = None,
+    num_classes: int = 64,
+) -> str:
+    weights_path = weights_path or settings.CELL_CLASSIFIER_MODEL_PATH
+    output_path = output_path or settings.CELL_CLASSIFIER_TORCHSCRIPT_PATH
+    model = _load_weights(
+        lambda c: build_mobilenet_classifier(num_classes, in_channels=c), weights_path, "cell classifier"
+    )
+    return export_torchscript(model, output_path, in_channels=input_channels(model))
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    export_classifier_torchscript()
+    export_dot_detector_torchscript()
+    export_cell_classifier_torchscript()
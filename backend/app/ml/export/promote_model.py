@@ -0,0 +1,133 @@
+"""
+Promote a distilled classifier to the default serving model.
+
+The student is compared against the teacher on held-out synthetic cells run
+through the serving preprocessing. It is promoted (written to the serving
+manifest that CLASSIFIER_ARCH="auto" follows) only if its accuracy is within
+DISTILLATION_MAX_ACCURACY_DROP of the teacher.
+"""
+import os
+import json
+import logging
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+import numpy as np
+import torch
+import torch.nn as nn
+
+from app.core.config import settings
+from app.ml.export.benchmark_latency import benchmark_callable
+from app.ml.inference.braille_classifier import preprocess_cells
+from app.ml.inference.model_loader import (
+    build_classifier_arch,
+    clear_model_cache,
+    infer_in_channels,
+    input_channels,
+)
+from app.ml.training.generate_synthetic_data import render_braille_cell
+
+logger = logging.getLogger(__name__)
+
+EVAL_BATCH_SIZE = 32
+
+
+def _load_classifier(arch: str, weights_path: str, num_classes: int) -> nn.Module:
+    if not os.path.exists(weights_path):
+        raise FileNotFoundError(f"{arch} weights not found: {weights_path}")
+    state = torch.load(weights_path, map_location="cpu")
+    model = build_classifier_arch(arch, num_classes=num_classes, in_channels=infer_in_channels(state))
+    model.load_state_dict(state)
+    return model.eval()
+
+
+def _synthetic_eval_set(num_samples: int, seed: int = 2):
+    rng = np.random.RandomState(seed)
+    patterns = np.arange(num_samples) % 64
+    cells = [
+        render_braille_cell(int(p), settings.CELL_SIZE, dot_radius=int(rng.randint(3, 6)), add_noise=True)
+        for p in patterns
+    ]
+    return cells, patterns
+
+
+@torch.no_grad()
+def measure_classifier(model: nn.Module, batch: np.ndarray, patterns: np.ndarray, name: str) -> Dict:
+    preds = []
+    for start in range(0, len(batch), EVAL_BATCH_SIZE):
+        logits = model(torch.from_numpy(batch[start:start + EVAL_BATCH_SIZE]))
+        preds.append(logits.argmax(dim=1).numpy())
+    accuracy = float((np.concatenate(preds) == patterns).mean())
+
+    sample = torch.from_numpy(batch[:EVAL_BATCH_SIZE])
+    latency = benchmark_callable(lambda: model(sample), name, "pytorch", runs=50)
+    return {
+        "accuracy": accuracy,
+        "latency_ms_per_batch": latency["mean_ms"],
+        "batch_size": len(sample),
+        "parameters": sum(p.numel() for p in model.parameters()),
+        "input_channels": int(batch.shape[1]),
+    }
+
+
+def promote_classifier(
+    arch: str,
+    weights_path: str,
+    onnx_path: Optional[str] = None,
+    teacher_arch: str = "resnet18",
+    teacher_path: str = None,
+    num_classes: int = 64,
+    max_accuracy_drop: float = None,
+    num_eval_samples: int = 1024,
+    manifest_path: str = None,
+) -> Dict:
+    """Gate a student on its accuracy delta to the teacher and update the serving manifest."""
+    teacher_path = teacher_path or settings.CLASSIFIER_MODEL_PATH
+    max_accuracy_drop = settings.DISTILLATION_MAX_ACCURACY_DROP if max_accuracy_drop is None else max_accuracy_drop
+    manifest_path = manifest_path or settings.SERVING_MANIFEST_PATH
+
+    # Each model sees the cells through its own preprocessing (RGB or grayscale)
+    cells, patterns = _synthetic_eval_set(num_eval_samples)
+    student_model = _load_classifier(arch, weights_path, num_classes)
+    teacher_model = _load_classifier(teacher_arch, teacher_path, num_classes)
+    student = measure_classifier(
+        student_model, preprocess_cells(cells, in_channels=input_channels(student_model)), patterns, arch
+    )
+    teacher = measure_classifier(
+        teacher_model, preprocess_cells(cells, in_channels=input_channels(teacher_model)), patterns, teacher_arch
+    )
+
+    delta = teacher["accuracy"] - student["accuracy"]
+    promoted = delta <= max_accuracy_drop
+    report = {
+        "arch": arch,
+        "weights_path": weights_path,
+        "onnx_path": onnx_path if onnx_path and os.path.exists(onnx_path) else None,
+        "num_classes": num_classes,
+        "student": student,
+        "teacher": {"arch": teacher_arch, **teacher},
+        "accuracy_delta": delta,
+        "max_accuracy_drop": max_accuracy_drop,
+        "promoted": promoted,
+        "evaluated_at": datetime.now(timezone.utc).isoformat(),
+    }
+
+    os.makedirs(os.path.dirname(manifest_path) or ".", exist_ok=True)
+    report_path = os.path.join(os.path.dirname(manifest_path) or ".", "promotion_report.json")
+    with open(report_path, "w") as f:
+        json.dump(report, f, indent=2)
+
+    if promoted:
+        with open(manifest_path, "w") as f:
+            json.dump(report, f, indent=2)
+        clear_model_cache()
+        logger.info(
+            f"Promoted {arch} to serving model (accuracy {student['accuracy']:.4f}, "
+            f"delta {delta:+.4f}, {student['latency_ms_per_batch']:.2f} ms/batch)"
+        )
+    else:
+        logger.warning(
+            f"{arch} not promoted: accuracy {student['accuracy']:.4f} is {delta:.4f} below "
+            f"the teacher (max allowed drop {max_accuracy_drop:.4f})"
+        )
+    return report
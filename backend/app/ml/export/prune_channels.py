@@ -0,0 +1,353 @@
+"""
+Iterative structured channel pruning for the cell classifiers.
+
+Each step removes the lowest-L1-norm output channels of every prunable
+convolution, physically slicing the following BatchNorm and consumer conv so
+the result is a genuinely smaller dense model, then fine-tunes on synthetic
+cells. Accuracy, FLOPs and latency are recorded per step so the model size
+for the CPU fleet can be chosen from the accuracy/cost curve.
+
+Prunable channels:
+  * ResNet BasicBlock: conv1 -> bn1 -> conv2 inner channels (residual width untouched)
+  * Sequential feature stacks (TinyCellClassifier, dot CNN): every conv except the last
+
+MobileNetV3's inverted residual blocks (depthwise convs, squeeze-excitation)
+are not supported, so run_pruning rejects that architecture.
+"""
+import os
+import copy
+import json
+import logging
+import argparse
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import torch
+import torch.nn as nn
+from torchvision.models.resnet import BasicBlock
+
+from app.core.config import settings
+from app.ml.export.benchmark_latency import benchmark_callable
+from app.ml.export.export_torchscript import export_torchscript
+from app.ml.export.quantize_static import generate_calibration_cells
+from app.ml.inference.braille_classifier import preprocess_cells
+from app.ml.inference.model_loader import build_classifier_arch, infer_in_channels, input_channels
+
+logger = logging.getLogger(__name__)
+
+MIN_CHANNELS = 4
+BENCHMARK_BATCH_SIZE = 32
+PRUNABLE_ARCHS = ("resnet18", "tiny")
+
+
+def default_weights_path(arch: str) -> str:
+    """Checkpoint the training scripts write for arch."""
+    if arch == "resnet18":
+        return settings.CLASSIFIER_MODEL_PATH
+    return os.path.join(settings.MODEL_ARTIFACTS_DIR, f"classifier_{arch}_best.pt")
+
+
+# ---------------------------------------------------------------------------
+# Channel surgery
+# ---------------------------------------------------------------------------
+
+def channel_importance(conv: nn.Conv2d) -> torch.Tensor:
+    """L1 norm of each output filter."""
+    return conv.weight.detach().abs().sum(dim=(1, 2, 3))
+
+
+def _channels_to_keep(conv: nn.Conv2d, ratio: float) -> torch.Tensor:
+    n_out = conv.out_channels
+    n_keep = max(MIN_CHANNELS, int(round(n_out * (1.0 - ratio))))
+    if n_keep >= n_out:
+        return torch.arange(n_out)
+    keep = torch.argsort(channel_importance(conv), descending=True)[:n_keep]
+    return torch.sort(keep).values
+
+
+def _slice_conv(conv: nn.Conv2d, out_idx: torch.Tensor = None, in_idx: torch.Tensor = None) -> nn.Conv2d:
+    weight = conv.weight.detach()
+    if out_idx is not None:
+        weight = weight[out_idx]
+    if in_idx is not None:
+        weight = weight[:, in_idx]
+    new = nn.Conv2d(
+        weight.shape[1], weight.shape[0], conv.kernel_size,
+        stride=conv.stride, padding=conv.padding, dilation=conv.dilation,
+        bias=conv.bias is not None,
+    )
+    new.weight.data.copy_(weight)
+    if conv.bias is not None:
+        bias = conv.bias.detach()
+        new.bias.data.copy_(bias[out_idx] if out_idx is not None else bias)
+    return new
+
+
+def _slice_bn(bn: nn.BatchNorm2d, idx: torch.Tensor) -> nn.BatchNorm2d:
+    new = nn.BatchNorm2d(len(idx), eps=bn.eps, momentum=bn.momentum)
+    new.weight.data.copy_(bn.weight.detach()[idx])
+    new.bias.data.copy_(bn.bias.detach()[idx])
+    new.running_mean.copy_(bn.running_mean[idx])
+    new.running_var.copy_(bn.running_var[idx])
+    return new
+
+
+def prune_basic_block(block: BasicBlock, ratio: float) -> int:
+    keep = _channels_to_keep(block.conv1, ratio)
+    removed = block.conv1.out_channels - len(keep)
+    if removed:
+        block.conv1 = _slice_conv(block.conv1, out_idx=keep)
+        block.bn1 = _slice_bn(block.bn1, keep)
+        block.conv2 = _slice_conv(block.conv2, in_idx=keep)
+    return removed
+
+
+def prune_sequential(seq: nn.Sequential, ratio: float) -> int:
+    """Prune conv -> [BatchNorm] -> ... -> conv chains inside a flat Sequential."""
+    layers = list(seq.children())
+    conv_idx = [i for i, layer in enumerate(layers) if isinstance(layer, nn.Conv2d) and layer.groups == 1]
+    removed = 0
+    for producer, consumer in zip(conv_idx, conv_idx[1:]):
+        keep = _channels_to_keep(layers[producer], ratio)
+        if len(keep) == layers[producer].out_channels:
+            continue
+        removed += layers[producer].out_channels - len(keep)
+        layers[producer] = _slice_conv(layers[producer], out_idx=keep)
+        bn = producer + 1
+        if isinstance(layers[bn], nn.BatchNorm2d):
+            layers[bn] = _slice_bn(layers[bn], keep)
+        layers[consumer] = _slice_conv(layers[consumer], in_idx=keep)
+    for i, layer in enumerate(layers):
+        seq[i] = layer
+    return removed
+
+
+def prune_model(model: nn.Module, ratio: float) -> int:
+    """Prune every supported channel group in place; returns channels removed."""
+    removed = 0
+    blocks = [m for m in model.modules() if isinstance(m, BasicBlock)]
+    for block in blocks:
+        removed += prune_basic_block(block, ratio)
+    if not blocks:
+        for module in list(model.modules()):
+            if isinstance(module, nn.Sequential) and any(isinstance(m, nn.Conv2d) for m in module.children()):
+                removed += prune_sequential(module, ratio)
+    return removed
+
+
+# ---------------------------------------------------------------------------
+# Measurement
+# ---------------------------------------------------------------------------
+
+def count_flops(model: nn.Module, input_shape: Tuple[int, ...] = (1, 3, 32, 32)) -> int:
+    """Multiply-accumulates of Conv2d and Linear layers for a single forward pass."""
+    total = [0]
+
+    def conv_hook(module: nn.Conv2d, _, output):
+        kernel_ops = module.kernel_size[0] * module.kernel_size[1] * module.in_channels // module.groups
+        total[0] += output.numel() * kernel_ops
+
+    def linear_hook(module: nn.Linear, _, output):
+        total[0] += output.numel() * module.in_features
+
+    hooks = []
+    for m in model.modules():
+        if isinstance(m, nn.Conv2d):
+            hooks.append(m.register_forward_hook(conv_hook))
+        elif isinstance(m, nn.Linear):
+            hooks.append(m.register_forward_hook(linear_hook))
+    model.eval()
+    with torch.no_grad():
+        model(torch.zeros(input_shape))
+    for h in hooks:
+        h.remove()
+    return total[0]
+
+
+@torch.no_grad()
+def _accuracy(model: nn.Module, images: torch.Tensor, labels: torch.Tensor) -> float:
+    model.eval()
+    preds = torch.cat([model(chunk).argmax(dim=1) for chunk in images.split(256)])
+    return float((preds == labels).float().mean())
+
+
+def _synthetic_split(num_samples: int, seed: int, in_channels: int = 3) -> Tuple[torch.Tensor, torch.Tensor]:
+    cells, patterns = generate_calibration_cells(num_samples, seed=seed)
+    return torch.from_numpy(preprocess_cells(cells, in_channels=in_channels)), torch.from_numpy(patterns)
+
+
+def finetune(
+    model: nn.Module,
+    images: torch.Tensor,
+    labels: torch.Tensor,
+    steps: int,
+    batch_size: int = 64,
+    lr: float = 5e-4,
+) -> nn.Module:
+    if steps <= 0:
+        return model
+    model.train()
+    optimizer = torch.optim.AdamW(model.parameters(), lr=lr, weight_decay=1e-4)
+    criterion = nn.CrossEntropyLoss()
+    for _ in range(steps):
+        idx = torch.randint(0, len(images), (batch_size,))
+        optimizer.zero_grad()
+        loss = criterion(model(images[idx]), labels[idx])
+        loss.backward()
+        optimizer.step()
+    return model.eval()
+
+
+def measure(model: nn.Module, eval_images: torch.Tensor, eval_labels: torch.Tensor, name: str) -> Dict:
+    sample = eval_images[:BENCHMARK_BATCH_SIZE]
+    latency = benchmark_callable(lambda: model(sample), name, "pytorch", runs=30)
+    return {
+        "accuracy": _accuracy(model, eval_images, eval_labels),
+        "flops": count_flops(model, (1,) + tuple(eval_images.shape[1:])),
+        "parameters": sum(p.numel() for p in model.parameters()),
+        "latency_ms_per_batch": latency["mean_ms"],
+    }
+
+
+# ---------------------------------------------------------------------------
+# Pipeline
+# ---------------------------------------------------------------------------
+
+def plot_tradeoff(history: List[Dict], output_path: str) -> Optional[str]:
+    try:
+        import matplotlib
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+    except ImportError:
+        logger.warning("matplotlib not installed, skipping pruning trade-off plot.")
+        return None
+
+    acc = [h["accuracy"] for h in history]
+    flops = [h["flops"] / 1e6 for h in history]
+    latency = [h["latency_ms_per_batch"] for h in history]
+    fig, (ax_flops, ax_lat) = plt.subplots(1, 2, figsize=(10, 4))
+    for ax, xs, label in (
+        (ax_flops, flops, "MFLOPs (MACs)"),
+        (ax_lat, latency, f"Latency (ms / batch of {BENCHMARK_BATCH_SIZE})"),
+    ):
+        ax.plot(xs, acc, "o-")
+        for h, x in zip(history, xs):
+            ax.annotate(str(h["step"]), (x, h["accuracy"]))
+        ax.set_xlabel(label)
+        ax.set_ylabel("Accuracy")
+        ax.grid(True, alpha=0.3)
+    fig.suptitle("Channel pruning: accuracy vs cost")
+    fig.tight_layout()
+    fig.savefig(output_path, dpi=120)
+    plt.close(fig)
+    return output_path
+
+
+def run_pruning(
+    arch: str = "resnet18",
+    weights_path: str = None,
+    output_dir: str = None,
+    num_classes: int = 64,
+    steps: int = 5,
+    ratio_per_step: float = 0.2,
+    finetune_steps: int = 200,
+    train_samples: int = 4096,
+    eval_samples: int = 1024,
+    max_accuracy_drop: float = None,
+) -> Dict:
+    """
+    Prune iteratively and export the smallest model whose accuracy stays within
+    max_accuracy_drop of the unpruned baseline.
+    """
+    if arch not in PRUNABLE_ARCHS:
+        raise ValueError(f"Channel pruning supports {', '.join(PRUNABLE_ARCHS)}, not '{arch}'")
+    weights_path = weights_path or default_weights_path(arch)
+    output_dir = Path(output_dir or settings.MODEL_ARTIFACTS_DIR)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    max_accuracy_drop = settings.DISTILLATION_MAX_ACCURACY_DROP if max_accuracy_drop is None else max_accuracy_drop
+
+    if os.path.exists(weights_path):
+        state = torch.load(weights_path, map_location="cpu")
+        model = build_classifier_arch(arch, num_classes=num_classes, in_channels=infer_in_channels(state))
+        model.load_state_dict(state)
+        logger.info(f"Loaded {arch} for pruning: {weights_path}")
+    else:
+        model = build_classifier_arch(arch, num_classes=num_classes)
+        logger.warning(f"{arch} weights not found at {weights_path}, pruning random weights.")
+    model.eval()
+
+    in_channels = input_channels(model)
+    train_images, train_labels = _synthetic_split(train_samples, seed=10, in_channels=in_channels)
+    eval_images, eval_labels = _synthetic_split(eval_samples, seed=11, in_channels=in_channels)
+
+    history = [{"step": 0, "channels_removed": 0, **measure(model, eval_images, eval_labels, f"{arch}_step0")}]
+    baseline_acc = history[0]["accuracy"]
+    best_step, best_model = 0, copy.deepcopy(model)
+    logger.info(f"Step 0: acc={baseline_acc:.4f} flops={history[0]['flops'] / 1e6:.1f}M")
+
+    for step in range(1, steps + 1):
+        removed = prune_model(model, ratio_per_step)
+        if removed == 0:
+            logger.info("No prunable channels left, stopping.")
+            break
+        finetune(model, train_images, train_labels, finetune_steps)
+        point = {"step": step, "channels_removed": removed, **measure(model, eval_images, eval_labels, f"{arch}_step{step}")}
+        history.append(point)
+        logger.info(
+            f"Step {step}: removed {removed} channels | acc={point['accuracy']:.4f} "
+            f"flops={point['flops'] / 1e6:.1f}M latency={point['latency_ms_per_batch']:.2f}ms"
+        )
+        if baseline_acc - point["accuracy"] <= max_accuracy_drop:
+            best_step, best_model = step, copy.deepcopy(model)
+
+    stem = f"classifier_{arch}_pruned"
+    torchscript_path = export_torchscript(best_model, str(output_dir / f"{stem}.pt"), in_channels=eval_images.shape[1])
+    onnx_path = str(output_dir / f"{stem}.onnx")
+    try:
+        torch.onnx.export(
+            best_model, eval_images[:1], onnx_path,
+            opset_version=17,
+            input_names=["input"],
+            output_names=["logits"],
+            dynamic_axes={"input": {0: "batch_size"}, "logits": {0: "batch_size"}},
+            do_constant_folding=True,
+        )
+    except Exception as e:
+        logger.warning(f"ONNX export of pruned model failed: {e}")
+        onnx_path = None
+
+    report = {
+        "arch": arch,
+        "ratio_per_step": ratio_per_step,
+        "finetune_steps": finetune_steps,
+        "max_accuracy_drop": max_accuracy_drop,
+        "selected_step": best_step,
+        "torchscript_path": torchscript_path,
+        "onnx_path": onnx_path,
+        "plot_path": plot_tradeoff(history, str(output_dir / f"{stem}_tradeoff.png")),
+        "history": history,
+    }
+    with open(output_dir / f"{stem}_report.json", "w") as f:
+        json.dump(report, f, indent=2)
+    logger.info(f"Selected pruning step {best_step}; report saved to {output_dir / f'{stem}_report.json'}")
+    return report
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Iterative channel pruning for cell classifiers")
+    parser.add_argument("--arch", default="resnet18", choices=PRUNABLE_ARCHS)
+    parser.add_argument("--weights", default=None)
+    parser.add_argument("--output-dir", default=None)
+    parser.add_argument("--steps", type=int, default=5)
+    parser.add_argument("--ratio", type=float, default=0.2)
+    parser.add_argument("--finetune-steps", type=int, default=200)
+    args = parser.parse_args()
+    run_pruning(
+        arch=args.arch,
+        weights_path=args.weights,
+        output_dir=args.output_dir,
+        steps=args.steps,
+        ratio_per_step=args.ratio,
+        finetune_steps=args.finetune_steps,
+    )
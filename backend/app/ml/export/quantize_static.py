@@ -0,0 +1,342 @@
+"""
+Static INT8 post-training quantization with synthetic calibration data.
+
+Unlike quantize_dynamic, static quantization also converts the Conv2d layers
+(where almost all of the ResNet18 / dot CNN compute lives) by observing
+activation ranges on a calibration set drawn from the synthetic cell generator.
+
+Two paths are provided:
+  * PyTorch FX-graph PTQ  -> frozen TorchScript artefacts loadable with torch.jit.load
+  * ONNX Runtime QDQ PTQ  -> *_int8.onnx artefacts for the ONNX backend
+
+A JSON report compares accuracy and latency of each INT8 model against FP32.
+"""
+import json
+import logging
+import os
+import random
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import torch
+import torch.nn as nn
+
+from app.core.config import settings
+from app.ml.export.benchmark_latency import benchmark_callable, _speedup
+from app.ml.inference.braille_classifier import preprocess_cells
+from app.ml.inference.dot_detector_cnn import DotDetectorCNNModel, preprocess_dot_cells
+from app.ml.inference.model_loader import (
+    TORCHSCRIPT_CHANNELS_FILE,
+    build_classifier_arch,
+    infer_in_channels,
+    input_channels,
+    resolve_serving_classifier,
+)
+from app.ml.training.generate_synthetic_data import render_braille_cell
+
+logger = logging.getLogger(__name__)
+
+CALIBRATION_BATCH_SIZE = 32
+REPORT_BENCHMARK_RUNS = 50
+
+
+# ---------------------------------------------------------------------------
+# Calibration data
+# ---------------------------------------------------------------------------
+
+def generate_calibration_cells(
+    num_samples: int = None,
+    cell_size: int = None,
+    seed: int = 0,
+) -> Tuple[List[np.ndarray], np.ndarray]:
+    """Render a class-balanced set of noisy synthetic cells and their patterns."""
+    num_samples = num_samples or settings.QUANTIZATION_CALIBRATION_SAMPLES
+    cell_size = cell_size or settings.CELL_SIZE
+    random.seed(seed)
+    np.random.seed(seed)
+
+    cells, patterns = [], []
+    for i in range(num_samples):
+        pattern = i % 64
+        cells.append(render_braille_cell(
+            pattern=pattern,
+            cell_size=cell_size,
+            dot_radius=random.randint(3, 5),
+            add_noise=True,
+        ))
+        patterns.append(pattern)
+    return cells, np.array(patterns, dtype=np.int64)
+
+
+def _iter_batches(batch: np.ndarray, batch_size: int = CALIBRATION_BATCH_SIZE):
+    for start in range(0, len(batch), batch_size):
+        yield batch[start:start + batch_size]
+
+
+# ---------------------------------------------------------------------------
+# PyTorch FX static quantization
+# ---------------------------------------------------------------------------
+
+def _quantized_engine() -> str:
+    engines = torch.backends.quantized.supported_engines
+    engine = "x86" if "x86" in engines else "qnnpack"
+    torch.backends.quantized.engine = engine
+    return engine
+
+
+def quantize_module_fx(model: nn.Module, calibration_batch: np.ndarray) -> nn.Module:
+    """Fuse, calibrate and convert an eval-mode FP32 module to INT8 with FX PTQ."""
+    from torch.ao.quantization import get_default_qconfig_mapping
+    from torch.ao.quantization.quantize_fx import convert_fx, prepare_fx
+
+    engine = _quantized_engine()
+    model = model.cpu().eval()
+    example = (torch.from_numpy(calibration_batch[:1]),)
+    prepared = prepare_fx(model, get_default_qconfig_mapping(engine), example)
+
+    with torch.no_grad():
+        for chunk in _iter_batches(calibration_batch):
+            prepared(torch.from_numpy(chunk))
+
+    return convert_fx(prepared)
+
+
+def save_torchscript(model: nn.Module, example_input: torch.Tensor, output_path: str) -> str:
+    """Trace and freeze a model so it can be loaded without its Python class."""
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    with torch.no_grad():
+        traced = torch.jit.trace(model, example_input)
+        traced = torch.jit.freeze(traced.eval())
+    extra_files = {TORCHSCRIPT_CHANNELS_FILE: str(example_input.shape[1])}
+    torch.jit.save(traced, output_path, _extra_files=extra_files)
+    return output_path
+
+
+def _load_fp32_classifier(weights_path: str, num_classes: int, arch: str = None) -> nn.Module:
+    arch = arch or resolve_serving_classifier()["arch"]
+    if os.path.exists(weights_path):
+        state = torch.load(weights_path, map_location="cpu")
+        model = build_classifier_arch(arch, num_classes=num_classes, in_channels=infer_in_channels(state))
+        model.load_state_dict(state)
+        logger.info(f"Loaded classifier for static quantization: {weights_path}")
+    else:
+        model = build_classifier_arch(arch, num_classes=num_classes)
+        logger.warning(f"Classifier weights not found at {weights_path}, quantizing random weights.")
+    return model.eval()
+
+
+def _load_fp32_dot_detector(weights_path: str) -> nn.Module:
+    if os.path.exists(weights_path):
+        state = torch.load(weights_path, map_location="cpu")
+        model = DotDetectorCNNModel(in_channels=infer_in_channels(state))
+        model.load_state_dict(state)
+        logger.info(f"Loaded dot detector for static quantization: {weights_path}")
+    else:
+        model = DotDetectorCNNModel()
+        logger.warning(f"Dot detector weights not found at {weights_path}, quantizing random weights.")
+    return model.eval()
+
+
+def quantize_classifier_static(
+    weights_path: str = None,
+    output_path: str = None,
+    num_classes: int = 64,
+    num_calibration_samples: int = None,
+    arch: str = None,
+) -> str:
+    weights_path = weights_path or resolve_serving_classifier()["weights_path"]
+    output_path = output_path or settings.CLASSIFIER_QUANTIZED_PATH
+
+    cells, _ = generate_calibration_cells(num_calibration_samples)
+    model = _load_fp32_classifier(weights_path, num_classes, arch)
+    calibration = preprocess_cells(cells, in_channels=input_channels(model))
+    quantized = quantize_module_fx(model, calibration)
+    save_torchscript(quantized, torch.from_numpy(calibration[:1]), output_path)
+
+    _log_size_change("classifier", weights_path, output_path)
+    return output_path
+
+
+def quantize_dot_detector_static(
+    weights_path: str = None,
+    output_path: str = None,
+    num_calibration_samples: int = None,
+) -> str:
+    weights_path = weights_path or settings.DOT_DETECTOR_MODEL_PATH
+    output_path = output_path or settings.DOT_DETECTOR_QUANTIZED_PATH
+
+    cells, _ = generate_calibration_cells(num_calibration_samples)
+    model = _load_fp32_dot_detector(weights_path)
+    calibration = preprocess_dot_cells(cells, in_channels=input_channels(model))
+    quantized = quantize_module_fx(model, calibration)
+    save_torchscript(quantized, torch.from_numpy(calibration[:1]), output_path)
+
+    _log_size_change("dot detector", weights_path, output_path)
+    return output_path
+
+
+def _log_size_change(name: str, weights_path: str, output_path: str):
+    orig_size = os.path.getsize(weights_path) / 1e6 if os.path.exists(weights_path) else 0
+    quant_size = os.path.getsize(output_path) / 1e6
+    logger.info(f"Quantized {name}: {orig_size:.2f}MB -> {quant_size:.2f}MB")
+    logger.info(f"Saved quantized {name} to {output_path}")
+
+
+# ---------------------------------------------------------------------------
+# ONNX Runtime QDQ static quantization
+# ---------------------------------------------------------------------------
+
+def quantize_onnx_static(
+    onnx_path: str = None,
+    output_path: str = None,
+    num_calibration_samples: int = None,
+    preprocess_fn: Callable[[List[np.ndarray]], np.ndarray] = preprocess_cells,
+) -> str:
+    """Quantize an FP32 ONNX model to QDQ INT8 using synthetic calibration cells."""
+    from onnxruntime.quantization import (
+        CalibrationDataReader,
+        QuantFormat,
+        QuantType,
+        quantize_static,
+    )
+
+    onnx_path = onnx_path or resolve_serving_classifier()["onnx_path"]
+    output_path = output_path or settings.CLASSIFIER_ONNX_INT8_PATH
+    if not os.path.exists(onnx_path):
+        raise FileNotFoundError(f"ONNX model not found: {onnx_path}")
+
+    import onnx
+    graph_input = onnx.load(onnx_path).graph.input[0]
+    input_name = graph_input.name
+    in_channels = graph_input.type.tensor_type.shape.dim[1].dim_value or 3
+
+    cells, _ = generate_calibration_cells(num_calibration_samples)
+    calibration = preprocess_fn(cells, in_channels=in_channels)
+
+    class _SyntheticCellReader(CalibrationDataReader):
+        def __init__(self, input_name: str):
+            self._batches = iter(
+                {input_name: chunk} for chunk in _iter_batches(calibration)
+            )
+
+        def get_next(self):
+            return next(self._batches, None)
+
+    quantize_static(
+        onnx_path,
+        output_path,
+        _SyntheticCellReader(input_name),
+        quant_format=QuantFormat.QDQ,
+        activation_type=QuantType.QUInt8,
+        weight_type=QuantType.QInt8,
+        per_channel=True,
+    )
+    _log_size_change("ONNX model", onnx_path, output_path)
+    return output_path
+
+
+# ---------------------------------------------------------------------------
+# Accuracy / latency report
+# ---------------------------------------------------------------------------
+
+def _predict(model: nn.Module, batch: np.ndarray) -> np.ndarray:
+    outputs = []
+    with torch.no_grad():
+        for chunk in _iter_batches(batch):
+            outputs.append(model(torch.from_numpy(chunk)).numpy())
+    return np.concatenate(outputs, axis=0)
+
+
+def compare_classifiers(fp32_logits: np.ndarray, int8_logits: np.ndarray, patterns: np.ndarray) -> Dict:
+    fp32_pred = fp32_logits.argmax(axis=1)
+    int8_pred = int8_logits.argmax(axis=1)
+    return {
+        "fp32_accuracy": float((fp32_pred == patterns).mean()),
+        "int8_accuracy": float((int8_pred == patterns).mean()),
+        "top1_agreement": float((fp32_pred == int8_pred).mean()),
+        "max_logit_diff": float(np.abs(fp32_logits - int8_logits).max()),
+    }
+
+
+def compare_dot_detectors(fp32_logits: np.ndarray, int8_logits: np.ndarray, patterns: np.ndarray) -> Dict:
+    labels = (patterns[:, None] >> np.arange(6)) & 1
+    fp32_dots = (fp32_logits > 0).astype(np.int64)
+    int8_dots = (int8_logits > 0).astype(np.int64)
+    return {
+        "fp32_dot_accuracy": float((fp32_dots == labels).mean()),
+        "int8_dot_accuracy": float((int8_dots == labels).mean()),
+        "fp32_exact_match": float((fp32_dots == labels).all(axis=1).mean()),
+        "int8_exact_match": float((int8_dots == labels).all(axis=1).mean()),
+        "dot_agreement": float((fp32_dots == int8_dots).mean()),
+    }
+
+
+def _latency_report(fp32: nn.Module, int8: nn.Module, sample: torch.Tensor, name: str) -> Dict:
+    fp32_stats = benchmark_callable(lambda: fp32(sample), f"{name}_fp32", "pytorch", runs=REPORT_BENCHMARK_RUNS)
+    int8_stats = benchmark_callable(lambda: int8(sample), f"{name}_int8", "pytorch_int8", runs=REPORT_BENCHMARK_RUNS)
+    return {
+        "fp32": fp32_stats,
+        "int8": int8_stats,
+        "speedup": _speedup(fp32_stats["mean_ms"], int8_stats["mean_ms"]),
+    }
+
+
+def evaluate_static_quantization(
+    classifier_weights: str = None,
+    classifier_quantized: str = None,
+    dot_weights: str = None,
+    dot_quantized: str = None,
+    num_classes: int = 64,
+    num_eval_samples: int = 1024,
+    report_path: Optional[str] = None,
+) -> Dict:
+    """Compare INT8 artefacts against FP32 on held-out synthetic cells."""
+    classifier_weights = classifier_weights or resolve_serving_classifier()["weights_path"]
+    classifier_quantized = classifier_quantized or settings.CLASSIFIER_QUANTIZED_PATH
+    dot_weights = dot_weights or settings.DOT_DETECTOR_MODEL_PATH
+    dot_quantized = dot_quantized or settings.DOT_DETECTOR_QUANTIZED_PATH
+    report_path = report_path or settings.QUANTIZATION_REPORT_PATH
+
+    # A different seed from calibration so the report is not measured on calibration data
+    cells, patterns = generate_calibration_cells(num_eval_samples, seed=1)
+    batch_size = CALIBRATION_BATCH_SIZE
+    report: Dict = {"eval_samples": len(patterns), "engine": _quantized_engine()}
+
+    if os.path.exists(classifier_quantized):
+        fp32 = _load_fp32_classifier(classifier_weights, num_classes)
+        batch = preprocess_cells(cells, in_channels=input_channels(fp32))
+        int8 = torch.jit.load(classifier_quantized, map_location="cpu").eval()
+        report["classifier"] = compare_classifiers(_predict(fp32, batch), _predict(int8, batch), patterns)
+        report["classifier"]["latency"] = _latency_report(
+            fp32, int8, torch.from_numpy(batch[:batch_size]), "classifier"
+        )
+
+    if os.path.exists(dot_quantized):
+        fp32 = _load_fp32_dot_detector(dot_weights)
+        batch = preprocess_dot_cells(cells, in_channels=input_channels(fp32))
+        int8 = torch.jit.load(dot_quantized, map_location="cpu").eval()
+        report["dot_detector"] = compare_dot_detectors(_predict(fp32, batch), _predict(int8, batch), patterns)
+        report["dot_detector"]["latency"] = _latency_report(
+            fp32, int8, torch.from_numpy(batch[:batch_size]), "dot_detector"
+        )
+
+    out_path = Path(report_path)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(out_path, "w") as f:
+        json.dump(report, f, indent=2)
+    logger.info(f"Quantization report saved to: {out_path}")
+    return report
+
+
+def run_static_quantization(num_classes: int = 64) -> Dict:
+    quantize_classifier_static(num_classes=num_classes)
+    quantize_dot_detector_static()
+    if os.path.exists(resolve_serving_classifier()["onnx_path"]):
+        quantize_onnx_static()
+    return evaluate_static_quantization(num_classes=num_classes)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    run_static_quantization()
@@ -0,0 +1,151 @@
+"""
+Offline bulk conversion of images, PDFs and TIFFs to text.
+
+    python -m app.ml.inference.batch_convert scans/ -o results.jsonl --workers 8
+
+Inputs are a directory (searched recursively for ALLOWED_EXTENSIONS) or a
+manifest file listing one path per line. Every page of every input goes
+through one pool of worker processes, each loading the models once, and each
+finished page is appended to the JSONL output immediately. Re-running with
+the same output skips pages already written, so an interrupted backfill
+resumes where it stopped; pages that failed are retried.
+"""
+import os
+import json
+import time
+import logging
+import argparse
+from typing import Dict, List, Set, Tuple
+
+from app.core.config import settings
+from app.ml.inference.document_pipeline import JsonlPageWriter, run_pages
+from app.ml.preprocessing.ingest import page_count
+
+logger = logging.getLogger(__name__)
+
+PROGRESS_INTERVAL_S = 10.0
+
+
+def collect_inputs(source: str) -> List[str]:
+    """Input files from a directory tree or a manifest (one path per line, '#' comments)."""
+    if os.path.isdir(source):
+        extensions = {f".{ext}" for ext in settings.ALLOWED_EXTENSIONS}
+        return sorted(
+            os.path.join(root, name)
+            for root, _, names in os.walk(source)
+            for name in names
+            if os.path.splitext(name)[1].lower() in extensions
+        )
+    base = os.path.dirname(os.path.abspath(source))
+    with open(source, encoding="utf-8") as f:
+        lines = [line.strip() for line in f]
+    return [p if os.path.isabs(p) else os.path.join(base, p) for p in lines if p and not p.startswith("#")]
+
+
+def completed_pages(output_path: str) -> Set[Tuple[str, int]]:
+    """(path, page_index) already written successfully to a previous run's output."""
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A run killed mid-write leaves a truncated last line
+                continue
+            if "error" not in record:
+                done.add((record["path"], record["page_index"]))
+    return done
+
+
+def batch_convert(
+    source: str,
+    output_path: str,
+    workers: int = 0,
+    dpi: int = None,
+    use_onnx: bool = False,
+    keep_cells: bool = False,
+    grade: int = 1,
+) -> Dict[str, float]:
+    """
+    Convert every page under source, appending one JSON line per page to
+    output_path. workers=0 runs one process per CPU core.
+    """
+    done = completed_pages(output_path)
+    tasks = []
+    for path in collect_inputs(source):
+        try:
+            pages = page_count(path)
+        except Exception as e:
+            logger.error(f"Skipping unreadable input {path}: {e}")
+            continue
+        tasks.extend((path, index) for index in range(pages) if (path, index) not in done)
+    logger.info(f"{len(tasks)} page(s) to convert, {len(done)} already in {output_path}")
+
+    writer = JsonlPageWriter(output_path, append=True)
+    stats = {"pages": 0, "failed": 0}
+    t0 = last_report = time.perf_counter()
+
+    def report(final: bool = False) -> None:
+        elapsed = time.perf_counter() - t0
+        rate = stats["pages"] / elapsed if elapsed > 0 else 0.0
+        remaining = len(tasks) - stats["pages"] - stats["failed"]
+        eta = f", ETA {remaining / rate:.0f}s" if rate > 0 and not final else ""
+        logger.info(
+            f"{stats['pages']}/{len(tasks)} pages ({stats['failed']} failed), "
+            f"{rate:.2f} pages/s{eta}"
+        )
+
+    def on_page(result: Dict) -> None:
+        nonlocal last_report
+        if not keep_cells:
+            result.pop("cells", None)
+        writer(result)
+        stats["pages"] += 1
+        if time.perf_counter() - last_report >= PROGRESS_INTERVAL_S:
+            last_report = time.perf_counter()
+            report()
+
+    def on_error(path: str, index: int, error: Exception) -> None:
+        logger.error(f"{path} page {index} failed: {error}")
+        writer({"path": path, "page_index": index, "error": str(error)})
+        stats["failed"] += 1
+
+    try:
+        run_pages(tasks, on_page, workers=workers, dpi=dpi, use_onnx=use_onnx, on_error=on_error, grade=grade)
+    finally:
+        writer.close()
+        report(final=True)
+
+    elapsed = time.perf_counter() - t0
+    return {
+        "pages": stats["pages"],
+        "failed": stats["failed"],
+        "skipped": len(done),
+        "elapsed_s": round(elapsed, 2),
+        "pages_per_s": round(stats["pages"] / elapsed, 3) if elapsed > 0 else 0.0,
+    }
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    parser = argparse.ArgumentParser(description="Bulk Braille page conversion to JSONL")
+    parser.add_argument("source", help="Directory of images/PDFs/TIFFs, or a manifest file of paths")
+    parser.add_argument("-o", "--output", default=os.path.join(settings.OUTPUT_DIR, "batch_results.jsonl"))
+    parser.add_argument("--workers", type=int, default=0, help="Worker processes (default one per CPU core)")
+    parser.add_argument("--dpi", type=int, default=None, help="PDF render DPI (default PDF_RENDER_DPI)")
+    parser.add_argument("--onnx", action="store_true", help="Use the ONNX models")
+    parser.add_argument("--keep-cells", action="store_true", help="Include per-cell boxes in the output")
+    parser.add_argument("--grade", type=int, choices=(1, 2), default=1, help="Braille grade (2 = contracted)")
+    args = parser.parse_args()
+    summary = batch_convert(
+        args.source,
+        args.output,
+        workers=args.workers,
+        dpi=args.dpi,
+        use_onnx=args.onnx,
+        keep_cells=args.keep_cells,
+        grade=args.grade,
+    )
+    print(json.dumps(summary, indent=2))
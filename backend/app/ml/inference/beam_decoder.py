@@ -0,0 +1,168 @@
+"""
+Beam-search decoding of classified Braille cells.
+
+Instead of taking each cell's argmax pattern, decoding it, and then asking a
+spell checker to repair whole words, the decoder keeps the classifier's top-k
+patterns per cell and searches for the sequence that maximises
+
+    sum(log P_classifier(pattern)) + lm_weight * log P_lm(text)
+
+under a character n-gram model. Dot patterns that are one dot apart (e/i,
+d/f, ...) are exactly what a spell checker cannot see but the classifier's
+runner-up probabilities can, and the search costs about beam_width * top_k
+table lookups per cell instead of a SymSpell lookup per word.
+
+Hypotheses with the same decoder state (LM context, capital and number mode)
+are merged, so the search is Viterbi over that state within the beam.
+"""
+import heapq
+import logging
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.ml.inference.postprocess import NUMBER_INDICATOR, PATTERN_TO_CHAR, PostProcessor
+from app.ml.nlp.char_lm import BOUNDARY, SYMBOL_INDEX, CharLanguageModel, shared_char_lm
+
+logger = logging.getLogger(__name__)
+
+CAPITAL_PATTERN = 0b100000
+_MIN_PROB = 1e-9
+# Fixed log priors for what the letter model does not cover. Without a cost,
+# indicators and digits would be free ways around an unlikely letter.
+INDICATOR_LOG_PROB = float(np.log(0.01))
+DIGIT_LOG_PROB = float(np.log(0.1))
+PUNCTUATION_LOG_PROB = float(np.log(0.01))
+UNKNOWN_LOG_PROB = float(np.log(0.001))
+
+# Per pattern: (kind, LM symbol, fixed log prior); kind is one of
+# "capital" | "number" | "space" | "letter" | "other"
+_KIND = {}
+for _pattern in range(64):
+    if _pattern == CAPITAL_PATTERN:
+        _KIND[_pattern] = ("capital", None, INDICATOR_LOG_PROB)
+    elif _pattern == NUMBER_INDICATOR:
+        _KIND[_pattern] = ("number", None, INDICATOR_LOG_PROB)
+    else:
+        _char = PATTERN_TO_CHAR.get(_pattern, "?")
+        if _char == " ":
+            _KIND[_pattern] = ("space", BOUNDARY, 0.0)
+        elif _char in SYMBOL_INDEX:
+            _KIND[_pattern] = ("letter", SYMBOL_INDEX[_char], 0.0)
+        else:
+            # Punctuation and unknown patterns end a word
+            prior = UNKNOWN_LOG_PROB if _char == "?" else PUNCTUATION_LOG_PROB
+            _KIND[_pattern] = ("other", BOUNDARY, prior)
+_NUMBER_LETTERS = set("abcdefghij")
+
+
+class BeamDecoder:
+    def __init__(
+        self,
+        lm: CharLanguageModel = None,
+        beam_width: int = None,
+        top_k: int = None,
+        lm_weight: float = None,
+        postprocessor: PostProcessor = None,
+    ):
+        self.lm = lm or shared_char_lm()
+        self.beam_width = beam_width or settings.BEAM_WIDTH
+        self.top_k = top_k or settings.BEAM_TOP_K
+        self.lm_weight = settings.BEAM_LM_WEIGHT if lm_weight is None else lm_weight
+        self.postprocessor = postprocessor or PostProcessor()
+
+    def search(self, probabilities: np.ndarray) -> Tuple[List[int], float]:
+        """
+        Best pattern sequence for cells already in reading order, given their
+        (N, 64) pattern probabilities. Returns (patterns, total score).
+        """
+        n = len(probabilities)
+        if n == 0:
+            return [], 0.0
+        probs = np.asarray(probabilities, dtype=np.float32)
+        k = min(self.top_k, probs.shape[1])
+        candidates = np.argpartition(-probs, k - 1, axis=1)[:, :k]
+        log_probs = np.log(np.maximum(np.take_along_axis(probs, candidates, axis=1), _MIN_PROB))
+        candidates, log_probs = candidates.tolist(), log_probs.tolist()
+
+        lm, weight = self.lm, self.lm_weight
+        # beam: state -> (score, backpointer index); state = (lm context, capital, number)
+        beam = {(lm.start, False, False): (0.0, -1)}
+        history: List[List[Tuple[int, int]]] = []  # per step: (parent, pattern) per survivor
+
+        for step in range(n):
+            expanded: Dict[Tuple[int, bool, bool], Tuple[float, int, int]] = {}
+            # One gather per step for every live context's next-symbol log probs
+            rows = lm.rows([state[0] for state in beam]).tolist()
+            for parent, (state, (score, _)) in enumerate(beam.items()):
+                context, capital, number = state
+                row = rows[parent]
+                for pattern, cls_lp in zip(candidates[step], log_probs[step]):
+                    kind, symbol, lm_lp = _KIND[pattern]
+                    if kind == "capital":
+                        new = (context, True, number)
+                    elif kind == "number":
+                        new = (context, capital, True)
+                    elif kind == "letter" and number and PATTERN_TO_CHAR[pattern] in _NUMBER_LETTERS:
+                        # A digit: no letter statistics apply
+                        lm_lp = DIGIT_LOG_PROB
+                        new = (context, capital, number)
+                    elif kind == "space":
+                        lm_lp = row[symbol]
+                        new = (lm.advance(context, symbol), capital, False)
+                    elif kind == "letter":
+                        # A printed character consumes a pending capital outside number mode
+                        lm_lp = row[symbol]
+                        new = (lm.advance(context, symbol), capital and number, number)
+                    else:
+                        new = (lm.advance(context, symbol), capital and number, number)
+                    total = score + cls_lp + weight * lm_lp
+                    best = expanded.get(new)
+                    if best is None or total > best[0]:
+                        expanded[new] = (total, parent, pattern)
+            survivors = heapq.nlargest(self.beam_width, expanded.items(), key=lambda item: item[1][0])
+            history.append([(parent, pattern) for _, (_, parent, pattern) in survivors])
+            beam = {state: (score, i) for i, (state, (score, _, _)) in enumerate(survivors)}
+
+        # Backtrack from the best final hypothesis
+        best_index, best_score = max(
+            ((i, score) for i, (score, _) in enumerate(beam.values())), key=lambda item: item[1]
+        )
+        patterns = [0] * n
+        index = best_index
+        for step in range(n - 1, -1, -1):
+            index, patterns[step] = history[step][index]
+        return patterns, best_score
+
+    def decode(
+        self, cells: Sequence[Dict[str, Any]], probabilities: np.ndarray
+    ) -> Tuple[str, List[int]]:
+        """
+        Decode cells (with "box") using their pattern probabilities (N, 64).
+        Returns the text and the chosen pattern for each input cell, in input order.
+        """
+        if not len(cells):
+            return "", []
+        order = self.postprocessor.reading_order(cells)
+        patterns, _ = self.search(np.asarray(probabilities)[order])
+        chosen: List[Optional[int]] = [None] * len(cells)
+        for position, pattern in zip(order, patterns):
+            chosen[position] = pattern
+        text = self.postprocessor.decode(
+            [dict(cell, pattern=pattern) for cell, pattern in zip(cells, chosen)]
+        )
+        return text, chosen
+
+
+def load_beam_decoder(postprocessor: PostProcessor = None) -> Optional[BeamDecoder]:
+    """
+    The beam decoder, or None if its language model cannot be loaded or
+    trained (e.g. symspellpy's dictionary is not installed); callers then
+    fall back to argmax decoding.
+    """
+    try:
+        return BeamDecoder(postprocessor=postprocessor)
+    except Exception as e:
+        logger.warning(f"Beam decoder not available: {e}. Falling back to argmax decoding.")
+        return None
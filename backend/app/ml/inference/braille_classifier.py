@@ -1,12 +1,17 @@
 import logging
 import numpy as np
 import torch
-import torch.nn.functional as F
 import cv2
 from typing import List, Dict, Any
 import os
 
-from app.ml.inference.model_loader import load_pytorch_classifier, load_onnx_classifier
+from app.ml.inference.model_loader import (
+    CPU_ONLY_BACKENDS,
+    InferenceBackend,
+    forward_logits,
+    input_channels,
+    load_classifier,
+)
 from app.ml.preprocessing.resize import resize_cell
 from app.core.config import settings
 from app.ml.inference.postprocess import PATTERN_TO_CHAR
@@ -17,40 +22,71 @@ MEAN = np.array([0.485, 0.456, 0.406], dtype=np.float32)
 STD = np.array([0.229, 0.224, 0.225], dtype=np.float32)
 
 
+GRAY_MEAN = 0.5
+GRAY_STD = 0.5
+
+
+def preprocess_gray_cells(cell_images: List[np.ndarray], cell_size: int = None) -> np.ndarray:
+    """Single-channel variant: grayscale, resized, normalised to [-1, 1] as (N, 1, H, W)."""
+    cell_size = cell_size or settings.CELL_SIZE
+    batch = np.empty((len(cell_images), 1, cell_size, cell_size), dtype=np.float32)
+    for i, img in enumerate(cell_images):
+        if img.ndim == 3:
+            img = cv2.cvtColor(img, cv2.COLOR_BGRA2GRAY if img.shape[2] == 4 else cv2.COLOR_BGR2GRAY)
+        batch[i, 0] = resize_cell(img, cell_size)
+    batch *= 1.0 / (255.0 * GRAY_STD)
+    batch -= GRAY_MEAN / GRAY_STD
+    return batch
+
+
+def preprocess_cells(cell_images: List[np.ndarray], cell_size: int = None, in_channels: int = 3) -> np.ndarray:
+    """Convert cell crops into the NCHW float batch the classifier expects."""
+    if in_channels == 1:
+        return preprocess_gray_cells(cell_images, cell_size)
+    cell_size = cell_size or settings.CELL_SIZE
+    batch = []
+    for img in cell_images:
+        if len(img.shape) == 2:
+            img = cv2.cvtColor(img, cv2.COLOR_GRAY2RGB)
+        elif img.shape[2] == 4:
+            img = cv2.cvtColor(img, cv2.COLOR_BGRA2RGB)
+        else:
+            img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+        img = resize_cell(img, cell_size)
+        img = img.astype(np.float32) / 255.0
+        img = (img - MEAN) / STD
+        batch.append(img.transpose(2, 0, 1))
+    return np.stack(batch, axis=0)
+
+
 class BrailleClassifier:
     """Classify Braille cell crops into 64 dot patterns."""
 
-    def __init__(self, use_onnx: bool = False):
+    def __init__(self, use_onnx: bool = False, backend: str = None):
+        if backend is None:
+            backend = InferenceBackend.ONNX if use_onnx else settings.CLASSIFIER_BACKEND
+        self.requested_backend = InferenceBackend(backend)
         self.use_onnx = use_onnx
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+        self.backend = None
         self.model = None
         self.onnx_session = None
+        self.in_channels = 3
         self._load()
 
     def _load(self):
-        if self.use_onnx:
-            try:
-                self.onnx_session = load_onnx_classifier()
-            except Exception as e:
-                logger.warning(f"ONNX classifier not available: {e}, falling back to PyTorch.")
-                self.model = load_pytorch_classifier(self.device)
+        self.backend, model = load_classifier(self.requested_backend, self.device)
+        if self.backend in CPU_ONLY_BACKENDS:
+            self.device = torch.device("cpu")
+        if self.backend in (InferenceBackend.ONNX, InferenceBackend.ONNX_INT8):
+            self.onnx_session = model
         else:
-            self.model = load_pytorch_classifier(self.device)
+            self.model = model
+        self.in_channels = input_channels(model)
+        logger.info(f"BrailleClassifier using backend '{self.backend.value}' ({self.in_channels}-channel input)")
 
     def _preprocess(self, cell_images: List[np.ndarray]) -> np.ndarray:
-        batch = []
-        for img in cell_images:
-            if len(img.shape) == 2:
-                img = cv2.cvtColor(img, cv2.COLOR_GRAY2RGB)
-            elif img.shape[2] == 4:
-                img = cv2.cvtColor(img, cv2.COLOR_BGRA2RGB)
-            else:
-                img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-            img = resize_cell(img, settings.CELL_SIZE)
-            img = img.astype(np.float32) / 255.0
-            img = (img - MEAN) / STD
-            batch.append(img.transpose(2, 0, 1))
-        return np.stack(batch, axis=0)
+        return preprocess_cells(cell_images, in_channels=self.in_channels)
 
     def classify_batch(self, cell_images: List[np.ndarray]) -> List[Dict[str, Any]]:
         if not cell_images:
@@ -59,15 +95,8 @@ class BrailleClassifier:
         batch_np = self._preprocess(cell_images)
         results = []
 
-        if self.onnx_session is not None:
-            inp_name = self.onnx_session.get_inputs()[0].name
-            logits = self.onnx_session.run(None, {inp_name: batch_np})[0]
-            probs = self._softmax(logits)
-        else:
-            tensor = torch.from_numpy(batch_np).to(self.device)
-            with torch.no_grad():
-                logits = self.model(tensor)
-                probs = F.softmax(logits, dim=-1).cpu().numpy()
+        logits = forward_logits(self.onnx_session or self.model, batch_np, self.device)
+        probs = self._softmax(logits)
 
         for prob_row in probs:
             pattern = int(np.argmax(prob_row))
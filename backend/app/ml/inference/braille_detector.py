@@ -8,6 +8,7 @@ from torchvision.models.detection.faster_rcnn import FastRCNNPredictor
 import os
 
 from app.core.config import settings
+from app.ml.preprocessing.color import to_gray
 
 logger = logging.getLogger(__name__)
 
@@ -52,7 +53,17 @@ class BrailleDetector:
                 logger.warning(f"Detector load failed: {e}. Using fallback.")
                 self.model = None
 
-    def detect(self, image: np.ndarray, confidence_threshold: float = None) -> List[np.ndarray]:
+    def detect(
+        self,
+        image: np.ndarray,
+        confidence_threshold: float = None,
+        binary: np.ndarray = None,
+        dot_pitch: float = None,
+    ) -> List[np.ndarray]:
+        """
+        binary: optional dots-as-foreground mask already computed by the caller.
+        dot_pitch: estimated dot spacing in pixels, used to size fallback grouping.
+        """
         threshold = confidence_threshold or settings.DETECTOR_CONFIDENCE_THRESHOLD
 
         if self.model is not None:
@@ -60,11 +71,15 @@ class BrailleDetector:
         elif self.onnx_session is not None:
             return self._detect_onnx(image, threshold)
         else:
-            return self._detect_fallback(image)
+            return self._detect_fallback(image, binary, dot_pitch)
 
     def _detect_pytorch(self, image: np.ndarray, threshold: float) -> List[np.ndarray]:
-        rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB) if len(image.shape) == 3 else image
-        tensor = torch.from_numpy(rgb).permute(2, 0, 1).float() / 255.0
+        if image.ndim == 2:
+            # Faster R-CNN takes 3 channels: broadcast gray instead of materialising an RGB copy
+            tensor = (torch.from_numpy(image).float() / 255.0).expand(3, -1, -1)
+        else:
+            rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+            tensor = torch.from_numpy(rgb).permute(2, 0, 1).float() / 255.0
         tensor = tensor.unsqueeze(0).to(self.device)
 
         with torch.no_grad():
@@ -76,8 +91,12 @@ class BrailleDetector:
         return list(boxes[mask])
 
     def _detect_onnx(self, image: np.ndarray, threshold: float) -> List[np.ndarray]:
-        rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-        input_tensor = rgb.transpose(2, 0, 1).astype(np.float32) / 255.0
+        if image.ndim == 2:
+            plane = image.astype(np.float32) / 255.0
+            input_tensor = np.ascontiguousarray(np.broadcast_to(plane, (3,) + plane.shape))
+        else:
+            rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+            input_tensor = rgb.transpose(2, 0, 1).astype(np.float32) / 255.0
         input_tensor = np.expand_dims(input_tensor, 0)
         inp_name = self.onnx_session.get_inputs()[0].name
         outputs = self.onnx_session.run(None, {inp_name: input_tensor})
@@ -85,19 +104,30 @@ class BrailleDetector:
         mask = scores >= threshold
         return list(boxes[mask])
 
-    def _detect_fallback(self, image: np.ndarray) -> List[np.ndarray]:
+    def _detect_fallback(
+        self, image: np.ndarray, binary: np.ndarray = None, dot_pitch: float = None
+    ) -> List[np.ndarray]:
         """
         Fallback: Connected component analysis on binarized image.
         Groups components into Braille cell-sized bounding boxes.
         """
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if len(image.shape) == 3 else image
-        _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
-        kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (settings.CELL_SIZE, settings.CELL_SIZE // 2))
+        if binary is None:
+            gray = to_gray(image)
+            _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+        if dot_pitch:
+            # Bridge the gap between dots of a cell (~pitch) but not between cells (~1.5 pitch)
+            size = max(3, int(round(0.8 * dot_pitch)))
+            kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (size, size))
+            min_area = 0.3 * dot_pitch ** 2
+            line_height = 4 * dot_pitch
+        else:
+            kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (settings.CELL_SIZE, settings.CELL_SIZE // 2))
+            min_area = (settings.CELL_SIZE ** 2) * 0.3
+            line_height = settings.CELL_SIZE * 2
         dilated = cv2.dilate(binary, kernel, iterations=1)
 
         num_labels, labels, stats, _ = cv2.connectedComponentsWithStats(dilated, connectivity=8)
         boxes = []
-        min_area = (settings.CELL_SIZE ** 2) * 0.3
         for i in range(1, num_labels):
             x = stats[i, cv2.CC_STAT_LEFT]
             y = stats[i, cv2.CC_STAT_TOP]
@@ -107,5 +137,5 @@ class BrailleDetector:
             if area >= min_area:
                 boxes.append(np.array([x, y, x + w, y + h, 1.0]))
 
-        boxes.sort(key=lambda b: (b[1] // (settings.CELL_SIZE * 2), b[0]))
+        boxes.sort(key=lambda b: (b[1] // line_height, b[0]))
         return boxes
\ No newline at end of file
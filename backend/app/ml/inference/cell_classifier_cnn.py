@@ -10,6 +10,15 @@ import os
 import cv2
 from typing import List, Dict, Any
 
+from app.core.config import settings
+from app.ml.inference.braille_classifier import preprocess_gray_cells
+from app.ml.inference.model_loader import (
+    InferenceBackend,
+    infer_in_channels,
+    input_channels,
+    load_torchscript_module,
+    maybe_compile,
+)
 from app.ml.inference.postprocess import PATTERN_TO_CHAR
 
 logger = logging.getLogger(__name__)
@@ -18,33 +27,97 @@ MEAN = np.array([0.485, 0.456, 0.406], dtype=np.float32)
 STD = np.array([0.229, 0.224, 0.225], dtype=np.float32)
 
 
-def build_mobilenet_classifier(num_classes: int = 64) -> nn.Module:
+def build_mobilenet_classifier(num_classes: int = 64, in_channels: int = 3) -> nn.Module:
     model = models.mobilenet_v3_small(weights=None)
+    if in_channels != 3:
+        stem = model.features[0][0]
+        model.features[0][0] = nn.Conv2d(
+            in_channels, stem.out_channels, stem.kernel_size,
+            stride=stem.stride, padding=stem.padding, bias=False,
+        )
     in_features = model.classifier[-1].in_features
     model.classifier[-1] = nn.Linear(in_features, num_classes)
     return model
 
 
+class TinyCellClassifier(nn.Module):
+    """
+    Compact CNN (~65k parameters) distilled from the ResNet18 teacher.
+    A strided stem drops the 32x32 cell to 16x16 before any wide convolution.
+    """
+
+    def __init__(self, num_classes: int = 64, in_channels: int = 3):
+        super().__init__()
+
+        def conv_bn(in_ch: int, out_ch: int, stride: int = 1):
+            return [
+                nn.Conv2d(in_ch, out_ch, 3, stride=stride, padding=1, bias=False),
+                nn.BatchNorm2d(out_ch),
+                nn.ReLU(inplace=True),
+            ]
+
+        self.features = nn.Sequential(
+            *conv_bn(in_channels, 16, stride=2),  # 16x16
+            *conv_bn(16, 32),
+            nn.MaxPool2d(2),                  # 8x8
+            *conv_bn(32, 64),
+            nn.MaxPool2d(2),                  # 4x4
+            *conv_bn(64, 64),
+            nn.AdaptiveAvgPool2d(1),
+        )
+        self.classifier = nn.Sequential(
+            nn.Flatten(),
+            nn.Dropout(0.2),
+            nn.Linear(64, num_classes),
+        )
+
+    def forward(self, x):
+        return self.classifier(self.features(x))
+
+
+def build_tiny_classifier(num_classes: int = 64, in_channels: int = 3) -> nn.Module:
+    return TinyCellClassifier(num_classes, in_channels)
+
+
 class CellClassifierCNN:
     """MobileNetV3 based braille cell classifier for fast inference."""
 
     def __init__(
         self,
-        model_path: str = "app/ml/artifacts/cell_classifier_best.pt",
+        model_path: str = None,
         num_classes: int = 64,
         cell_size: int = 32,
+        backend: str = None,
     ):
+        model_path = model_path or settings.CELL_CLASSIFIER_MODEL_PATH
+        self.backend = InferenceBackend(backend or settings.CELL_CLASSIFIER_BACKEND)
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
         self.cell_size = cell_size
-        self.model = build_mobilenet_classifier(num_classes).to(self.device)
+
+        scripted_path = settings.CELL_CLASSIFIER_TORCHSCRIPT_PATH
+        if self.backend == InferenceBackend.TORCHSCRIPT and os.path.exists(scripted_path):
+            self.device = torch.device("cpu")
+            self.model = load_torchscript_module(scripted_path, optimize=True)
+            self.in_channels = input_channels(self.model)
+            return
+        if self.backend != InferenceBackend.PYTORCH:
+            logger.warning(f"Cell classifier backend '{self.backend.value}' not available, using FP32.")
+            self.backend = InferenceBackend.PYTORCH
+
         if os.path.exists(model_path):
-            self.model.load_state_dict(torch.load(model_path, map_location=self.device))
+            state = torch.load(model_path, map_location=self.device)
+            model = build_mobilenet_classifier(num_classes, in_channels=infer_in_channels(state))
+            model.load_state_dict(state)
             logger.info(f"Loaded CellClassifierCNN from {model_path}")
         else:
+            model = build_mobilenet_classifier(num_classes)
             logger.warning(f"Cell classifier weights not found at {model_path}")
-        self.model.eval()
+        self.in_channels = input_channels(model)
+        self.model = maybe_compile(model.to(self.device).eval())
 
     def preprocess(self, images: List[np.ndarray]) -> np.ndarray:
+        if self.in_channels == 1:
+            return preprocess_gray_cells(images, self.cell_size)
         batch = []
         for img in images:
             if len(img.shape) == 2:
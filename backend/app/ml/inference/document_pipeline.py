@@ -0,0 +1,189 @@
+"""
+Multi-page document recognition (PDF, multi-frame TIFF, or a single image).
+
+Pages are a producer/consumer queue: page indices go out to worker processes,
+each with its own BraillePipeline, which rasterise and recognise their page
+and send back only the (small) result. At most workers * 2 pages are in
+flight, so memory stays bounded for books of any length, and on_page is called
+in the parent as each page completes so results can be persisted
+incrementally. The API and job runner default to DOCUMENT_WORKERS = 1 (pages
+in-process, no pool per request); batch_convert uses every core.
+"""
+import json
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from app.core.config import settings
+from app.ml.preprocessing.ingest import page_count, read_page
+
+logger = logging.getLogger(__name__)
+
+PageCallback = Callable[[Dict[str, Any]], None]
+ErrorCallback = Callable[[str, int, Exception], None]
+
+_worker_pipeline = None
+
+
+def _init_worker(use_onnx: bool) -> None:
+    global _worker_pipeline
+    import torch
+    from app.ml.inference.pipeline import BraillePipeline
+
+    # Pages already use every core; keep each worker's page single-threaded
+    settings.PREPROCESS_WORKERS = 1
+    torch.set_num_threads(1)
+    _worker_pipeline = BraillePipeline(use_onnx=use_onnx)
+
+
+def _recognize_page(path: str, index: int, dpi: Optional[int], pipeline=None, grade: int = 1) -> Dict[str, Any]:
+    t0 = time.perf_counter()
+    image, scale = read_page(path, index, dpi=dpi)
+    result = (pipeline or _worker_pipeline).run(image, input_scale=scale, grade=grade)
+    result["path"] = path
+    result["page_index"] = index
+    result["page_time_ms"] = round((time.perf_counter() - t0) * 1000, 2)
+    return result
+
+
+def resolve_document_workers(workers: int = None) -> int:
+    workers = settings.DOCUMENT_WORKERS if workers is None else workers
+    return workers if workers and workers > 0 else (os.cpu_count() or 1)
+
+
+def run_pages(
+    tasks: Sequence[Tuple[str, int]],
+    on_page: PageCallback,
+    workers: int = None,
+    dpi: int = None,
+    use_onnx: bool = False,
+    pipeline=None,
+    on_error: ErrorCallback = None,
+    grade: int = 1,
+) -> int:
+    """
+    Recognise (path, page_index) tasks, calling on_page with each result as it
+    completes. Without on_error the first failing page raises; with it, the
+    failure is reported and the remaining pages still run. Returns the number
+    of worker processes used (1 means in-process).
+    """
+    workers = min(resolve_document_workers(workers), max(1, len(tasks)))
+
+    if workers == 1:
+        # One page at a time in-process: no pool to spawn, same bounded memory
+        if pipeline is None:
+            from app.ml.inference.pipeline import BraillePipeline
+
+            pipeline = BraillePipeline(use_onnx=use_onnx)
+        for path, index in tasks:
+            try:
+                result = _recognize_page(path, index, dpi, pipeline, grade)
+            except Exception as e:
+                if on_error is None:
+                    raise
+                on_error(path, index, e)
+                continue
+            on_page(result)
+        return workers
+
+    # spawn, not fork: each worker builds its own torch/ONNX state
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(workers, mp_context=context, initializer=_init_worker, initargs=(use_onnx,)) as pool:
+        queue = iter(tasks)
+        in_flight = {}
+        max_in_flight = workers * 2
+        while True:
+            for task in queue:
+                in_flight[pool.submit(_recognize_page, *task, dpi, None, grade)] = task
+                if len(in_flight) >= max_in_flight:
+                    break
+            if not in_flight:
+                break
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                path, index = in_flight.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    if on_error is None:
+                        raise
+                    on_error(path, index, e)
+                    continue
+                on_page(result)
+    return workers
+
+
+def process_document(
+    path: str,
+    on_page: PageCallback = None,
+    workers: int = None,
+    dpi: int = None,
+    use_onnx: bool = False,
+    pages: Iterable[int] = None,
+    pipeline=None,
+    grade: int = 1,
+) -> List[Dict[str, Any]]:
+    """
+    Recognise every page (or the given page indices) of a document.
+    on_page receives each page result as it completes, in completion order;
+    the returned list is ordered by page index. pipeline, if given, is reused
+    when the document runs in-process (one worker).
+    """
+    indices = list(range(page_count(path)) if pages is None else pages)
+    results = []
+
+    def consume(result: Dict[str, Any]) -> None:
+        results.append(result)
+        if on_page is not None:
+            on_page(result)
+
+    workers = run_pages(
+        [(path, index) for index in indices], consume,
+        workers=workers, dpi=dpi, use_onnx=use_onnx, pipeline=pipeline, grade=grade,
+    )
+    results.sort(key=lambda r: r["page_index"])
+    logger.info(f"Processed {len(results)} page(s) of {path} on {workers} worker(s)")
+    return results
+
+
+def merge_page_results(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Combine page results into one document result (pages separated by a form feed)."""
+    cells = sum(r["detected_cells"] for r in results)
+    # Weight page confidence by its cell count so blank pages do not drag it down
+    confidence = (
+        sum(r["confidence"] * r["detected_cells"] for r in results) / cells if cells else 0.0
+    )
+    return {
+        "text": "\f".join(r["text"] for r in results),
+        "detected_cells": cells,
+        "confidence": confidence,
+        "page_count": len(results),
+        "processing_time_ms": round(sum(r["processing_time_ms"] for r in results), 2),
+        "model_version": results[0]["model_version"] if results else "1.0.0",
+        "pages": results,
+    }
+
+
+class JsonlPageWriter:
+    """on_page sink that writes one JSON line per finished page and flushes it."""
+
+    def __init__(self, path: str, append: bool = False):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self._file = open(path, "a" if append else "w", encoding="utf-8")
+        if append and self._file.tell() > 0:
+            with open(path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                # Start on a fresh line if a killed run left a partial record
+                if f.read(1) != b"\n":
+                    self._file.write("\n")
+
+    def __call__(self, result: Dict[str, Any]) -> None:
+        self._file.write(json.dumps(result) + "\n")
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
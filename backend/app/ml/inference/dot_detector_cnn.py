@@ -6,14 +6,38 @@ import os
 import cv2
 from typing import List, Tuple
 
+from app.core.config import settings
+from app.ml.inference.braille_classifier import preprocess_gray_cells
+from app.ml.inference.model_loader import (
+    InferenceBackend,
+    infer_in_channels,
+    input_channels,
+    load_torchscript_module,
+    maybe_compile,
+)
+
 logger = logging.getLogger(__name__)
 
 
+def preprocess_dot_cells(cell_images: List[np.ndarray], cell_size: int = 32, in_channels: int = 3) -> np.ndarray:
+    """Convert cell crops into the NCHW float batch the dot CNN expects."""
+    if in_channels == 1:
+        return preprocess_gray_cells(cell_images, cell_size)
+    batch = []
+    for img in cell_images:
+        if len(img.shape) == 2:
+            img = cv2.cvtColor(img, cv2.COLOR_GRAY2RGB)
+        img = cv2.resize(img, (cell_size, cell_size)).astype(np.float32) / 255.0
+        img = (img - 0.5) / 0.5
+        batch.append(img.transpose(2, 0, 1))
+    return np.stack(batch).astype(np.float32)
+
+
 class DotDetectorCNNModel(nn.Module):
-    def __init__(self):
+    def __init__(self, in_channels: int = 3):
         super().__init__()
         self.features = nn.Sequential(
-            nn.Conv2d(3, 32, 3, padding=1), nn.BatchNorm2d(32), nn.ReLU(inplace=True),
+            nn.Conv2d(in_channels, 32, 3, padding=1), nn.BatchNorm2d(32), nn.ReLU(inplace=True),
             nn.Conv2d(32, 32, 3, padding=1), nn.BatchNorm2d(32), nn.ReLU(inplace=True),
             nn.MaxPool2d(2),
             nn.Conv2d(32, 64, 3, padding=1), nn.BatchNorm2d(64), nn.ReLU(inplace=True),
@@ -38,29 +62,44 @@ class DotDetectorCNNModel(nn.Module):
 class DotDetectorInference:
     """Run dot presence detection per Braille cell using trained CNN."""
 
-    def __init__(self, model_path: str = "app/ml/artifacts/dot_detector_best.pt"):
+    def __init__(self, model_path: str = None, backend: str = None):
+        model_path = model_path or settings.DOT_DETECTOR_MODEL_PATH
+        self.backend = InferenceBackend(backend or settings.DOT_DETECTOR_BACKEND)
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-        self.model = DotDetectorCNNModel().to(self.device)
-        if os.path.exists(model_path):
-            self.model.load_state_dict(torch.load(model_path, map_location=self.device))
-            logger.info(f"Loaded dot detector from {model_path}")
-        else:
-            logger.warning(f"Dot detector weights not found at {model_path}")
+        self.model = None
+
+        scripted_path = {
+            InferenceBackend.PYTORCH_INT8: settings.DOT_DETECTOR_QUANTIZED_PATH,
+            InferenceBackend.TORCHSCRIPT: settings.DOT_DETECTOR_TORCHSCRIPT_PATH,
+        }.get(self.backend)
+        if scripted_path and os.path.exists(scripted_path):
+            self.device = torch.device("cpu")
+            self.model = load_torchscript_module(
+                scripted_path, optimize=self.backend == InferenceBackend.TORCHSCRIPT
+            )
+        elif self.backend != InferenceBackend.PYTORCH:
+            logger.warning(f"Dot detector backend '{self.backend.value}' not available, using FP32.")
+            self.backend = InferenceBackend.PYTORCH
+
+        if self.model is None:
+            if os.path.exists(model_path):
+                state = torch.load(model_path, map_location=self.device)
+                model = DotDetectorCNNModel(in_channels=infer_in_channels(state))
+                model.load_state_dict(state)
+                logger.info(f"Loaded dot detector from {model_path}")
+            else:
+                model = DotDetectorCNNModel()
+                logger.warning(f"Dot detector weights not found at {model_path}")
+            self.model = maybe_compile(model.to(self.device).eval())
+        self.in_channels = input_channels(self.model)
         self.model.eval()
 
     def predict(self, cell_images: List[np.ndarray], threshold: float = 0.5) -> List[Tuple[int, List[bool]]]:
         if not cell_images:
             return []
 
-        batch = []
-        for img in cell_images:
-            if len(img.shape) == 2:
-                img = cv2.cvtColor(img, cv2.COLOR_GRAY2RGB)
-            img = cv2.resize(img, (32, 32)).astype(np.float32) / 255.0
-            img = (img - [0.5, 0.5, 0.5]) / [0.5, 0.5, 0.5]
-            batch.append(img.transpose(2, 0, 1))
-
-        tensor = torch.from_numpy(np.stack(batch)).float().to(self.device)
+        batch = preprocess_dot_cells(cell_images, in_channels=self.in_channels)
+        tensor = torch.from_numpy(batch).to(self.device)
         with torch.no_grad():
             logits = self.model(tensor)
             probs = torch.sigmoid(logits).cpu().numpy()
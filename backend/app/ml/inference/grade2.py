@@ -0,0 +1,299 @@
+"""
+Grade 2 (contracted, UEB) Braille decoding.
+
+Contractions, groupsigns and wordsigns are compiled once into a trie over cell
+patterns (same bit layout as PATTERN_TO_CHAR: bit0 = dot 1 ... bit5 = dot 6).
+Each word is decoded by a greedy longest match from each position, and no
+contraction is longer than two cells, so decoding is linear in the number of
+cells. Each trie entry records where in a word it may appear. For example,
+dots 23 is "be" at the start of a word, "bb" in the middle and ";" at the end.
+
+Coverage: alphabetic, strong and lower wordsigns, strong and lower
+groupsigns, initial- and final-letter contractions, common shortforms,
+capital (single and word), number and grade 1 indicators. Rarer UEB rules
+(passage indicators, typeform indicators, lower-sign sequencing exceptions)
+are not modelled.
+"""
+import re
+import logging
+from functools import lru_cache
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def dots(spec: str) -> int:
+    """Cell pattern from a dot-number string, e.g. "1246" -> ed ("0" is the empty cell)."""
+    return sum(1 << (int(d) - 1) for d in spec if d != "0")
+
+
+def cells(spec: str) -> Tuple[int, ...]:
+    """Cell sequence from dot-number strings separated by "-", e.g. "5-145" -> day."""
+    return tuple(dots(s) for s in spec.split("-"))
+
+
+# Positions in a word where a sign may be read as the given expansion
+START, MIDDLE, END, WHOLE = 1, 2, 4, 8
+ANYWHERE = START | MIDDLE | END | WHOLE
+
+SPACE = 0
+CAPITAL = dots("6")
+NUMBER = dots("3456")
+GRADE1 = dots("56")
+HYPHEN = dots("36")
+
+LETTERS = {
+    dots(d): c for d, c in [
+        ("1", "a"), ("12", "b"), ("14", "c"), ("145", "d"), ("15", "e"), ("124", "f"),
+        ("1245", "g"), ("125", "h"), ("24", "i"), ("245", "j"), ("13", "k"), ("123", "l"),
+        ("134", "m"), ("1345", "n"), ("135", "o"), ("1234", "p"), ("12345", "q"),
+        ("1235", "r"), ("234", "s"), ("2345", "t"), ("136", "u"), ("1236", "v"),
+        ("2456", "w"), ("1346", "x"), ("13456", "y"), ("1356", "z"),
+    ]
+}
+DIGITS = {dots(d): str((i + 1) % 10) for i, d in enumerate(["1", "12", "14", "145", "15", "124", "1245", "125", "24", "245"])}
+
+# Punctuation read at the end of a word (lower cells there are not groupsigns)
+TRAILING_PUNCTUATION = {
+    dots("2"): ",", dots("23"): ";", dots("25"): ":", dots("256"): ".",
+    dots("235"): "!", dots("236"): "?", dots("356"): '"',
+}
+LEADING_PUNCTUATION = {dots("236"): '"'}
+LITERALS = {dots("3"): "'", HYPHEN: "-"}
+
+# Alphabetic wordsigns: a letter standing alone is a word
+ALPHABETIC_WORDSIGNS = {
+    "b": "but", "c": "can", "d": "do", "e": "every", "f": "from", "g": "go", "h": "have",
+    "j": "just", "k": "knowledge", "l": "like", "m": "more", "n": "not", "p": "people",
+    "q": "quite", "r": "rather", "s": "so", "t": "that", "u": "us", "v": "very",
+    "w": "will", "x": "it", "y": "you", "z": "as",
+}
+
+# (cells, expansion, positions) read inside words
+GROUPSIGNS: List[Tuple[str, str, int]] = [
+    # Strong contractions
+    ("12346", "and", ANYWHERE), ("123456", "for", ANYWHERE), ("12356", "of", ANYWHERE),
+    ("2346", "the", ANYWHERE), ("23456", "with", ANYWHERE),
+    # Strong groupsigns
+    ("16", "ch", ANYWHERE), ("126", "gh", ANYWHERE), ("146", "sh", ANYWHERE),
+    ("1456", "th", ANYWHERE), ("156", "wh", ANYWHERE), ("1246", "ed", ANYWHERE),
+    ("12456", "er", ANYWHERE), ("1256", "ou", ANYWHERE), ("246", "ow", ANYWHERE),
+    ("34", "st", ANYWHERE), ("345", "ar", ANYWHERE), ("346", "ing", MIDDLE | END),
+    # Lower groupsigns
+    ("23", "be", START), ("25", "con", START), ("256", "dis", START),
+    ("2", "ea", MIDDLE), ("23", "bb", MIDDLE), ("25", "cc", MIDDLE),
+    ("235", "ff", MIDDLE), ("2356", "gg", MIDDLE),
+    ("26", "en", ANYWHERE), ("35", "in", ANYWHERE),
+    # Initial-letter contractions
+    ("5-145", "day", ANYWHERE), ("5-15", "ever", ANYWHERE), ("5-124", "father", ANYWHERE),
+    ("5-125", "here", ANYWHERE), ("5-13", "know", ANYWHERE), ("5-123", "lord", ANYWHERE),
+    ("5-134", "mother", ANYWHERE), ("5-1345", "name", ANYWHERE), ("5-135", "one", ANYWHERE),
+    ("5-1234", "part", ANYWHERE), ("5-12345", "question", ANYWHERE), ("5-1235", "right", ANYWHERE),
+    ("5-234", "some", ANYWHERE), ("5-2345", "time", ANYWHERE), ("5-136", "under", ANYWHERE),
+    ("5-2456", "work", ANYWHERE), ("5-13456", "young", ANYWHERE), ("5-1456", "there", ANYWHERE),
+    ("5-16", "character", ANYWHERE), ("5-156", "where", ANYWHERE), ("5-1256", "ought", ANYWHERE),
+    ("45-136", "upon", ANYWHERE), ("45-2456", "word", ANYWHERE), ("45-1456", "these", ANYWHERE),
+    ("45-156", "whose", ANYWHERE), ("456-14", "cannot", ANYWHERE), ("456-125", "had", ANYWHERE),
+    ("456-134", "many", ANYWHERE), ("456-234", "spirit", ANYWHERE), ("456-2456", "world", ANYWHERE),
+    ("456-1456", "their", ANYWHERE),
+    # Final-letter groupsigns (never at the start of a word)
+    ("46-145", "ound", MIDDLE | END), ("46-15", "ance", MIDDLE | END), ("46-1345", "sion", MIDDLE | END),
+    ("46-234", "less", MIDDLE | END), ("46-2345", "ount", MIDDLE | END),
+    ("56-15", "ence", MIDDLE | END), ("56-1245", "ong", MIDDLE | END), ("56-123", "ful", MIDDLE | END),
+    ("56-1345", "tion", MIDDLE | END), ("56-234", "ness", MIDDLE | END), ("56-2345", "ment", MIDDLE | END),
+    ("56-13456", "ity", MIDDLE | END),
+]
+
+# Signs that are a whole word only when they stand alone
+WORDSIGNS: List[Tuple[str, str]] = [
+    # Strong wordsigns
+    ("16", "child"), ("146", "shall"), ("1456", "this"), ("156", "which"),
+    ("1256", "out"), ("34", "still"),
+    # Lower wordsigns
+    ("23", "be"), ("26", "enough"), ("2356", "were"), ("236", "his"), ("35", "in"), ("356", "was"),
+    # Shortforms
+    ("1-12", "about"), ("1-12-1236", "above"), ("1-14", "according"), ("1-14-1235", "across"),
+    ("1-124", "after"), ("1-124-1345", "afternoon"), ("1-124-2456", "afterward"),
+    ("1-1245", "again"), ("1-1245-34", "against"), ("1-123-134", "almost"),
+    ("1-123-1235", "already"), ("1-123", "also"), ("1-123-1456", "although"),
+    ("1-123-2345", "altogether"), ("1-123-2456", "always"), ("23-14", "because"),
+    ("23-124", "before"), ("23-125", "behind"), ("23-123", "below"), ("23-1345", "beneath"),
+    ("23-234", "beside"), ("23-2345", "between"), ("23-13456", "beyond"),
+    ("12-1235-123", "braille"), ("14-145", "could"), ("124-1235", "friend"),
+    ("1245-145", "good"), ("1245-1235-2345", "great"), ("125-134", "him"),
+    ("125-134-124", "himself"), ("24-134-134", "immediate"), ("123-1235", "letter"),
+    ("123-123", "little"), ("134-16", "much"), ("134-34", "must"), ("134-13456-124", "myself"),
+    ("1345-15-14", "necessary"), ("1345-15-24", "neither"), ("1234-145", "paid"),
+    ("12345-13", "quick"), ("234-145", "said"), ("2345-145", "today"),
+    ("2345-1245-1235", "together"), ("2345-134", "tomorrow"), ("2345-1345", "tonight"),
+    ("2456-145", "would"), ("1346-234", "its"), ("13456-1235", "your"),
+    ("13456-1235-124", "yourself"),
+]
+
+_TERMINAL = -1
+# A word in Unicode Braille: a run of non-blank 6-dot cells (U+2801-U+283F)
+_UNICODE_WORD = re.compile("[\u2801-\u283f]+")
+_BLANK_TO_SPACE = {0x2800: " "}
+# Distinct words memoised per decoder; books reuse a small vocabulary
+WORD_CACHE_SIZE = 65536
+# Stands in for an unreadable cell while decoding, so it can be told apart from
+# a real "?" (dots 236) before both are printed as "?"
+_UNREAD = "\x00"
+
+
+def _compile_trie(entries: Iterable[Tuple[Tuple[int, ...], str, int]]) -> Dict:
+    root: Dict = {}
+    for seq, expansion, positions in entries:
+        node = root
+        for cell in seq:
+            node = node.setdefault(cell, {})
+        node.setdefault(_TERMINAL, []).append((positions, expansion))
+    return root
+
+
+class Grade2Decoder:
+    def __init__(self):
+        entries = [(cells(spec), expansion, positions) for spec, expansion, positions in GROUPSIGNS]
+        entries += [((cell,), letter, ANYWHERE) for cell, letter in LETTERS.items()]
+        self._trie = _compile_trie(entries)
+        self._max_depth = max(len(seq) for seq, _, _ in entries)
+        words = {cells(spec): expansion for spec, expansion in WORDSIGNS}
+        letter_cells = {c: cell for cell, c in LETTERS.items()}
+        for letter, word in ALPHABETIC_WORDSIGNS.items():
+            words[(letter_cells[letter],)] = word
+        self._words = words
+        self._decode_unicode_word = lru_cache(maxsize=WORD_CACHE_SIZE)(self._decode_unicode_word)
+
+    def decode_patterns(self, patterns: Sequence[int]) -> str:
+        """Decode a sequence of cell patterns (space = empty cell) to text."""
+        out = []
+        word: List[int] = []
+        for pattern in patterns:
+            if pattern == SPACE:
+                if word:
+                    out.append(self.decode_word(word))
+                    word = []
+                out.append(" ")
+            else:
+                word.append(pattern)
+        if word:
+            out.append(self.decode_word(word))
+        return "".join(out)
+
+    def decode_unicode(self, braille: str) -> str:
+        """Decode Unicode Braille (U+2800-U+283F); other characters pass through."""
+        return self.decode_unicode_scored(braille)[0]
+
+    def decode_unicode_scored(self, braille: str) -> Tuple[str, int]:
+        """decode_unicode, plus the number of cells it could not read (printed as "?")."""
+        unread = 0
+
+        def word(match) -> str:
+            nonlocal unread
+            text, missed = self._decode_unicode_word(match.group())
+            unread += missed
+            return text
+
+        text = _UNICODE_WORD.sub(word, braille)
+        return text.translate(_BLANK_TO_SPACE), unread
+
+    def _decode_unicode_word(self, word: str) -> Tuple[str, int]:
+        text = self._decode_word([ord(ch) - 0x2800 for ch in word])
+        return text.replace(_UNREAD, "?"), text.count(_UNREAD)
+
+    def decode_word(self, word: Sequence[int]) -> str:
+        """Decode one space-delimited word (which may carry punctuation and hyphens)."""
+        return self._decode_word(word).replace(_UNREAD, "?")
+
+    def _decode_word(self, word: Sequence[int]) -> str:
+        # Hyphenated compounds are decoded part by part
+        if HYPHEN in word[1:-1]:
+            parts, current = [], []
+            for cell in word:
+                if cell == HYPHEN and current:
+                    parts.append(current)
+                    current = []
+                else:
+                    current.append(cell)
+            parts.append(current)
+            return "-".join(self._decode_word(p) for p in parts)
+
+        lead, start, end, trail = "", 0, len(word), []
+        if len(word) > 1 and word[0] in LEADING_PUNCTUATION:
+            lead, start = LEADING_PUNCTUATION[word[0]], 1
+        while end - start > 1 and word[end - 1] in TRAILING_PUNCTUATION:
+            end -= 1
+            trail.append(TRAILING_PUNCTUATION[word[end]])
+        core = word[start:end]
+
+        capital = 0
+        while capital < 2 and capital < len(core) - 1 and core[capital] == CAPITAL:
+            capital += 1
+        core = core[capital:]
+        text = self._decode_core(tuple(core))
+        if capital == 2:
+            text = text.upper()
+        elif capital == 1:
+            text = text[:1].upper() + text[1:]
+        return lead + text + "".join(reversed(trail))
+
+    def _decode_core(self, core: Tuple[int, ...]) -> str:
+        if core in self._words:
+            return self._words[core]
+        if core and core[0] == GRADE1:
+            # Grade 1 indicator: a single letter (56) or the whole word (56-56) is literal
+            literal = core[2:] if len(core) > 2 and core[1] == GRADE1 else core[1:]
+            return "".join(LETTERS.get(c, LITERALS.get(c, _UNREAD)) for c in literal)
+
+        out = []
+        n, i = len(core), 0
+        capital_next = number = False
+        while i < n:
+            cell = core[i]
+            if cell == CAPITAL:
+                capital_next = True
+                i += 1
+                continue
+            if cell == NUMBER:
+                number = True
+                i += 1
+                continue
+            if number:
+                if cell in DIGITS:
+                    out.append(DIGITS[cell])
+                    i += 1
+                    continue
+                if cell in (dots("2"), dots("256")) and i + 1 < n and core[i + 1] in DIGITS:
+                    out.append("," if cell == dots("2") else ".")
+                    i += 1
+                    continue
+                number = False
+
+            # Longest allowed match starting at i
+            node, j, best = self._trie, i, None
+            while j < n and j - i < self._max_depth and core[j] in node:
+                node = node[core[j]]
+                j += 1
+                for positions, expansion in node.get(_TERMINAL, ()):
+                    if self._allowed(positions, i, j, n):
+                        best = (j, expansion)
+                        break
+            if best is None:
+                expansion = LITERALS.get(cell) or TRAILING_PUNCTUATION.get(cell, _UNREAD)
+                best = (i + 1, expansion)
+            i, expansion = best
+            if capital_next:
+                expansion = expansion[:1].upper() + expansion[1:]
+                capital_next = False
+            out.append(expansion)
+        return "".join(out)
+
+    @staticmethod
+    def _allowed(positions: int, i: int, j: int, n: int) -> bool:
+        if i == 0 and j == n:
+            return bool(positions & WHOLE)
+        if i == 0:
+            return bool(positions & START)
+        if j == n:
+            return bool(positions & END)
+        return bool(positions & MIDDLE)
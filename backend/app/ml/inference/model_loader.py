@@ -1,5 +1,10 @@
 import os
+import json
 import logging
+from enum import Enum
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
 import torch
 import onnxruntime as ort
 from torchvision import models
@@ -9,10 +14,80 @@ from app.core.config import settings
 logger = logging.getLogger(__name__)
 
 _cached_models = {}
+_validated_backends = set()
+_torchscript_channels = {}
+
+# Extra file stored alongside TorchScript artefacts recording the model's input channels
+TORCHSCRIPT_CHANNELS_FILE = "input_channels"
+
+
+class InferenceBackend(str, Enum):
+    PYTORCH = "pytorch"
+    PYTORCH_INT8 = "pytorch-int8"
+    ONNX = "onnx"
+    ONNX_INT8 = "onnx-int8"
+    TORCHSCRIPT = "torchscript"
+
+
+# Each backend falls back to a less optimised artefact of the same runtime first,
+# and every chain ends at the eager FP32 model, which always loads.
+FALLBACK_CHAINS = {
+    InferenceBackend.PYTORCH: [InferenceBackend.PYTORCH],
+    InferenceBackend.PYTORCH_INT8: [InferenceBackend.PYTORCH_INT8, InferenceBackend.PYTORCH],
+    InferenceBackend.ONNX: [InferenceBackend.ONNX, InferenceBackend.PYTORCH],
+    InferenceBackend.ONNX_INT8: [InferenceBackend.ONNX_INT8, InferenceBackend.ONNX, InferenceBackend.PYTORCH],
+    InferenceBackend.TORCHSCRIPT: [InferenceBackend.TORCHSCRIPT, InferenceBackend.PYTORCH],
+}
+
+# INT8 kernels and optimize_for_inference (MKLDNN) artefacts are CPU-only
+CPU_ONLY_BACKENDS = {InferenceBackend.PYTORCH_INT8, InferenceBackend.TORCHSCRIPT}
+
+
+def maybe_compile(model: nn.Module) -> nn.Module:
+    """Wrap an eager model with torch.compile when settings.TORCH_COMPILE is on."""
+    if not settings.TORCH_COMPILE:
+        return model
+    # Inductor reads the cache location from the environment; keep compiled
+    # graphs across process restarts so only the first deployment pays for them.
+    os.environ["TORCHINDUCTOR_CACHE_DIR"] = os.path.abspath(settings.TORCH_COMPILE_CACHE_DIR)
+    try:
+        import torch._inductor.config as inductor_config
+        inductor_config.fx_graph_cache = True
+        return torch.compile(model, mode=settings.TORCH_COMPILE_MODE, dynamic=True)
+    except Exception as e:
+        logger.warning(f"torch.compile unavailable: {e}, using eager mode.")
+        return model
+
+
+def load_torchscript_module(path: str, optimize: bool = False) -> torch.jit.ScriptModule:
+    """
+    Load a TorchScript artefact onto the CPU, cached by path. With optimize=True
+    the frozen graph is rewritten by torch.jit.optimize_for_inference (FP32 only).
+    """
+    global _cached_models
+    cache_key = f"torchscript:{os.path.abspath(path)}:{optimize}"
+    if cache_key in _cached_models:
+        return _cached_models[cache_key]
+
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"TorchScript model not found: {path}")
+
+    extra_files = {TORCHSCRIPT_CHANNELS_FILE: ""}
+    model = torch.jit.load(path, map_location="cpu", _extra_files=extra_files)
+    model.eval()
+    if optimize:
+        model = torch.jit.optimize_for_inference(model)
+    # Artefacts exported before single-channel support carry no metadata and are RGB
+    _torchscript_channels[id(model)] = int(extra_files[TORCHSCRIPT_CHANNELS_FILE] or 3)
+    _cached_models[cache_key] = model
+    logger.info(f"Loaded TorchScript model from {path}")
+    return model
 
 
-def _build_classifier_arch(num_classes: int = 64) -> nn.Module:
+def _build_classifier_arch(num_classes: int = 64, in_channels: int = 3) -> nn.Module:
     model = models.resnet18(weights=None)
+    if in_channels != 3:
+        model.conv1 = nn.Conv2d(in_channels, 64, kernel_size=7, stride=2, padding=3, bias=False)
     in_features = model.fc.in_features
     model.fc = nn.Sequential(
         nn.Dropout(0.4),
@@ -24,6 +99,73 @@ def _build_classifier_arch(num_classes: int = 64) -> nn.Module:
     return model
 
 
+def _classifier_builders() -> Dict[str, Callable[..., nn.Module]]:
+    # Imported lazily: cell_classifier_cnn imports this module for InferenceBackend
+    from app.ml.inference.cell_classifier_cnn import build_mobilenet_classifier, build_tiny_classifier
+
+    return {
+        "resnet18": _build_classifier_arch,
+        "mobilenet_v3_small": build_mobilenet_classifier,
+        "tiny": build_tiny_classifier,
+    }
+
+
+def build_classifier_arch(arch: str = "resnet18", num_classes: int = 64, in_channels: int = 3) -> nn.Module:
+    """Build an untrained serving classifier by registered architecture name."""
+    builders = _classifier_builders()
+    if arch not in builders:
+        raise ValueError(f"Unknown classifier architecture '{arch}'. Choose from: {sorted(builders)}")
+    return builders[arch](num_classes, in_channels=in_channels)
+
+
+def infer_in_channels(state_dict: Dict[str, torch.Tensor]) -> int:
+    """Input channels of a checkpoint, read from its first convolution weight."""
+    for tensor in state_dict.values():
+        if tensor.ndim == 4:
+            return int(tensor.shape[1])
+    return 3
+
+
+def input_channels(model: Any) -> int:
+    """Input channels expected by a loaded model, TorchScript module or ONNX session."""
+    if isinstance(model, ort.InferenceSession):
+        channels = model.get_inputs()[0].shape[1]
+        return channels if isinstance(channels, int) else 3
+    if isinstance(model, torch.jit.ScriptModule):
+        return _torchscript_channels.get(id(model), 3)
+    for module in model.modules():
+        if isinstance(module, nn.Conv2d):
+            return module.in_channels
+    return 3
+
+
+def load_serving_manifest() -> Optional[Dict[str, Any]]:
+    """Read the promotion manifest written by export.promote_model, if any."""
+    path = settings.SERVING_MANIFEST_PATH
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def resolve_serving_classifier() -> Dict[str, str]:
+    """
+    Resolve which classifier architecture and FP32 artefacts to serve.
+    CLASSIFIER_ARCH="auto" follows the promotion manifest, falling back to ResNet18.
+    """
+    resolved = {
+        "arch": settings.CLASSIFIER_ARCH,
+        "weights_path": settings.CLASSIFIER_MODEL_PATH,
+        "onnx_path": settings.CLASSIFIER_ONNX_PATH,
+    }
+    if resolved["arch"] == "auto":
+        manifest = load_serving_manifest() or {}
+        resolved["arch"] = manifest.get("arch", "resnet18")
+        resolved["weights_path"] = manifest.get("weights_path") or resolved["weights_path"]
+        resolved["onnx_path"] = manifest.get("onnx_path") or resolved["onnx_path"]
+    return resolved
+
+
 def load_pytorch_classifier(device: torch.device = None) -> nn.Module:
     global _cached_models
     if "classifier_pt" in _cached_models:
@@ -32,40 +174,145 @@ def load_pytorch_classifier(device: torch.device = None) -> nn.Module:
     if device is None:
         device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
 
-    model = _build_classifier_arch(num_classes=settings.NUM_BRAILLE_CLASSES)
-    path = settings.CLASSIFIER_MODEL_PATH
+    serving = resolve_serving_classifier()
+    path = serving["weights_path"]
     if os.path.exists(path):
         state = torch.load(path, map_location=device)
+        model = build_classifier_arch(
+            serving["arch"], num_classes=settings.NUM_BRAILLE_CLASSES, in_channels=infer_in_channels(state)
+        )
         model.load_state_dict(state)
-        logger.info(f"Loaded classifier from {path}")
+        logger.info(f"Loaded {serving['arch']} classifier from {path}")
     else:
+        model = build_classifier_arch(serving["arch"], num_classes=settings.NUM_BRAILLE_CLASSES)
         logger.warning(f"Classifier weights not found at {path}, using random weights.")
 
     model.to(device).eval()
+    model = maybe_compile(model)
     _cached_models["classifier_pt"] = model
     return model
 
 
-def load_onnx_classifier() -> ort.InferenceSession:
+def load_quantized_classifier() -> torch.jit.ScriptModule:
+    """Load the static INT8 TorchScript classifier produced by quantize_static."""
+    return load_torchscript_module(settings.CLASSIFIER_QUANTIZED_PATH)
+
+
+def load_onnx_classifier(quantized: bool = False) -> ort.InferenceSession:
     global _cached_models
-    if "classifier_onnx" in _cached_models:
-        return _cached_models["classifier_onnx"]
+    cache_key = "classifier_onnx_int8" if quantized else "classifier_onnx"
+    if cache_key in _cached_models:
+        return _cached_models[cache_key]
 
     providers = (
         ["CUDAExecutionProvider", "CPUExecutionProvider"]
         if ort.get_device() == "GPU"
         else ["CPUExecutionProvider"]
     )
-    path = settings.CLASSIFIER_ONNX_PATH
+    path = settings.CLASSIFIER_ONNX_INT8_PATH if quantized else resolve_serving_classifier()["onnx_path"]
     if not os.path.exists(path):
         raise FileNotFoundError(f"ONNX classifier not found: {path}")
 
     session = ort.InferenceSession(path, providers=providers)
-    _cached_models["classifier_onnx"] = session
+    _cached_models[cache_key] = session
     logger.info(f"Loaded ONNX classifier from {path}")
     return session
 
 
+def load_torchscript_classifier() -> torch.jit.ScriptModule:
+    """Load the frozen FP32 TorchScript classifier produced by export_torchscript."""
+    return load_torchscript_module(settings.CLASSIFIER_TORCHSCRIPT_PATH, optimize=True)
+
+
+def forward_logits(model: Any, batch: np.ndarray, device: torch.device = None) -> np.ndarray:
+    """Run a loaded classifier (torch module or ONNX session) on an NCHW float batch."""
+    if isinstance(model, ort.InferenceSession):
+        inp_name = model.get_inputs()[0].name
+        return model.run(None, {inp_name: batch})[0]
+    tensor = torch.from_numpy(batch).to(device or "cpu")
+    with torch.no_grad():
+        return model(tensor).cpu().numpy()
+
+
+def _reference_batch(in_channels: int = 3) -> np.ndarray:
+    """One clean synthetic cell per pattern, preprocessed as at serving time."""
+    key = f"reference_batch_{in_channels}"
+    if key not in _cached_models:
+        from app.ml.inference.braille_classifier import preprocess_cells
+        from app.ml.training.generate_synthetic_data import render_braille_cell
+
+        cells = [render_braille_cell(p, settings.CELL_SIZE, add_noise=False) for p in range(64)]
+        _cached_models[key] = preprocess_cells(cells, in_channels=in_channels)
+    return _cached_models[key]
+
+
+def validate_classifier(backend: InferenceBackend, model: Any, device: torch.device = None):
+    """
+    Check an optimised artefact on the reference batch: output shape, finite
+    logits and top-1 agreement with the FP32 model when its weights exist.
+    """
+    if backend == InferenceBackend.PYTORCH or backend in _validated_backends:
+        return
+
+    batch = _reference_batch(input_channels(model))
+    logits = forward_logits(model, batch, device)
+    expected = (len(batch), settings.NUM_BRAILLE_CLASSES)
+    if logits.shape != expected:
+        raise ValueError(f"{backend.value} classifier output shape {logits.shape}, expected {expected}")
+    if not np.isfinite(logits).all():
+        raise ValueError(f"{backend.value} classifier produced non-finite logits")
+
+    if os.path.exists(resolve_serving_classifier()["weights_path"]):
+        fp32 = load_pytorch_classifier(device)
+        reference = forward_logits(fp32, _reference_batch(input_channels(fp32)), device)
+        agreement = float((reference.argmax(axis=1) == logits.argmax(axis=1)).mean())
+        if agreement < settings.CLASSIFIER_MIN_AGREEMENT:
+            raise ValueError(
+                f"{backend.value} classifier agrees with FP32 on {agreement:.1%} of the "
+                f"reference batch (minimum {settings.CLASSIFIER_MIN_AGREEMENT:.1%})"
+            )
+        logger.info(f"{backend.value} classifier agreement with FP32: {agreement:.1%}")
+
+    _validated_backends.add(backend)
+
+
+def _load_classifier_artefact(backend: InferenceBackend, device: torch.device) -> Any:
+    if backend == InferenceBackend.PYTORCH:
+        return load_pytorch_classifier(device)
+    if backend == InferenceBackend.PYTORCH_INT8:
+        return load_quantized_classifier()
+    if backend == InferenceBackend.ONNX:
+        return load_onnx_classifier()
+    if backend == InferenceBackend.ONNX_INT8:
+        return load_onnx_classifier(quantized=True)
+    return load_torchscript_classifier()
+
+
+def load_classifier(backend: str = None, device: torch.device = None) -> Tuple[InferenceBackend, Any]:
+    """
+    Load and validate the classifier for the requested backend, walking its
+    fallback chain until an artefact loads and passes validation.
+    Returns the backend actually used together with the model or ONNX session.
+    """
+    requested = InferenceBackend(backend or settings.CLASSIFIER_BACKEND)
+    if device is None:
+        device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+
+    for candidate in FALLBACK_CHAINS[requested]:
+        candidate_device = torch.device("cpu") if candidate in CPU_ONLY_BACKENDS else device
+        try:
+            model = _load_classifier_artefact(candidate, candidate_device)
+            validate_classifier(candidate, model, candidate_device)
+        except Exception as e:
+            logger.warning(f"Classifier backend '{candidate.value}' unavailable: {e}")
+            continue
+        if candidate != requested:
+            logger.warning(f"Classifier backend '{requested.value}' fell back to '{candidate.value}'")
+        return candidate, model
+
+    raise RuntimeError(f"No classifier backend could be loaded for '{requested.value}'")
+
+
 def load_onnx_detector() -> ort.InferenceSession:
     global _cached_models
     if "detector_onnx" in _cached_models:
@@ -89,4 +336,6 @@ def load_onnx_detector() -> ort.InferenceSession:
 def clear_model_cache():
     global _cached_models
     _cached_models.clear()
+    _validated_backends.clear()
+    _torchscript_channels.clear()
     logger.info("Model cache cleared.")
\ No newline at end of file
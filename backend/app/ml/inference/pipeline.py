@@ -1,18 +1,20 @@
 import time
 import logging
 import numpy as np
-import cv2
 import torch
 from typing import Dict, Any, List
 from PIL import Image
 
 from app.ml.preprocessing.binarize import binarize_image
+from app.ml.preprocessing.color import to_gray
 from app.ml.preprocessing.denoise import denoise_image, enhance_contrast
+from app.ml.preprocessing.ingest import Buffer, decode_file, decode_image
 from app.ml.preprocessing.perspective import correct_perspective
-from app.ml.preprocessing.resize import resize_image, resize_cell
+from app.ml.preprocessing.resize import normalize_resolution, resize_image, resize_cell
+from app.ml.preprocessing.unwarp import unwarp_image
 from app.ml.inference.braille_detector import BrailleDetector
 from app.ml.inference.braille_classifier import BrailleClassifier
-from app.ml.inference.postprocess import PostProcessor
+from app.ml.inference.postprocess import PATTERN_TO_CHAR, PostProcessor
 from app.ml.nlp.nlp_postprocess import NLPPostProcessor
 from app.core.config import settings
 
@@ -31,19 +33,56 @@ class BraillePipeline:
         self.classifier = BrailleClassifier(use_onnx=use_onnx)
         self.postprocessor = PostProcessor()
         self.nlp = NLPPostProcessor()
+        self.beam_decoder = None
+        if settings.TEXT_DECODER == "beam":
+            from app.ml.inference.beam_decoder import load_beam_decoder
+
+            self.beam_decoder = load_beam_decoder(self.postprocessor)
+        # Running estimate of unwarp cost, used to keep the optional stage within budget
+        self._unwarp_ms_per_mpx = 0.0
         logger.info(f"BraillePipeline initialized (ONNX={use_onnx})")
 
-    def run(self, image: np.ndarray) -> Dict[str, Any]:
+    def _unwarp_within_budget(self, image: np.ndarray) -> np.ndarray:
+        megapixels = image.shape[0] * image.shape[1] / 1e6
+        predicted_ms = self._unwarp_ms_per_mpx * megapixels
+        if predicted_ms > settings.UNWARP_BUDGET_MS:
+            logger.debug(f"Skipping unwarp: predicted {predicted_ms:.1f} ms > budget {settings.UNWARP_BUDGET_MS} ms")
+            return image
+
+        start = time.perf_counter()
+        image = unwarp_image(image)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        observed = elapsed_ms / max(megapixels, 1e-6)
+        self._unwarp_ms_per_mpx = observed if self._unwarp_ms_per_mpx == 0.0 else (
+            0.8 * self._unwarp_ms_per_mpx + 0.2 * observed
+        )
+        logger.debug(f"Unwarp took {elapsed_ms:.1f} ms")
+        return image
+
+    def run(self, image: np.ndarray, input_scale: float = 1.0, grade: int = 1) -> Dict[str, Any]:
+        """
+        image is used in place (grayscale input is never copied); input_scale is
+        the decoded/native size ratio when the ingest layer decoded at reduced size.
+        """
         t0 = time.time()
 
-        # Step 1: Preprocess
+        # Step 1: Preprocess. Dots carry no colour, so convert once here and keep
+        # every stage single-channel; the detector broadcasts gray if it needs 3 channels.
+        image = to_gray(image)
+        # Bring cells to a canonical size so later stages cost the same at any scan DPI
+        scale, dot_pitch = 1.0, None
+        if settings.RESOLUTION_NORMALIZATION:
+            image, scale, dot_pitch = normalize_resolution(image)
+        scale *= input_scale
         image = correct_perspective(image)
-        image = denoise_image(image, method="bilateral")
+        if settings.UNWARP_ENABLED:
+            image = self._unwarp_within_budget(image)
+        image = denoise_image(image, method=settings.DENOISE_METHOD)
         image = enhance_contrast(image)
-        binary = binarize_image(image, method="adaptive")
+        binary = binarize_image(image, method=settings.BINARIZE_METHOD)
 
         # Step 2: Detect Braille cells
-        cell_boxes = self.detector.detect(image)
+        cell_boxes = self.detector.detect(image, binary=binary, dot_pitch=dot_pitch)
         logger.info(f"Detected {len(cell_boxes)} braille cells")
 
         if not cell_boxes:
@@ -71,14 +110,30 @@ class BraillePipeline:
         cells_with_position = []
         for box, result in zip(cell_boxes, class_results):
             cells_with_position.append({
-                "box": box[:4].tolist() if hasattr(box, "tolist") else list(box[:4]),
+                # Report boxes at native resolution, undoing the normalisation scale
+                "box": [float(c) / scale for c in box[:4]],
                 "pattern": result["pattern"],
                 "confidence": result["confidence"],
                 "character": result["character"],
             })
 
-        raw_text = self.postprocessor.decode(cells_with_position)
-        corrected_text, nlp_confidence = self.nlp.correct(raw_text)
+        if self.beam_decoder is not None and grade == 1:
+            # The language model already chose between each cell's likely patterns,
+            # so only cleanup remains; report the chosen patterns per cell
+            probabilities = np.array([r["probabilities"] for r in class_results], dtype=np.float32)
+            raw_text, patterns = self.beam_decoder.decode(cells_with_position, probabilities)
+            for cell, pattern, probs in zip(cells_with_position, patterns, probabilities):
+                cell.update(
+                    pattern=pattern,
+                    confidence=float(probs[pattern]),
+                    character=PATTERN_TO_CHAR.get(pattern, "?"),
+                )
+            corrected_text, nlp_confidence = self.nlp.clean(raw_text), 1.0
+        else:
+            # The character model covers uncontracted text only; Grade 2 expands
+            # contractions from the argmax patterns
+            raw_text = self.postprocessor.decode(cells_with_position, grade=grade)
+            corrected_text, nlp_confidence = self.nlp.correct(raw_text)
 
         confidences = [c["confidence"] for c in cells_with_position]
         avg_confidence = float(np.mean(confidences)) if confidences else 0.0
@@ -96,15 +151,10 @@ class BraillePipeline:
             "cells": cells_with_position,
         }
 
-    def run_from_path(self, image_path: str) -> Dict[str, Any]:
-        image = cv2.imread(image_path)
-        if image is None:
-            raise ValueError(f"Cannot read image: {image_path}")
-        return self.run(image)
-
-    def run_from_bytes(self, image_bytes: bytes) -> Dict[str, Any]:
-        nparr = np.frombuffer(image_bytes, np.uint8)
-        image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-        if image is None:
-            raise ValueError("Cannot decode image bytes")
-        return self.run(image)
\ No newline at end of file
+    def run_from_path(self, image_path: str, grade: int = 1) -> Dict[str, Any]:
+        image, input_scale = decode_file(image_path)
+        return self.run(image, input_scale=input_scale, grade=grade)
+
+    def run_from_bytes(self, image_bytes: Buffer, grade: int = 1) -> Dict[str, Any]:
+        image, input_scale = decode_image(image_bytes)
+        return self.run(image, input_scale=input_scale, grade=grade)
\ No newline at end of file
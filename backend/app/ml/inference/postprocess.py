@@ -41,7 +41,6 @@ PATTERN_TO_CHAR = {
     0b010010: "!",
     0b000010: "'",
     0b001100: "-",
-    0b001110: "/",
     0b100001: "1",
     0b100011: "2",
     0b101001: "3",
@@ -51,11 +50,10 @@ PATTERN_TO_CHAR = {
     0b111011: "7",
     0b110011: "8",
     0b101010: "9",
-    0b111010: "0",
 }
 
 CAPITAL_INDICATOR = 0b000000_000001  # dots 6 only = 0b100000
-NUMBER_INDICATOR = 0b011111          # dots 3456 = number follows
+NUMBER_INDICATOR = 0b111100          # dots 3456 = number follows
 
 
 class PostProcessor:
@@ -70,12 +68,19 @@ class PostProcessor:
 
     def __init__(self, line_tolerance_factor: float = 0.6):
         self.line_tol = line_tolerance_factor
+        self._grade2 = None
 
-    def decode(self, cells: List[Dict[str, Any]]) -> str:
+    def decode(self, cells: List[Dict[str, Any]], grade: int = 1) -> str:
         if not cells:
             return ""
 
         sorted_cells = self._sort_cells_by_reading_order(cells)
+        if grade == 2:
+            if self._grade2 is None:
+                from app.ml.inference.grade2 import Grade2Decoder
+
+                self._grade2 = Grade2Decoder()
+            return self._grade2.decode_patterns([c["pattern"] for c in sorted_cells])
         text = []
         capital_mode = False
         number_mode = False
@@ -117,6 +122,10 @@ class PostProcessor:
 
     def _sort_cells_by_reading_order(self, cells: List[Dict]) -> List[Dict]:
         """Sort cells by rows then left-to-right within each row."""
+        return [cells[i] for i in self.reading_order(cells)]
+
+    def reading_order(self, cells: List[Dict]) -> List[int]:
+        """Indices of cells in reading order (rows, then left-to-right)."""
         if not cells:
             return []
 
@@ -125,9 +134,9 @@ class PostProcessor:
         avg_height = np.mean(heights) if heights else 20
         tolerance = avg_height * self.line_tol
 
-        def row_key(cell):
-            y1 = cell["box"][1]
+        def row_key(i):
+            y1 = boxes[i][1]
             row = int(y1 / tolerance)
             return row
 
-        return sorted(cells, key=lambda c: (row_key(c), c["box"][0]))
\ No newline at end of file
+        return sorted(range(len(cells)), key=lambda i: (row_key(i), boxes[i][0]))
\ No newline at end of file
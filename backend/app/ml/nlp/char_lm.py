@@ -0,0 +1,118 @@
+"""
+Compact character n-gram language model for decoding Braille text.
+
+The alphabet is a-z plus one word-boundary symbol, so the whole model is a
+dense (27,) * ORDER table of log P(symbol | previous ORDER-1 symbols): about
+2 MB at order 4, scored by plain array indexing and memory-mapped like the
+SymSpell index. It is trained on the same word frequency dictionary as the
+spell checker, with interpolated (Jelinek-Mercer) smoothing down to unigrams.
+"""
+import os
+import logging
+from functools import lru_cache
+
+import numpy as np
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+ALPHABET = "abcdefghijklmnopqrstuvwxyz"
+BOUNDARY = len(ALPHABET)
+N_SYMBOLS = len(ALPHABET) + 1
+SYMBOL_INDEX = {c: i for i, c in enumerate(ALPHABET)}
+DEFAULT_ORDER = 4
+# Weight of each order's own estimate over the (already smoothed) lower order
+INTERPOLATION = 0.8
+
+
+class CharLanguageModel:
+    def __init__(self, log_probs: np.ndarray):
+        self.log_probs = log_probs
+        self.order = log_probs.ndim
+        self.n_contexts = N_SYMBOLS ** (self.order - 1)
+        # Flat (context, symbol) view for scoring with a single index
+        self._table = log_probs.reshape(self.n_contexts, N_SYMBOLS)
+
+    @property
+    def start(self) -> int:
+        """Context code for the start of text (all boundaries)."""
+        return self.n_contexts - 1
+
+    def score(self, context: int, symbol: int) -> float:
+        return float(self._table[context, symbol])
+
+    def rows(self, contexts) -> np.ndarray:
+        """(len(contexts), N_SYMBOLS) next-symbol log probabilities."""
+        return self._table[np.asarray(contexts, dtype=np.intp)]
+
+    def advance(self, context: int, symbol: int) -> int:
+        return (context * N_SYMBOLS + symbol) % self.n_contexts
+
+    def text_log_prob(self, text: str) -> float:
+        """Total log probability of text; anything but a-z counts as a word boundary."""
+        context, total = self.start, 0.0
+        for ch in text.lower():
+            symbol = SYMBOL_INDEX.get(ch, BOUNDARY)
+            total += self.score(context, symbol)
+            context = self.advance(context, symbol)
+        return total
+
+    @classmethod
+    def train(cls, word_counts, order: int = DEFAULT_ORDER) -> "CharLanguageModel":
+        """Estimate the model from (word, count) pairs; words outside a-z are skipped."""
+        flat, weights = [], []
+        pad = [BOUNDARY] * (order - 1)
+        for word, count in word_counts:
+            if not word or any(c not in SYMBOL_INDEX for c in word):
+                continue
+            symbols = pad + [SYMBOL_INDEX[c] for c in word] + [BOUNDARY]
+            for i in range(order - 1, len(symbols)):
+                code = 0
+                for s in symbols[i - order + 1:i + 1]:
+                    code = code * N_SYMBOLS + s
+                flat.append(code)
+                weights.append(count)
+        counts = np.bincount(flat, weights=weights, minlength=N_SYMBOLS ** order)
+        counts = counts.reshape((N_SYMBOLS,) * order)
+
+        probs = np.full(N_SYMBOLS, 1.0 / N_SYMBOLS)
+        for k in range(1, order + 1):
+            # Order-k counts are the order-`order` counts summed over older context
+            c = counts.sum(axis=tuple(range(order - k))) if k < order else counts
+            totals = c.sum(axis=-1, keepdims=True)
+            ml = np.divide(c, totals, out=np.zeros_like(c), where=totals > 0)
+            lower = np.broadcast_to(probs, c.shape)
+            # Unseen contexts fall back entirely to the lower order
+            probs = np.where(totals > 0, INTERPOLATION * ml + (1 - INTERPOLATION) * lower, lower)
+        return cls(np.log(probs).astype(np.float32))
+
+    @classmethod
+    def from_dictionary(cls, path: str, order: int = DEFAULT_ORDER) -> "CharLanguageModel":
+        """Train from a frequency dictionary ("term count" per line, as SymSpell reads)."""
+        with open(path, encoding="utf-8") as f:
+            pairs = [(parts[0], float(parts[1])) for parts in (line.split() for line in f) if len(parts) >= 2]
+        return cls.train(pairs, order=order)
+
+    def save(self, path: str) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp.npy"
+        np.save(tmp, self.log_probs)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> "CharLanguageModel":
+        return cls(np.load(path, mmap_mode="r"))
+
+
+@lru_cache(maxsize=None)
+def shared_char_lm(path: str = None, dictionary_path: str = None) -> CharLanguageModel:
+    """The process-wide model, trained and saved on first use if its file is missing."""
+    path = path or settings.CHAR_LM_PATH
+    if not os.path.exists(path):
+        from app.ml.nlp.symspell_index import default_dictionary_path
+
+        dictionary_path = dictionary_path or default_dictionary_path()
+        logger.info(f"Training character LM from {dictionary_path}")
+        CharLanguageModel.from_dictionary(dictionary_path).save(path)
+    return CharLanguageModel.load(path)
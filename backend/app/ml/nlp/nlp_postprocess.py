@@ -1,9 +1,47 @@
 import re
 import logging
-from typing import Tuple
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# (leading non-letters, core, trailing non-letters) of a whitespace-separated word
+_WORD_PARTS = re.compile(r"^([^a-zA-Z]*)(.*?)([^a-zA-Z]*)$", re.DOTALL)
+_MULTI_SPACE = re.compile(r" {2,}")
+_SENTENCE_START = re.compile(r"([.!?])\s*([a-z])")
+_NON_PRINTABLE = re.compile(r"[^\x20-\x7E\n]")
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+")
+MAX_EDIT_DISTANCE = 2
+# Below this many distinct words a batch is resolved in-process: spawning a pool costs more
+POOL_MIN_WORDS = 5000
+
+_worker_symspell = None
+
+
+def _best_correction(symspell, verbosity, word: str, max_edit_distance: int) -> Optional[str]:
+    suggestions = symspell.lookup(word, verbosity.CLOSEST, max_edit_distance=max_edit_distance)
+    if suggestions and suggestions[0].term != word:
+        return suggestions[0].term
+    return None
+
+
+def _init_worker() -> None:
+    global _worker_symspell
+    from app.ml.nlp.symspell_index import shared_symspell
+
+    # Maps the same index files as the parent, so worker start-up is cheap
+    _worker_symspell = shared_symspell(max_edit_distance=MAX_EDIT_DISTANCE)
+
+
+def _lookup_chunk(words: List[str]) -> List[Optional[str]]:
+    from symspellpy import Verbosity
+
+    return [_best_correction(_worker_symspell, Verbosity, w, MAX_EDIT_DISTANCE) for w in words]
+
 
 class NLPPostProcessor:
     """
@@ -13,19 +51,20 @@ class NLPPostProcessor:
     3. Confidence scoring
     """
 
-    def __init__(self):
+    def __init__(self, cache_size: int = None):
         self.symspell = None
         self._load_symspell()
+        # Transcripts reuse a small vocabulary, so memoise lookups per instance
+        cache_size = settings.NLP_CORRECTION_CACHE_SIZE if cache_size is None else cache_size
+        self._lookup_cached = lru_cache(maxsize=cache_size)(self._lookup)
 
     def _load_symspell(self):
         try:
-            from symspellpy import SymSpell, Verbosity
-            self.symspell = SymSpell(max_dictionary_edit_distance=2, prefix_length=7)
-            import pkg_resources
-            dict_path = pkg_resources.resource_filename(
-                "symspellpy", "frequency_dictionary_en_82_765.txt"
-            )
-            self.symspell.load_dictionary(dict_path, term_index=0, count_index=1)
+            from symspellpy import Verbosity
+            from app.ml.nlp.symspell_index import shared_symspell
+
+            # One memory-mapped index per machine, one SymSpell per process
+            self.symspell = shared_symspell(max_edit_distance=MAX_EDIT_DISTANCE)
             self._Verbosity = Verbosity
             logger.info("SymSpell spell checker loaded.")
         except Exception as e:
@@ -39,11 +78,39 @@ class NLPPostProcessor:
         """
         if not text or not text.strip():
             return text, 1.0
+        return self._finish(self._rule_based_clean(text), self._resolve)
+
+    def clean(self, text: str) -> str:
+        """Cleanup and sentence capitalisation only, for text already decoded against a language model."""
+        if not text or not text.strip():
+            return text
+        return self._capitalize_sentences(self._rule_based_clean(text))
 
-        cleaned = self._rule_based_clean(text)
+    def correct_batch(self, texts: Sequence[str], workers: int = None) -> List[Tuple[str, float]]:
+        """
+        Correct many texts (e.g. every page of a book) in one pass: each distinct
+        word across the batch is looked up once, in a process pool when the batch
+        is large and workers > 1 (NLP_BATCH_WORKERS by default). Returns
+        (corrected_text, confidence) per text, exactly as correct() would.
+        """
+        cleaned = [self._rule_based_clean(t) if t and t.strip() else None for t in texts]
+        resolve = self._resolve
+        if self.symspell:
+            words = {
+                core.lower()
+                for text in cleaned if text
+                for word in text.split()
+                for core in (_WORD_PARTS.match(word).group(2),) if core
+            }
+            resolve = self._resolve_words(words, workers).get
+        return [
+            (text, 1.0) if clean is None else self._finish(clean, resolve)
+            for text, clean in zip(texts, cleaned)
+        ]
 
+    def _finish(self, cleaned: str, resolve: Callable[[str], Optional[str]]) -> Tuple[str, float]:
         if self.symspell:
-            corrected, n_corrections = self._symspell_correct(cleaned)
+            corrected, n_corrections = self._symspell_correct(cleaned, resolve)
             total_words = max(len(cleaned.split()), 1)
             confidence = max(0.5, 1.0 - (n_corrections / total_words) * 0.2)
         else:
@@ -53,29 +120,49 @@ class NLPPostProcessor:
         corrected = self._capitalize_sentences(corrected)
         return corrected, confidence
 
+    def _resolve(self, word: str) -> Optional[str]:
+        return self._lookup_cached(word, MAX_EDIT_DISTANCE)
+
+    def _resolve_words(self, words: Iterable[str], workers: int = None) -> Dict[str, Optional[str]]:
+        words = sorted(words)
+        workers = settings.NLP_BATCH_WORKERS if workers is None else workers
+        if workers <= 0:
+            workers = multiprocessing.cpu_count()
+        if workers == 1 or len(words) < POOL_MIN_WORDS:
+            return {w: self._resolve(w) for w in words}
+        chunks = [words[i::workers * 4] for i in range(workers * 4)]
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(workers, mp_context=context, initializer=_init_worker) as pool:
+            results = pool.map(_lookup_chunk, chunks)
+            return {w: c for chunk, found in zip(chunks, results) for w, c in zip(chunk, found)}
+
     def _rule_based_clean(self, text: str) -> str:
-        text = re.sub(r" {2,}", " ", text)
-        text = re.sub(r"([.!?])\s*([a-z])", lambda m: m.group(1) + " " + m.group(2).upper(), text)
-        text = re.sub(r"[^\x20-\x7E\n]", "", text)
+        text = _MULTI_SPACE.sub(" ", text)
+        text = _SENTENCE_START.sub(lambda m: m.group(1) + " " + m.group(2).upper(), text)
+        text = _NON_PRINTABLE.sub("", text)
         text = text.strip()
         return text
 
-    def _symspell_correct(self, text: str) -> Tuple[str, int]:
+    def _lookup(self, word: str, max_edit_distance: int) -> Optional[str]:
+        """Best correction for a lowercased word, or None if it is already a known word."""
+        return _best_correction(self.symspell, self._Verbosity, word, max_edit_distance)
+
+    def cache_stats(self) -> Dict[str, int]:
+        info = self._lookup_cached.cache_info()
+        return {"hits": info.hits, "misses": info.misses, "size": info.currsize, "maxsize": info.maxsize}
+
+    def _symspell_correct(self, text: str, resolve: Callable[[str], Optional[str]] = None) -> Tuple[str, int]:
+        resolve = resolve or self._resolve
         words = text.split()
         corrected_words = []
         n_corrections = 0
         for word in words:
-            if re.match(r"^[^a-zA-Z]+$", word):
+            punct_before, core, punct_after = _WORD_PARTS.match(word).groups()
+            if not core:
                 corrected_words.append(word)
                 continue
-            punct_before = re.match(r"^([^a-zA-Z]*)", word).group(1)
-            punct_after = re.search(r"([^a-zA-Z]*)$", word).group(1)
-            core = word[len(punct_before):len(word) - len(punct_after) if punct_after else None]
-            suggestions = self.symspell.lookup(
-                core.lower(), self._Verbosity.CLOSEST, max_edit_distance=2
-            )
-            if suggestions and suggestions[0].term != core.lower():
-                suggestion = suggestions[0].term
+            suggestion = resolve(core.lower())
+            if suggestion is not None:
                 if core[0].isupper():
                     suggestion = suggestion.capitalize()
                 corrected_words.append(punct_before + suggestion + punct_after)
@@ -85,6 +172,6 @@ class NLPPostProcessor:
         return " ".join(corrected_words), n_corrections
 
     def _capitalize_sentences(self, text: str) -> str:
-        sentences = re.split(r"(?<=[.!?])\s+", text)
+        sentences = _SENTENCE_SPLIT.split(text)
         capitalized = [s[0].upper() + s[1:] if s else s for s in sentences]
         return " ".join(capitalized)
\ No newline at end of file
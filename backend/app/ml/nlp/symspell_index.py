@@ -0,0 +1,278 @@
+"""
+Precomputed, memory-mapped SymSpell index.
+
+Building SymSpell's deletes index from the 82k-word frequency dictionary takes
+seconds and tens of MB of Python objects in every process that does it. Here
+it is built once and saved as flat numpy arrays (sorted keys, offsets and
+word-id postings); every process then maps the same files read-only, so
+start-up is a few file opens and the pages are shared through the OS page
+cache instead of being copied per worker.
+
+    python -m app.ml.nlp.symspell_index            # prebuild, e.g. in the image
+"""
+import os
+import json
+import fcntl
+import shutil
+import logging
+import argparse
+import tempfile
+from collections.abc import Mapping
+from contextlib import contextmanager
+from functools import lru_cache
+from importlib import metadata, resources
+from typing import Iterator, List
+
+import numpy as np
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+INDEX_FORMAT = 1
+INDEX_ARRAYS = ("words", "counts", "delete_keys", "delete_offsets", "delete_postings")
+DEFAULT_DICTIONARY = "frequency_dictionary_en_82_765.txt"
+# load_index replaces SymSpell's private _words/_deletes/_max_length; keep in
+# step with the symspellpy pin in requirements.txt
+VERIFIED_SYMSPELLPY = "6.10.0"
+
+
+def default_dictionary_path() -> str:
+    return str(resources.files("symspellpy") / DEFAULT_DICTIONARY)
+
+
+class _SortedKeys:
+    """Binary search over a sorted fixed-width bytes array."""
+
+    def __init__(self, keys: np.ndarray):
+        self.keys = keys
+        self._width = keys.dtype.itemsize
+
+    def find(self, key: str) -> int:
+        encoded = key.encode("utf-8")
+        if len(encoded) > self._width:
+            return -1
+        i = int(np.searchsorted(self.keys, encoded))
+        return i if i < len(self.keys) and self.keys[i] == encoded else -1
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+
+class MappedWords(Mapping):
+    """word -> count, read from the mapped arrays (stands in for SymSpell._words)."""
+
+    def __init__(self, words: np.ndarray, counts: np.ndarray):
+        self._keys = _SortedKeys(words)
+        self._counts = counts
+
+    def __getitem__(self, word: str) -> int:
+        i = self._keys.find(word)
+        if i < 0:
+            raise KeyError(word)
+        return int(self._counts[i])
+
+    def __contains__(self, word) -> bool:
+        return isinstance(word, str) and self._keys.find(word) >= 0
+
+    def __iter__(self) -> Iterator[str]:
+        return (w.decode("utf-8") for w in self._keys.keys)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def terms(self, ids: np.ndarray) -> List[str]:
+        return [w.decode("utf-8") for w in self._keys.keys[ids].tolist()]
+
+
+class MappedDeletes(Mapping):
+    """delete -> [dictionary words], read from the mapped arrays (stands in for SymSpell._deletes)."""
+
+    def __init__(self, keys: np.ndarray, offsets: np.ndarray, postings: np.ndarray, words: MappedWords):
+        self._keys = _SortedKeys(keys)
+        self._offsets = offsets
+        self._postings = postings
+        self._words = words
+
+    def __getitem__(self, delete: str) -> List[str]:
+        i = self._keys.find(delete)
+        if i < 0:
+            raise KeyError(delete)
+        return self._words.terms(self._postings[self._offsets[i]:self._offsets[i + 1]])
+
+    def __contains__(self, delete) -> bool:
+        return isinstance(delete, str) and self._keys.find(delete) >= 0
+
+    def __iter__(self) -> Iterator[str]:
+        return (k.decode("utf-8") for k in self._keys.keys)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+
+def _sorted_bytes(strings) -> np.ndarray:
+    encoded = sorted(s.encode("utf-8") for s in strings)
+    # "S" arrays compare bytewise, matching the sort above; width >= 1 even if empty
+    return np.array(encoded, dtype=f"S{max([len(e) for e in encoded] + [1])}")
+
+
+def _source_meta(dictionary_path: str, max_edit_distance: int, prefix_length: int) -> dict:
+    return {
+        "format": INDEX_FORMAT,
+        "source": os.path.abspath(dictionary_path),
+        "source_size": os.path.getsize(dictionary_path),
+        "max_edit_distance": max_edit_distance,
+        "prefix_length": prefix_length,
+    }
+
+
+@contextmanager
+def _index_lock(index_dir: str, exclusive: bool):
+    """
+    Advisory lock file beside index_dir. Builders hold it exclusively and
+    loaders shared, so an index is never swapped while a process opens it.
+    """
+    path = f"{os.path.abspath(index_dir)}.lock"
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def build_index(
+    index_dir: str,
+    dictionary_path: str = None,
+    max_edit_distance: int = 2,
+    prefix_length: int = 7,
+) -> str:
+    """Build the deletes index for a frequency dictionary and save it under index_dir."""
+    with _index_lock(index_dir, exclusive=True):
+        return _build_index(index_dir, dictionary_path, max_edit_distance, prefix_length)
+
+
+def _build_index(index_dir: str, dictionary_path: str, max_edit_distance: int, prefix_length: int) -> str:
+    """build_index without the lock; the caller must hold it exclusively."""
+    from symspellpy import SymSpell
+
+    dictionary_path = dictionary_path or default_dictionary_path()
+    symspell = SymSpell(max_dictionary_edit_distance=max_edit_distance, prefix_length=prefix_length)
+    if not symspell.load_dictionary(dictionary_path, term_index=0, count_index=1):
+        raise FileNotFoundError(f"SymSpell dictionary not found: {dictionary_path}")
+
+    words = _sorted_bytes(symspell.words)
+    word_ids = {w.decode("utf-8"): i for i, w in enumerate(words.tolist())}
+    counts = np.array([symspell.words[w.decode("utf-8")] for w in words.tolist()], dtype=np.int64)
+
+    delete_keys = _sorted_bytes(symspell.deletes)
+    delete_offsets = np.zeros(len(delete_keys) + 1, dtype=np.int64)
+    postings = []
+    for i, key in enumerate(delete_keys.tolist()):
+        # Keep SymSpell's insertion order so lookups rank ties exactly as before
+        postings.extend(word_ids[w] for w in symspell.deletes[key.decode("utf-8")])
+        delete_offsets[i + 1] = len(postings)
+    delete_postings = np.array(postings, dtype=np.uint32)
+
+    meta = _source_meta(dictionary_path, max_edit_distance, prefix_length)
+    meta.update(max_length=symspell._max_length, words=len(words), deletes=len(delete_keys))
+
+    # Write into a sibling temp dir and rename it into place, so the index is
+    # never seen half-written
+    parent = os.path.dirname(os.path.abspath(index_dir))
+    os.makedirs(parent, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(prefix=".symspell-", dir=parent)
+    arrays = dict(zip(INDEX_ARRAYS, (words, counts, delete_keys, delete_offsets, delete_postings)))
+    for name, array in arrays.items():
+        np.save(os.path.join(tmp_dir, f"{name}.npy"), array)
+    with open(os.path.join(tmp_dir, "meta.json"), "w") as f:
+        json.dump(meta, f, indent=2)
+
+    old_dir = None
+    if os.path.isdir(index_dir):
+        # Processes that already mapped the old files keep them until they exit
+        old_dir = tempfile.mkdtemp(prefix=".symspell-old-", dir=parent)
+        os.rename(index_dir, os.path.join(old_dir, "index"))
+    os.rename(tmp_dir, index_dir)
+    if old_dir:
+        shutil.rmtree(old_dir, ignore_errors=True)
+    size_mb = sum(a.nbytes for a in arrays.values()) / 1e6
+    logger.info(f"SymSpell index built: {len(words)} words, {len(delete_keys)} deletes, {size_mb:.1f} MB -> {index_dir}")
+    return index_dir
+
+
+def index_is_current(index_dir: str, dictionary_path: str, max_edit_distance: int, prefix_length: int) -> bool:
+    try:
+        with open(os.path.join(index_dir, "meta.json")) as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return False
+    expected = _source_meta(dictionary_path, max_edit_distance, prefix_length)
+    return all(meta.get(k) == v for k, v in expected.items()) and all(
+        os.path.exists(os.path.join(index_dir, f"{name}.npy")) for name in INDEX_ARRAYS
+    )
+
+
+def load_index(index_dir: str):
+    """A SymSpell whose words and deletes are read-only views of the mapped index."""
+    from symspellpy import SymSpell
+
+    version = metadata.version("symspellpy")
+    if version != VERIFIED_SYMSPELLPY:
+        logger.warning(
+            f"symspellpy {version} is not the verified {VERIFIED_SYMSPELLPY}; "
+            "the mapped index relies on its private attributes"
+        )
+    with open(os.path.join(index_dir, "meta.json")) as f:
+        meta = json.load(f)
+    arrays = {
+        name: np.load(os.path.join(index_dir, f"{name}.npy"), mmap_mode="r")
+        for name in INDEX_ARRAYS
+    }
+    words = MappedWords(arrays["words"], arrays["counts"])
+    symspell = SymSpell(
+        max_dictionary_edit_distance=meta["max_edit_distance"], prefix_length=meta["prefix_length"]
+    )
+    symspell._words = words
+    symspell._deletes = MappedDeletes(
+        arrays["delete_keys"], arrays["delete_offsets"], arrays["delete_postings"], words
+    )
+    symspell._max_length = meta["max_length"]
+    return symspell
+
+
+@lru_cache(maxsize=None)
+def shared_symspell(
+    index_dir: str = None,
+    dictionary_path: str = None,
+    max_edit_distance: int = 2,
+    prefix_length: int = 7,
+):
+    """
+    The process-wide SymSpell, built on first use if the index is missing or
+    stale. Lookups only read it, so every NLPPostProcessor in the process
+    shares this one instance.
+    """
+    index_dir = index_dir or settings.SYMSPELL_INDEX_DIR
+    dictionary_path = dictionary_path or default_dictionary_path()
+    with _index_lock(index_dir, exclusive=False):
+        if index_is_current(index_dir, dictionary_path, max_edit_distance, prefix_length):
+            return load_index(index_dir)
+    # Workers starting cold queue here; all but the first find the index current
+    with _index_lock(index_dir, exclusive=True):
+        if not index_is_current(index_dir, dictionary_path, max_edit_distance, prefix_length):
+            logger.info(f"Building SymSpell index from {dictionary_path}")
+            _build_index(index_dir, dictionary_path, max_edit_distance, prefix_length)
+        return load_index(index_dir)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Prebuild the memory-mapped SymSpell index")
+    parser.add_argument("--output", default=settings.SYMSPELL_INDEX_DIR)
+    parser.add_argument("--dictionary", default=None, help="Frequency dictionary (term count per line)")
+    parser.add_argument("--max-edit-distance", type=int, default=2)
+    parser.add_argument("--prefix-length", type=int, default=7)
+    args = parser.parse_args()
+    build_index(args.output, args.dictionary, args.max_edit_distance, args.prefix_length)
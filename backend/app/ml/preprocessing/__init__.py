@@ -1,14 +1,29 @@
 """Preprocessing pipeline for braille images."""
 from app.ml.preprocessing.binarize import binarize_image
-from app.ml.preprocessing.denoise import denoise_image
+from app.ml.preprocessing.color import to_gray
+from app.ml.preprocessing.denoise import adaptive_denoise, denoise_image, estimate_noise_sigma
+from app.ml.preprocessing.ingest import decode_file, decode_image, iter_pages, page_count, read_page
 from app.ml.preprocessing.perspective import correct_perspective
-from app.ml.preprocessing.resize import resize_image
+from app.ml.preprocessing.tiling import tile_map, tiled_clahe
+from app.ml.preprocessing.resize import estimate_dot_pitch, normalize_resolution, resize_image
 from app.ml.preprocessing.unwarp import unwarp_image
 
 __all__ = [
     "binarize_image",
+    "adaptive_denoise",
+    "decode_file",
+    "decode_image",
     "denoise_image",
+    "estimate_dot_pitch",
+    "estimate_noise_sigma",
+    "iter_pages",
+    "normalize_resolution",
+    "page_count",
+    "read_page",
     "correct_perspective",
     "resize_image",
+    "tile_map",
+    "tiled_clahe",
+    "to_gray",
     "unwarp_image",
 ]
\ No newline at end of file
@@ -1,49 +1,98 @@
 import cv2
 import numpy as np
 
+from app.core.config import settings
+from app.ml.preprocessing.color import to_gray
+from app.ml.preprocessing.tiling import tile_map
+
 
 def binarize_image(image: np.ndarray, method: str = "adaptive") -> np.ndarray:
     """
     Convert image to binary using multiple thresholding strategies.
-    method: 'adaptive' | 'otsu' | 'sauvola'
+    method: 'adaptive' | 'otsu' | 'sauvola' (robust to uneven lighting in photos)
     """
-    if len(image.shape) == 3:
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-    else:
-        gray = image.copy()
+    gray = to_gray(image)
 
+    # Each threshold runs together with the cleanup on overlapping tiles; halo is
+    # the threshold window radius plus 4px for the open/close pair.
     if method == "adaptive":
-        binary = cv2.adaptiveThreshold(
-            gray,
-            255,
-            cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
-            cv2.THRESH_BINARY_INV,
-            blockSize=31,
-            C=10,
-        )
+        def threshold(tile):
+            return cv2.adaptiveThreshold(
+                tile,
+                255,
+                cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+                cv2.THRESH_BINARY_INV,
+                blockSize=31,
+                C=10,
+            )
+        halo = 15
     elif method == "otsu":
-        _, binary = cv2.threshold(
-            gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU
-        )
+        # Otsu needs the whole-page histogram, so only the thresholding itself is tiled
+        level, _ = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+
+        def threshold(tile):
+            return cv2.threshold(tile, level, 255, cv2.THRESH_BINARY_INV)[1]
+        halo = 0
     elif method == "sauvola":
-        binary = _sauvola_threshold(gray)
+        def threshold(tile):
+            return _sauvola_threshold(tile)
+        halo = 12
     else:
         raise ValueError(f"Unknown binarization method: {method}")
 
-    # Morphological cleanup
+    return tile_map(gray, lambda tile: _cleanup(threshold(tile)), halo=halo + 4)
+
+
+def _cleanup(binary: np.ndarray) -> np.ndarray:
+    """Open then close with a 3x3 ellipse: drops specks and fills pinholes in dots."""
     kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3))
     binary = cv2.morphologyEx(binary, cv2.MORPH_OPEN, kernel, iterations=1)
     binary = cv2.morphologyEx(binary, cv2.MORPH_CLOSE, kernel, iterations=1)
+    return binary
 
+
+def _sauvola_threshold(
+    gray: np.ndarray,
+    window_size: int = 25,
+    k: float = 0.2,
+    tile_rows: int = None,
+) -> np.ndarray:
+    """
+    Sauvola local thresholding for uneven illumination.
+    Works in float32 with in-place arithmetic, so peak memory is about three
+    float32 planes of one strip; tile_rows bounds it for very large pages.
+    """
+    tile_rows = tile_rows if tile_rows is not None else settings.SAUVOLA_TILE_ROWS
+    h = gray.shape[0]
+    if not tile_rows or tile_rows >= h:
+        return _sauvola_strip(gray, window_size, k)
+
+    binary = np.empty_like(gray)
+    halo = window_size // 2
+    for y0 in range(0, h, tile_rows):
+        y1 = min(h, y0 + tile_rows)
+        # The halo rows give every output row its full window, so strips join seamlessly
+        a0, a1 = max(0, y0 - halo), min(h, y1 + halo)
+        strip = _sauvola_strip(gray[a0:a1], window_size, k)
+        binary[y0:y1] = strip[y0 - a0: y1 - a0]
     return binary
 
 
-def _sauvola_threshold(gray: np.ndarray, window_size: int = 25, k: float = 0.2) -> np.ndarray:
-    """Sauvola local thresholding for uneven illumination."""
-    gray_f = gray.astype(np.float64)
-    mean = cv2.boxFilter(gray_f, -1, (window_size, window_size))
-    mean_sq = cv2.boxFilter(gray_f ** 2, -1, (window_size, window_size))
-    std = np.sqrt(np.maximum(mean_sq - mean ** 2, 0))
-    threshold = mean * (1 + k * (std / 128.0 - 1))
-    binary = np.where(gray_f < threshold, 255, 0).astype(np.uint8)
-    return binary
\ No newline at end of file
+def _sauvola_strip(gray: np.ndarray, window_size: int, k: float) -> np.ndarray:
+    ksize = (window_size, window_size)
+    # OpenCV box filters keep running (integral) sums in C: no float64 page copies
+    # and no squared-image temporary
+    mean = cv2.boxFilter(gray, cv2.CV_32F, ksize)
+    threshold = cv2.sqrBoxFilter(gray, cv2.CV_32F, ksize)
+    scratch = np.multiply(mean, mean)
+
+    # threshold = mean * (1 + k * (std / R - 1)), built in place from E[x^2]
+    np.subtract(threshold, scratch, out=threshold)
+    np.maximum(threshold, 0, out=threshold)
+    np.sqrt(threshold, out=threshold)
+    threshold *= k / 128.0
+    threshold += 1.0 - k
+    threshold *= mean
+
+    scratch[...] = gray
+    return cv2.compare(scratch, threshold, cv2.CMP_LT)
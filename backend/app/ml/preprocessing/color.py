@@ -0,0 +1,15 @@
+import cv2
+import numpy as np
+
+
+def to_gray(image: np.ndarray) -> np.ndarray:
+    """
+    Single-channel uint8 version of a BGR, BGRA or gray image.
+    Gray input is returned as is, so calling this at every stage costs nothing
+    once the pipeline has converted at ingest.
+    """
+    if image.ndim == 2:
+        return image
+    if image.shape[2] == 1:
+        return image[:, :, 0]
+    return cv2.cvtColor(image, cv2.COLOR_BGRA2GRAY if image.shape[2] == 4 else cv2.COLOR_BGR2GRAY)
@@ -0,0 +1,170 @@
+"""
+Single ingest layer for page images.
+
+Encoded bytes are decoded exactly once, straight from the caller's buffer
+(bytes, bytearray, memoryview) or from an mmapped file, into one owned
+grayscale array that the pipeline then uses in place. Oversized JPEGs are
+decoded at 1/2, 1/4 or 1/8 scale by libjpeg's DCT scaling, which skips most of
+the decode work instead of paying for it and then resizing.
+
+Multi-page documents (PDF, multi-frame TIFF) are read one page at a time, so
+only the pages currently being processed are ever held in memory.
+"""
+import os
+import mmap
+import logging
+from typing import Iterator, Optional, Tuple, Union
+
+import cv2
+import numpy as np
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+Buffer = Union[bytes, bytearray, memoryview, np.ndarray]
+
+_REDUCED_FLAGS = {
+    (2, True): cv2.IMREAD_REDUCED_GRAYSCALE_2,
+    (4, True): cv2.IMREAD_REDUCED_GRAYSCALE_4,
+    (8, True): cv2.IMREAD_REDUCED_GRAYSCALE_8,
+    (2, False): cv2.IMREAD_REDUCED_COLOR_2,
+    (4, False): cv2.IMREAD_REDUCED_COLOR_4,
+    (8, False): cv2.IMREAD_REDUCED_COLOR_8,
+}
+MULTIPAGE_EXTENSIONS = {"pdf", "tif", "tiff"}
+# Start-of-frame markers carry the image size; C4/C8/CC share the range but are not SOFs
+_JPEG_SOF_MARKERS = set(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
+def jpeg_size(data: np.ndarray) -> Optional[Tuple[int, int]]:
+    """(height, width) from a JPEG header without decoding, or None if not a JPEG."""
+    if data.size < 4 or data[0] != 0xFF or data[1] != 0xD8:
+        return None
+    pos, end = 2, data.size
+    while pos + 9 < end:
+        if data[pos] != 0xFF:
+            return None
+        marker = int(data[pos + 1])
+        if marker == 0xFF:
+            pos += 1
+            continue
+        length = (int(data[pos + 2]) << 8) | int(data[pos + 3])
+        if marker in _JPEG_SOF_MARKERS:
+            height = (int(data[pos + 5]) << 8) | int(data[pos + 6])
+            width = (int(data[pos + 7]) << 8) | int(data[pos + 8])
+            return height, width
+        pos += 2 + length
+    return None
+
+
+def reduction_factor(size: Optional[Tuple[int, int]], max_side: int) -> int:
+    """Largest DCT scale (1, 2, 4 or 8) that keeps the long side at or above max_side."""
+    if not size or not max_side:
+        return 1
+    long_side = max(size)
+    factor = 1
+    while factor < 8 and long_side // (factor * 2) >= max_side:
+        factor *= 2
+    return factor
+
+
+def decode_image(
+    data: Buffer,
+    grayscale: bool = True,
+    max_side: int = None,
+) -> Tuple[np.ndarray, float]:
+    """
+    Decode an encoded image from any buffer without copying the input.
+    Returns (image, scale) where scale maps native pixel coordinates to the
+    decoded image (1.0 unless a reduced JPEG decode was used).
+    """
+    max_side = settings.INGEST_MAX_SIDE if max_side is None else max_side
+    buf = data if isinstance(data, np.ndarray) else np.frombuffer(data, dtype=np.uint8)
+
+    size = jpeg_size(buf)
+    factor = reduction_factor(size, max_side)
+    if factor > 1:
+        flag = _REDUCED_FLAGS[(factor, grayscale)]
+    else:
+        flag = cv2.IMREAD_GRAYSCALE if grayscale else cv2.IMREAD_COLOR
+
+    image = cv2.imdecode(buf, flag)
+    if image is None:
+        raise ValueError("Cannot decode image bytes")
+    if factor > 1:
+        logger.debug(f"Reduced JPEG decode 1/{factor}: {size[1]}x{size[0]} -> {image.shape[1]}x{image.shape[0]}")
+        # imdecode applies EXIF orientation but size is the stored (unrotated)
+        # frame, so the scale is the DCT factor itself, not a ratio of heights
+        return image, 1.0 / factor
+    return image, 1.0
+
+
+def decode_file(path: str, grayscale: bool = True, max_side: int = None) -> Tuple[np.ndarray, float]:
+    """Decode an image file through a read-only mmap, so its bytes are never copied into Python."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            raise ValueError(f"Cannot read image: {path}")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            buf = np.frombuffer(mm, dtype=np.uint8)
+            try:
+                return decode_image(buf, grayscale=grayscale, max_side=max_side)
+            except ValueError:
+                # Raised after the with block: the traceback would keep buf (and
+                # so the mmap export) alive and make the close fail
+                pass
+            finally:
+                # The mmap cannot close while an array still exports its buffer
+                del buf
+    raise ValueError(f"Cannot read image: {path}")
+
+
+def _extension(path: str) -> str:
+    return path.rsplit(".", 1)[-1].lower() if "." in path else ""
+
+
+def page_count(path: str) -> int:
+    """Number of pages in a PDF or multi-frame TIFF; 1 for any other image."""
+    ext = _extension(path)
+    if ext == "pdf":
+        import pymupdf
+
+        with pymupdf.open(path) as doc:
+            return doc.page_count
+    if ext in ("tif", "tiff"):
+        return max(1, cv2.imcount(path))
+    return 1
+
+
+def read_page(path: str, index: int, dpi: int = None) -> Tuple[np.ndarray, float]:
+    """
+    Read one grayscale page. PDF pages are rasterised at dpi (PDF_RENDER_DPI by
+    default); TIFF frames and plain images decode at their own resolution.
+    Returns (image, scale) as decode_image does.
+    """
+    ext = _extension(path)
+    if ext == "pdf":
+        import pymupdf
+
+        dpi = dpi or settings.PDF_RENDER_DPI
+        with pymupdf.open(path) as doc:
+            pix = doc[index].get_pixmap(dpi=dpi, colorspace=pymupdf.csGRAY, alpha=False)
+        # Rows may be padded to pix.stride. Copy out of the pixmap's buffer once,
+        # since that memory is released with the pixmap.
+        rows = np.frombuffer(pix.samples_mv, dtype=np.uint8).reshape(pix.height, pix.stride)
+        return rows[:, :pix.width].copy(), 1.0
+    if ext in ("tif", "tiff"):
+        ok, frames = cv2.imreadmulti(path, index, 1, flags=cv2.IMREAD_GRAYSCALE)
+        if not ok or not frames:
+            raise ValueError(f"Cannot read page {index} of {path}")
+        return frames[0], 1.0
+    if index != 0:
+        raise IndexError(f"{path} has a single page")
+    return decode_file(path)
+
+
+def iter_pages(path: str, dpi: int = None) -> Iterator[Tuple[int, np.ndarray, float]]:
+    """Lazily yield (page_index, image, scale) for every page of a document."""
+    for index in range(page_count(path)):
+        image, scale = read_page(path, index, dpi=dpi)
+        yield index, image, scale
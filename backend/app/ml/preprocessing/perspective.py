@@ -1,14 +1,30 @@
+from typing import Optional
+
 import cv2
 import numpy as np
 
+from app.core.config import settings
+from app.ml.preprocessing.color import to_gray
 
-def correct_perspective(image: np.ndarray) -> np.ndarray:
-    """
-    Detect document edges and apply perspective transform.
-    Uses contour detection to find document boundary.
-    """
-    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if len(image.shape) == 3 else image
-    blurred = cv2.GaussianBlur(gray, (5, 5), 0)
+
+# A page that fills the frame shows no background band around it
+_BORDER_FRACTION = 0.03
+_BORDER_CONTRAST = 24
+
+
+def _looks_rectified(small: np.ndarray) -> bool:
+    """Cheap early exit: flatbed scans fill the frame, so the border matches the page."""
+    h, w = small.shape
+    bh, bw = max(1, int(h * _BORDER_FRACTION)), max(1, int(w * _BORDER_FRACTION))
+    border = np.concatenate([
+        small[:bh].ravel(), small[-bh:].ravel(), small[:, :bw].ravel(), small[:, -bw:].ravel()
+    ])
+    center = small[h // 4: 3 * h // 4, w // 4: 3 * w // 4]
+    return abs(float(np.median(border)) - float(np.median(center))) < _BORDER_CONTRAST
+
+
+def _find_page_quad(small: np.ndarray) -> Optional[np.ndarray]:
+    blurred = cv2.GaussianBlur(small, (5, 5), 0)
     edges = cv2.Canny(blurred, 50, 150)
 
     kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (3, 3))
@@ -16,20 +32,72 @@ def correct_perspective(image: np.ndarray) -> np.ndarray:
 
     contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
     if not contours:
-        return image
+        return None
 
     largest = max(contours, key=cv2.contourArea)
-    if cv2.contourArea(largest) < 0.1 * image.shape[0] * image.shape[1]:
-        return image
+    if cv2.contourArea(largest) < 0.1 * small.shape[0] * small.shape[1]:
+        return None
 
     peri = cv2.arcLength(largest, True)
     approx = cv2.approxPolyDP(largest, 0.02 * peri, True)
-
     if len(approx) != 4:
+        return None
+    return approx.reshape(4, 2).astype(np.float32)
+
+
+def _refine_corners(gray: np.ndarray, pts: np.ndarray, scale: float) -> np.ndarray:
+    """
+    Refine corners found on the thumbnail at full resolution: the strongest
+    Harris corner in a window covering the thumbnail's uncertainty (edge
+    dilation and pixel size) replaces each estimate, to sub-pixel accuracy.
+    """
+    if scale >= 1.0:
+        return pts
+    radius = int(np.ceil(4.0 / scale))
+    h, w = gray.shape
+    criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 20, 0.1)
+    refined = pts.copy()
+    for i, (x, y) in enumerate(pts):
+        x0, y0 = max(0, int(x) - radius), max(0, int(y) - radius)
+        x1, y1 = min(w, int(x) + radius + 1), min(h, int(y) + radius + 1)
+        window = gray[y0:y1, x0:x1]
+        if min(window.shape) < 8:
+            continue
+        corner = cv2.goodFeaturesToTrack(window, 1, 0.1, 1, useHarrisDetector=True, k=0.04)
+        if corner is None:
+            continue
+        try:
+            cv2.cornerSubPix(window, corner, (3, 3), (-1, -1), criteria)
+        except cv2.error:
+            pass
+        refined[i] = corner.reshape(2) + (x0, y0)
+    return refined
+
+
+def correct_perspective(image: np.ndarray, max_side: int = None, tolerance: float = None) -> np.ndarray:
+    """
+    Detect document edges and apply perspective transform.
+    The quad is searched for on a thumbnail and refined at full resolution;
+    warpPerspective only runs when the page is not already an axis-aligned
+    rectangle within tolerance (a fraction of the page diagonal), otherwise
+    the page is cropped with a slice or returned unchanged.
+    """
+    max_side = max_side or settings.PERSPECTIVE_MAX_SIDE
+    tolerance = settings.PERSPECTIVE_TOLERANCE if tolerance is None else tolerance
+
+    gray = to_gray(image)
+    h, w = gray.shape
+    scale = min(1.0, max_side / max(h, w))
+    small = cv2.resize(gray, (int(w * scale), int(h * scale)), interpolation=cv2.INTER_AREA) if scale < 1.0 else gray
+
+    if _looks_rectified(small):
         return image
 
-    pts = approx.reshape(4, 2).astype(np.float32)
-    pts = _order_points(pts)
+    quad = _find_page_quad(small)
+    if quad is None:
+        return image
+
+    pts = _order_points(_refine_corners(gray, quad / scale, scale))
 
     (tl, tr, br, bl) = pts
     maxW = int(max(
@@ -48,6 +116,14 @@ def correct_perspective(image: np.ndarray) -> np.ndarray:
         [0, maxH - 1],
     ], dtype=np.float32)
 
+    # The homography is a pure translation when the quad is an upright rectangle
+    deviation = float(np.abs(pts - (dst + tl)).max())
+    if deviation <= tolerance * np.hypot(h, w):
+        x0, y0 = max(0, int(round(tl[0]))), max(0, int(round(tl[1])))
+        if x0 == 0 and y0 == 0 and maxW >= w - 1 and maxH >= h - 1:
+            return image
+        return image[y0:y0 + maxH, x0:x0 + maxW]
+
     M = cv2.getPerspectiveTransform(pts, dst)
     warped = cv2.warpPerspective(image, M, (maxW, maxH))
     return warped
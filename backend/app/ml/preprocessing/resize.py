@@ -1,5 +1,16 @@
+import logging
+from typing import Optional, Tuple
+
+import cv2
 import numpy as np
+from scipy.spatial import cKDTree
+
 from app.core.config import settings
+from app.ml.preprocessing.color import to_gray
+
+logger = logging.getLogger(__name__)
+
+MIN_DOTS_FOR_PITCH = 12
 
 
 def resize_image(
@@ -38,4 +49,65 @@ def resize_image(
 def resize_cell(image: np.ndarray, cell_size: int = None) -> np.ndarray:
     """Resize a braille cell crop to a fixed size for classification."""
     size = cell_size or settings.CELL_SIZE
-    return cv2.resize(image, (size, size), interpolation=cv2.INTER_AREA)
\ No newline at end of file
+    return cv2.resize(image, (size, size), interpolation=cv2.INTER_AREA)
+
+
+def estimate_dot_pitch(image: np.ndarray, thumbnail_size: int = None) -> Optional[float]:
+    """
+    Estimate the spacing between neighbouring Braille dots in pixels of the input.
+    Works on a thumbnail: dot-like blobs are found by connected components and
+    the pitch is the median nearest-neighbour distance between their centroids.
+    Returns None when too few dots are found to be reliable.
+    """
+    thumbnail_size = thumbnail_size or settings.DOT_PITCH_THUMBNAIL_SIZE
+    gray = to_gray(image)
+    h, w = gray.shape
+    thumb_scale = min(1.0, thumbnail_size / max(h, w))
+    if thumb_scale < 1.0:
+        gray = cv2.resize(gray, (int(w * thumb_scale), int(h * thumb_scale)), interpolation=cv2.INTER_AREA)
+
+    _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+    if cv2.countNonZero(binary) > binary.size // 2:
+        # Dots are the minority class whatever their polarity (ink or embossed highlights)
+        binary = cv2.bitwise_not(binary)
+
+    _, _, stats, centroids = cv2.connectedComponentsWithStats(binary, connectivity=8)
+    widths = stats[1:, cv2.CC_STAT_WIDTH]
+    heights = stats[1:, cv2.CC_STAT_HEIGHT]
+    areas = stats[1:, cv2.CC_STAT_AREA]
+    aspect = widths / np.maximum(heights, 1)
+    fill = areas / np.maximum(widths * heights, 1)
+    # Round, compact blobs: area of a disc fills ~0.79 of its bounding box
+    is_dot = (areas >= 4) & (aspect > 0.5) & (aspect < 2.0) & (fill > 0.45) & (widths < 0.05 * max(gray.shape))
+    points = centroids[1:][is_dot]
+    if len(points) < MIN_DOTS_FOR_PITCH:
+        return None
+
+    distances, _ = cKDTree(points).query(points, k=2)
+    return float(np.median(distances[:, 1]) / thumb_scale)
+
+
+def normalize_resolution(
+    image: np.ndarray, target_pitch: float = None
+) -> Tuple[np.ndarray, float, Optional[float]]:
+    """
+    Rescale a page so its dot pitch lands near target_pitch pixels, making later
+    stages scale with cell count rather than scanner DPI.
+    Returns (image, scale, dot_pitch): scale maps input coordinates to output
+    ones and dot_pitch is the estimated pitch in the output (None if unknown).
+    """
+    target_pitch = target_pitch or settings.TARGET_DOT_PITCH_PX
+    pitch = estimate_dot_pitch(image)
+    if pitch is None:
+        logger.debug("Dot pitch could not be estimated, keeping native resolution.")
+        return image, 1.0, None
+
+    scale = float(np.clip(target_pitch / pitch, 0.05, settings.MAX_RESOLUTION_UPSCALE))
+    if abs(scale - 1.0) < 0.15:
+        return image, 1.0, pitch
+
+    h, w = image.shape[:2]
+    interpolation = cv2.INTER_AREA if scale < 1.0 else cv2.INTER_LINEAR
+    resized = cv2.resize(image, (max(1, round(w * scale)), max(1, round(h * scale))), interpolation=interpolation)
+    logger.debug(f"Dot pitch {pitch:.1f}px -> rescaled page by {scale:.3f} to {resized.shape[1]}x{resized.shape[0]}")
+    return resized, scale, pitch * scale
@@ -1,13 +1,21 @@
+from functools import lru_cache
+from typing import Tuple
+
 import cv2
 import numpy as np
 
+from app.core.config import settings
+from app.ml.preprocessing.color import to_gray
+
 
-def unwarp_image(image: np.ndarray) -> np.ndarray:
+def unwarp_image(image: np.ndarray, map_step: int = None) -> np.ndarray:
     """
     Correct curved/warped documents using thin-plate spline-like approach
     via grid-based remapping derived from detected line curvature.
+    map_step > 1 builds the remap at reduced resolution and upsamples it.
     """
-    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if len(image.shape) == 3 else image
+    map_step = map_step or settings.UNWARP_MAP_STEP
+    gray = to_gray(image)
 
     # Detect horizontal text lines via horizontal projection
     binary = cv2.adaptiveThreshold(
@@ -38,18 +46,44 @@ def unwarp_image(image: np.ndarray) -> np.ndarray:
 
     # Build remapping grid — straighten curves
     h, w = image.shape[:2]
-    map_x = np.tile(np.arange(w, dtype=np.float32), (h, 1))
-    map_y = np.tile(np.arange(h, dtype=np.float32).reshape(-1, 1), (1, w))
-
     avg_coeffs = np.mean(line_curves, axis=0)
-    xs = np.arange(w, dtype=np.float32)
-    curve_y = np.polyval(avg_coeffs, xs)
-    mid_y = h / 2.0
-    correction = mid_y - curve_y
-
-    for row in range(h):
-        alpha = row / h
-        map_y[row] += correction * np.sin(np.pi * alpha)
+    map_x, map_y = build_unwarp_maps(h, w, avg_coeffs, step=map_step)
 
     unwarped = cv2.remap(image, map_x, map_y, cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
-    return unwarped
\ No newline at end of file
+    return unwarped
+
+
+@lru_cache(maxsize=4)
+def _grid_geometry(h: int, w: int, step: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Sample positions, row blending profile and identity x-map for a page size.
+    Cached because consecutive pages of a document share their geometry.
+    """
+    coarse_w, coarse_h = -(-w // step), -(-h // step)
+    # Sample where cv2.resize's pixel-centre convention puts each coarse pixel,
+    # so bilinear upsampling reproduces the smooth map exactly in the interior
+    xs = ((np.arange(coarse_w) + 0.5) * w / coarse_w - 0.5).astype(np.float32)
+    ys = ((np.arange(coarse_h) + 0.5) * h / coarse_h - 0.5).astype(np.float32)
+    profile = np.sin(np.pi * ys / h).astype(np.float32)
+    map_x = np.tile(np.arange(w, dtype=np.float32), (h, 1))
+    for arr in (xs, ys, profile, map_x):
+        arr.setflags(write=False)
+    return xs, ys, profile, map_x
+
+
+def build_unwarp_maps(h: int, w: int, coeffs: np.ndarray, step: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Remap grids that shift each column by the fitted curve's offset from the
+    page centre, blended in with sin(pi * y / h) down the page. The
+    displacement is smooth, so with step > 1 it is evaluated on a coarse grid
+    and upsampled bilinearly.
+    """
+    xs, ys, profile, map_x = _grid_geometry(h, w, step)
+    correction = (h / 2.0 - np.polyval(coeffs, xs)).astype(np.float32)
+    displacement = profile[:, None] * correction[None, :]
+    if step > 1:
+        # Only the smooth displacement is upsampled; the identity rows are added exactly
+        displacement = cv2.resize(displacement, (w, h), interpolation=cv2.INTER_LINEAR)
+    rows = np.arange(h, dtype=np.float32) if step > 1 else ys
+    displacement += rows[:, None]
+    return map_x, displacement
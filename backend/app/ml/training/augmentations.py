@@ -2,7 +2,26 @@ import albumentations as A
 from albumentations.pytorch import ToTensorV2
 
 
-def get_train_transforms(image_size: int = 32) -> A.Compose:
+IMAGENET_MEAN = (0.485, 0.456, 0.406)
+IMAGENET_STD = (0.229, 0.224, 0.225)
+GRAY_MEAN = (0.5,)
+GRAY_STD = (0.5,)
+
+
+def _cell_normalize(in_channels: int) -> A.Normalize:
+    if in_channels == 1:
+        return A.Normalize(mean=GRAY_MEAN, std=GRAY_STD)
+    return A.Normalize(mean=IMAGENET_MEAN, std=IMAGENET_STD)
+
+
+def get_train_transforms(image_size: int = 32, in_channels: int = 3) -> A.Compose:
+    # ISONoise simulates colour sensor noise and needs RGB input
+    noise = [
+        A.GaussNoise(var_limit=(5.0, 30.0), p=1.0),
+        A.MultiplicativeNoise(multiplier=(0.9, 1.1), p=1.0),
+    ]
+    if in_channels == 3:
+        noise.insert(1, A.ISONoise(color_shift=(0.01, 0.05), intensity=(0.1, 0.3), p=1.0))
     return A.Compose([
         A.RandomRotate90(p=0.3),
         A.HorizontalFlip(p=0.3),
@@ -14,11 +33,7 @@ def get_train_transforms(image_size: int = 32) -> A.Compose:
             border_mode=0,
             p=0.6,
         ),
-        A.OneOf([
-            A.GaussNoise(var_limit=(5.0, 30.0), p=1.0),
-            A.ISONoise(color_shift=(0.01, 0.05), intensity=(0.1, 0.3), p=1.0),
-            A.MultiplicativeNoise(multiplier=(0.9, 1.1), p=1.0),
-        ], p=0.5),
+        A.OneOf(noise, p=0.5),
         A.OneOf([
             A.MotionBlur(blur_limit=3, p=1.0),
             A.GaussianBlur(blur_limit=(3, 5), p=1.0),
@@ -37,15 +52,15 @@ def get_train_transforms(image_size: int = 32) -> A.Compose:
             p=0.3,
         ),
         A.Resize(image_size, image_size),
-        A.Normalize(mean=(0.485, 0.456, 0.406), std=(0.229, 0.224, 0.225)),
+        _cell_normalize(in_channels),
         ToTensorV2(),
     ])
 
 
-def get_val_transforms(image_size: int = 32) -> A.Compose:
+def get_val_transforms(image_size: int = 32, in_channels: int = 3) -> A.Compose:
     return A.Compose([
         A.Resize(image_size, image_size),
-        A.Normalize(mean=(0.485, 0.456, 0.406), std=(0.229, 0.224, 0.225)),
+        _cell_normalize(in_channels),
         ToTensorV2(),
     ])
 
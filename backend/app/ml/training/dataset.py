@@ -31,9 +31,11 @@ class BrailleCellDataset(Dataset):
         val_split: float = 0.15,
         test_split: float = 0.05,
         seed: int = 42,
+        in_channels: int = 3,
     ):
         self.root_dir = root_dir
         self.transform = transform
+        self.in_channels = in_channels
         self.split = split
         self.samples: List[Tuple[str, int]] = []
         self.class_to_idx: Dict[str, int] = {}
@@ -72,11 +74,13 @@ class BrailleCellDataset(Dataset):
 
     def __getitem__(self, idx: int) -> Tuple[torch.Tensor, int]:
         path, label = self.samples[idx]
-        image = np.array(Image.open(path).convert("RGB"))
+        image = np.array(Image.open(path).convert("L" if self.in_channels == 1 else "RGB"))
 
         if self.transform:
             augmented = self.transform(image=image)
             image = augmented["image"]
+        elif image.ndim == 2:
+            image = torch.from_numpy(image).unsqueeze(0).float() / 255.0
         else:
             image = torch.from_numpy(image).permute(2, 0, 1).float() / 255.0
 
@@ -150,13 +154,14 @@ def get_classification_dataloaders(
     batch_size: int = 32,
     num_workers: int = 4,
     image_size: int = 32,
+    in_channels: int = 3,
 ) -> Dict[str, DataLoader]:
-    train_transform = get_train_transforms(image_size)
-    val_transform = get_val_transforms(image_size)
+    train_transform = get_train_transforms(image_size, in_channels)
+    val_transform = get_val_transforms(image_size, in_channels)
 
-    train_ds = BrailleCellDataset(root_dir, transform=train_transform, split="train")
-    val_ds = BrailleCellDataset(root_dir, transform=val_transform, split="val")
-    test_ds = BrailleCellDataset(root_dir, transform=val_transform, split="test")
+    train_ds = BrailleCellDataset(root_dir, transform=train_transform, split="train", in_channels=in_channels)
+    val_ds = BrailleCellDataset(root_dir, transform=val_transform, split="val", in_channels=in_channels)
+    test_ds = BrailleCellDataset(root_dir, transform=val_transform, split="test", in_channels=in_channels)
 
     return {
         "train": DataLoader(train_ds, batch_size=batch_size, shuffle=True,
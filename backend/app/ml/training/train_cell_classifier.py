@@ -1,6 +1,8 @@
 """
-Train a lightweight MobileNetV3 cell classifier — optimized for edge deployment.
-Uses knowledge distillation from the ResNet-18 teacher model.
+Train a lightweight cell classifier — optimized for edge deployment.
+Uses knowledge distillation from the ResNet-18 teacher model, then exports the
+student to ONNX and promotes it to the serving model if it stays within the
+allowed accuracy drop of the teacher.
 """
 import os
 import logging
@@ -14,19 +16,44 @@ from app.ml.training.dataset import get_classification_dataloaders
 from app.ml.training.losses import FocalLoss, LabelSmoothingCrossEntropy
 from app.ml.training.callbacks import EarlyStopping, ModelCheckpoint, MetricsTracker
 from app.ml.training.train_classifier import build_classifier, evaluate
+from app.ml.inference.model_loader import build_classifier_arch, infer_in_channels
+from app.core.config import settings
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-def build_student_model(num_classes: int = 64) -> nn.Module:
+IMAGENET_MEAN = torch.tensor([0.485, 0.456, 0.406]).view(1, 3, 1, 1)
+IMAGENET_STD = torch.tensor([0.229, 0.224, 0.225]).view(1, 3, 1, 1)
+GRAY_WEIGHTS = torch.tensor([0.299, 0.587, 0.114]).view(1, 3, 1, 1)
+
+
+def build_student_model(num_classes: int = 64, in_channels: int = 3) -> nn.Module:
     """Lightweight MobileNetV3-Small student model."""
     model = models.mobilenet_v3_small(weights=models.MobileNet_V3_Small_Weights.DEFAULT)
+    if in_channels == 1:
+        stem = model.features[0][0]
+        gray_stem = nn.Conv2d(1, stem.out_channels, stem.kernel_size, stride=stem.stride, padding=stem.padding, bias=False)
+        gray_stem.weight.data = stem.weight.data.sum(dim=1, keepdim=True)
+        model.features[0][0] = gray_stem
     in_features = model.classifier[-1].in_features
     model.classifier[-1] = nn.Linear(in_features, num_classes)
     return model
 
 
+def convert_cell_batch(images: torch.Tensor, in_channels: int) -> torch.Tensor:
+    """Re-normalise a training batch for a model with a different input channel count."""
+    if images.shape[1] == in_channels:
+        return images
+    mean, std = IMAGENET_MEAN.to(images.device), IMAGENET_STD.to(images.device)
+    if in_channels == 1:
+        rgb = images * std + mean
+        gray = (rgb * GRAY_WEIGHTS.to(images.device)).sum(dim=1, keepdim=True)
+        return (gray - 0.5) / 0.5
+    gray = images * 0.5 + 0.5
+    return (gray.expand(-1, 3, -1, -1) - mean) / std
+
+
 class KnowledgeDistillationLoss(nn.Module):
     """
     Knowledge Distillation Loss.
@@ -63,31 +90,56 @@ def train_cell_classifier_with_distillation(
     num_classes: int = 64,
     image_size: int = 32,
     num_workers: int = 4,
+    student_arch: str = "tiny",
+    promote: bool = True,
+    in_channels: int = None,
 ):
+    in_channels = in_channels or settings.CELL_INPUT_CHANNELS
+    if promote and not os.path.exists(teacher_path):
+        # Promotion gates the student on the teacher's accuracy; fail before
+        # training rather than distil from random soft targets and crash after
+        raise FileNotFoundError(
+            f"Teacher weights not found at {teacher_path}; train the teacher first or pass promote=False"
+        )
     device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-    logger.info(f"Training student cell classifier on: {device}")
+    logger.info(f"Training {in_channels}-channel {student_arch} student cell classifier on: {device}")
 
-    # Load teacher
-    teacher = build_classifier(num_classes=num_classes).to(device)
+    # Load teacher; it may have been trained on RGB input even when the student is grayscale
     if os.path.exists(teacher_path):
-        teacher.load_state_dict(torch.load(teacher_path, map_location=device))
+        state = torch.load(teacher_path, map_location=device)
+        teacher_channels = infer_in_channels(state)
+        teacher = build_classifier(num_classes=num_classes, pretrained=False, in_channels=teacher_channels)
+        teacher.load_state_dict(state)
         logger.info(f"Loaded teacher model from {teacher_path}")
-    teacher.eval()
+    else:
+        teacher_channels = in_channels
+        teacher = build_classifier(num_classes=num_classes, pretrained=False, in_channels=in_channels)
+        logger.warning(f"Teacher weights not found at {teacher_path}, distilling from an untrained teacher.")
+    teacher.to(device).eval()
     for p in teacher.parameters():
         p.requires_grad_(False)
 
-    student = build_student_model(num_classes=num_classes).to(device)
+    if student_arch == "mobilenet_v3_small":
+        student = build_student_model(num_classes=num_classes, in_channels=in_channels).to(device)
+        checkpoint_name = "cell_classifier"
+    else:
+        student = build_classifier_arch(student_arch, num_classes=num_classes, in_channels=in_channels).to(device)
+        checkpoint_name = f"classifier_{student_arch}"
     criterion = KnowledgeDistillationLoss(temperature=4.0, alpha=0.3)
     optimizer = optim.AdamW(student.parameters(), lr=lr, weight_decay=1e-4)
     scheduler = optim.lr_scheduler.CosineAnnealingLR(optimizer, T_max=num_epochs, eta_min=1e-6)
     scaler = GradScaler()
 
     dataloaders = get_classification_dataloaders(
-        root_dir=data_dir, batch_size=batch_size, num_workers=num_workers, image_size=image_size
+        root_dir=data_dir,
+        batch_size=batch_size,
+        num_workers=num_workers,
+        image_size=image_size,
+        in_channels=in_channels,
     )
 
     early_stopping = EarlyStopping(patience=12, mode="min")
-    checkpoint = ModelCheckpoint(artifacts_dir, "cell_classifier", monitor="val_loss", mode="min")
+    checkpoint = ModelCheckpoint(artifacts_dir, checkpoint_name, monitor="val_loss", mode="min")
     tracker = MetricsTracker(os.path.join(artifacts_dir, "cell_classifier_metrics.json"))
 
     for epoch in range(1, num_epochs + 1):
@@ -103,7 +155,7 @@ def train_cell_classifier_with_distillation(
             with autocast():
                 student_logits = student(images)
                 with torch.no_grad():
-                    teacher_logits = teacher(images)
+                    teacher_logits = teacher(convert_cell_batch(images, teacher_channels))
                 loss = criterion(student_logits, teacher_logits, labels)
 
             scaler.scale(loss).backward()
@@ -135,6 +187,49 @@ def train_cell_classifier_with_distillation(
 
     logger.info("Cell classifier training complete.")
 
+    if promote:
+        export_and_promote_student(
+            student_arch,
+            weights_path=os.path.join(artifacts_dir, f"{checkpoint_name}_best.pt"),
+            teacher_path=teacher_path,
+            num_classes=num_classes,
+            image_size=image_size,
+        )
+
+
+def export_and_promote_student(
+    student_arch: str,
+    weights_path: str,
+    teacher_path: str,
+    num_classes: int = 64,
+    image_size: int = 32,
+) -> dict:
+    """Export the best student checkpoint to ONNX and gate its promotion on accuracy."""
+    from app.ml.export.export_to_onnx import export_classifier_to_onnx
+    from app.ml.export.promote_model import promote_classifier
+
+    onnx_path = os.path.splitext(weights_path)[0].replace("_best", "") + ".onnx"
+    try:
+        export_classifier_to_onnx(
+            weights_path=weights_path,
+            output_path=onnx_path,
+            num_classes=num_classes,
+            image_size=image_size,
+            arch=student_arch,
+        )
+    except Exception as e:
+        logger.warning(f"ONNX export of {student_arch} student failed: {e}")
+        onnx_path = None
+
+    return promote_classifier(
+        arch=student_arch,
+        weights_path=weights_path,
+        onnx_path=onnx_path,
+        teacher_path=teacher_path,
+        num_classes=num_classes,
+        max_accuracy_drop=settings.DISTILLATION_MAX_ACCURACY_DROP,
+    )
+
 
 if __name__ == "__main__":
     train_cell_classifier_with_distillation()
\ No newline at end of file
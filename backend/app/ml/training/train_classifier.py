@@ -24,10 +24,15 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-def build_classifier(num_classes: int = 64, pretrained: bool = True) -> nn.Module:
+def build_classifier(num_classes: int = 64, pretrained: bool = True, in_channels: int = 3) -> nn.Module:
     """Build ResNet-18 based classifier for Braille cells."""
     model = models.resnet18(weights=models.ResNet18_Weights.DEFAULT if pretrained else None)
     # Modify first conv for single-channel or keep RGB
+    if in_channels == 1:
+        rgb_weight = model.conv1.weight.data
+        model.conv1 = nn.Conv2d(1, 64, kernel_size=7, stride=2, padding=3, bias=False)
+        # Summing the pretrained RGB filters keeps their response to a gray image
+        model.conv1.weight.data = rgb_weight.sum(dim=1, keepdim=True)
     in_features = model.fc.in_features
     model.fc = nn.Sequential(
         nn.Dropout(0.4),
@@ -127,7 +132,9 @@ def train_classifier(
     num_workers: int = 4,
     cell_size: int = 32,
     epochs: int = 20,
+    in_channels: int = None,
 ):
+    in_channels = in_channels or settings.CELL_INPUT_CHANNELS
     device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
     logger.info(f"Training on device: {device}")
 
@@ -136,9 +143,10 @@ def train_classifier(
         batch_size=batch_size,
         num_workers=num_workers,
         image_size=image_size,
+        in_channels=in_channels,
     )
 
-    model = build_classifier(num_classes=num_classes).to(device)
+    model = build_classifier(num_classes=num_classes, in_channels=in_channels).to(device)
     criterion = LabelSmoothingCrossEntropy(smoothing=0.1)
     optimizer = optim.AdamW(model.parameters(), lr=lr, weight_decay=weight_decay)
     scheduler = optim.lr_scheduler.CosineAnnealingLR(optimizer, T_max=num_epochs, eta_min=1e-6)
@@ -198,6 +206,7 @@ if __name__ == "__main__":
     parser.add_argument("--epochs", type=int, default=80)
     parser.add_argument("--batch-size", type=int, default=64)
     parser.add_argument("--lr", type=float, default=1e-3)
+    parser.add_argument("--in-channels", type=int, choices=[1, 3], default=settings.CELL_INPUT_CHANNELS)
     args = parser.parse_args()
     train_classifier(
         data_dir=args.data_dir,
@@ -205,4 +214,5 @@ if __name__ == "__main__":
         num_epochs=args.epochs,
         batch_size=args.batch_size,
         lr=args.lr,
+        in_channels=args.in_channels,
     )
\ No newline at end of file
@@ -17,6 +17,7 @@ from PIL import Image
 
 from app.ml.training.callbacks import EarlyStopping, ModelCheckpoint, MetricsTracker
 from app.ml.training.generate_synthetic_data import render_braille_cell
+from app.core.config import settings
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -25,9 +26,10 @@ logger = logging.getLogger(__name__)
 class SyntheticDotDataset(Dataset):
     """On-the-fly synthetic dot pattern dataset."""
 
-    def __init__(self, size: int = 50000, cell_size: int = 32):
+    def __init__(self, size: int = 50000, cell_size: int = 32, in_channels: int = 3):
         self.size = size
         self.cell_size = cell_size
+        self.in_channels = in_channels
         self.transform = A.Compose([
             A.RandomBrightnessContrast(p=0.5),
             A.GaussNoise(var_limit=(5, 25), p=0.4),
@@ -41,8 +43,9 @@ class SyntheticDotDataset(Dataset):
     def __getitem__(self, idx):
         pattern = np.random.randint(0, 64)
         img = render_braille_cell(pattern, self.cell_size, add_noise=True)
-        img_rgb = np.stack([img, img, img], axis=-1)
-        transformed = self.transform(image=img_rgb)
+        if self.in_channels == 3:
+            img = np.stack([img, img, img], axis=-1)
+        transformed = self.transform(image=img)
         image = transformed["image"]
         label = torch.tensor(
             [(pattern >> i) & 1 for i in range(6)], dtype=torch.float32
@@ -53,10 +56,10 @@ class SyntheticDotDataset(Dataset):
 class DotDetectorCNN(nn.Module):
     """Lightweight CNN for 6-dot binary classification."""
 
-    def __init__(self):
+    def __init__(self, in_channels: int = 3):
         super().__init__()
         self.features = nn.Sequential(
-            nn.Conv2d(3, 32, 3, padding=1), nn.BatchNorm2d(32), nn.ReLU(inplace=True),
+            nn.Conv2d(in_channels, 32, 3, padding=1), nn.BatchNorm2d(32), nn.ReLU(inplace=True),
             nn.Conv2d(32, 32, 3, padding=1), nn.BatchNorm2d(32), nn.ReLU(inplace=True),
             nn.MaxPool2d(2),                  # 16x16
             nn.Conv2d(32, 64, 3, padding=1), nn.BatchNorm2d(64), nn.ReLU(inplace=True),
@@ -86,11 +89,13 @@ def train_dot_detector(
     dataset_size: int = 100000,
     cell_size: int = 32,
     num_workers: int = 4,
+    in_channels: int = None,
 ):
+    in_channels = in_channels or settings.CELL_INPUT_CHANNELS
     device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-    logger.info(f"Training dot detector on: {device}")
+    logger.info(f"Training {in_channels}-channel dot detector on: {device}")
 
-    dataset = SyntheticDotDataset(size=dataset_size, cell_size=cell_size)
+    dataset = SyntheticDotDataset(size=dataset_size, cell_size=cell_size, in_channels=in_channels)
     val_size = int(0.15 * len(dataset))
     test_size = int(0.05 * len(dataset))
     train_size = len(dataset) - val_size - test_size
@@ -100,7 +105,7 @@ def train_dot_detector(
     val_loader = DataLoader(val_ds, batch_size=batch_size, shuffle=False, num_workers=num_workers, pin_memory=True)
     test_loader = DataLoader(test_ds, batch_size=batch_size, shuffle=False, num_workers=num_workers, pin_memory=True)
 
-    model = DotDetectorCNN().to(device)
+    model = DotDetectorCNN(in_channels=in_channels).to(device)
     criterion = nn.BCEWithLogitsLoss()
     optimizer = optim.AdamW(model.parameters(), lr=lr, weight_decay=1e-4)
     scheduler = optim.lr_scheduler.OneCycleLR(
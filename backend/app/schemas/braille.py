@@ -1,9 +1,10 @@
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 from pydantic import BaseModel
 
 
 class BrailleConvertRequest(BaseModel):
     document_id: int
+    grade: int = 1
     options: Optional[Dict[str, Any]] = {}
 
 
@@ -26,6 +27,23 @@ class BrailleTranslateResponse(BaseModel):
     confidence: float
 
 
+class BrailleBulkTranslateRequest(BaseModel):
+    items: List[str]
+    grade: int = 1
+
+
+class BrailleBulkTranslateItem(BaseModel):
+    translated: str
+    confidence: float
+
+
+class BrailleBulkTranslateResponse(BaseModel):
+    grade: int
+    count: int
+    results: List[BrailleBulkTranslateItem]
+    processing_time_ms: float
+
+
 class OCRRequest(BaseModel):
     document_id: int
     language: str = "eng"
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from pydantic import BaseModel
 
 
@@ -17,6 +17,23 @@ class JobResponse(BaseModel):
         from_attributes = True
 
 
+class PageResultResponse(BaseModel):
+    page_index: int
+    text: Optional[str]
+    cell_count: int
+    confidence: float
+    processing_time_ms: float
+    cells: Optional[List[Dict[str, Any]]] = None
+    created_at: datetime
+
+
+class JobPagesResponse(BaseModel):
+    job_id: int
+    status: str
+    progress: int
+    pages: List[PageResultResponse]
+
+
 class JobListResponse(BaseModel):
     jobs: List[JobResponse]
     total: int
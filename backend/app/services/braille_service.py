@@ -1,8 +1,16 @@
+import asyncio
+import codecs
 import logging
+import re
+import threading
 import time
-from typing import Any, Dict, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
 
 from app.core.config import settings
+from app.services.job_service import JobService
+from app.services.page_result_service import PageResultService
 
 logger = logging.getLogger(__name__)
 
@@ -18,6 +26,46 @@ BRAILLE_TO_CHAR: Dict[str, str] = {
 
 CHAR_TO_BRAILLE: Dict[str, str] = {v: k for k, v in BRAILLE_TO_CHAR.items()}
 
+
+def _grade1_table() -> Dict[int, str]:
+    """Grade 1 reading of every cell in the U+2800-U+28FF block that has one."""
+    table = {}
+    for braille, char in BRAILLE_TO_CHAR.items():
+        table[ord(braille)] = char
+        if char != " ":
+            # 8-dot computer Braille marks a capital letter with dot 7
+            table[ord(braille) | 0x40] = char.upper()
+    return table
+
+
+GRADE1_TABLE: Dict[int, str] = _grade1_table()
+BRAILLE_BLOCK = 0x2800
+
+
+def _grade1_lookup() -> Tuple[np.ndarray, np.ndarray]:
+    """(output code point, recognised) per cell of the block; unknown cells map to themselves."""
+    lut = np.arange(BRAILLE_BLOCK, BRAILLE_BLOCK + 256, dtype=np.uint32)
+    known = np.zeros(256, dtype=bool)
+    for code, char in GRADE1_TABLE.items():
+        lut[code - BRAILLE_BLOCK] = ord(char)
+        known[code - BRAILLE_BLOCK] = True
+    return lut, known
+
+
+_GRADE1_LUT, _GRADE1_KNOWN = _grade1_lookup()
+# Grade 2 reads the 6-dot cells U+2800-U+283F; the decoder reports which it could not
+_GRADE2_CELLS = np.arange(256) < 64
+
+
+def _block_offsets(text: str) -> np.ndarray:
+    """Code points as offsets into the Braille block; characters outside it land at >= 256."""
+    codes = np.frombuffer(text.encode("utf-32-le", "surrogatepass"), dtype=np.uint32)
+    return codes - np.uint32(BRAILLE_BLOCK)
+
+
+# A streamed chunk may end mid-word; Grade 2 words are held back until complete
+_TRAILING_WORD = re.compile("[\u2801-\u283f]+$")
+
 # Dot pattern to character map (6-dot braille cell)
 DOT_PATTERN_TO_CHAR: Dict[int, str] = {
     0b000001: "a", 0b000011: "b", 0b001001: "c", 0b011001: "d",
@@ -33,34 +81,90 @@ DOT_PATTERN_TO_CHAR: Dict[int, str] = {
 class BrailleService:
     def __init__(self):
         self._pipeline = None
+        self._pipeline_lock = threading.Lock()
+        self._grade2 = None
+        self._pages = PageResultService()
+        self._jobs = JobService()
         logger.info("BrailleService initialized")
 
     def _get_pipeline(self):
-        if self._pipeline is None:
-            from app.ml.inference.pipeline import BrailleInferencePipeline
-            self._pipeline = BrailleInferencePipeline()
+        """Load the models on first use; call from a worker thread, not the event loop."""
+        with self._pipeline_lock:
+            if self._pipeline is None:
+                from app.ml.inference.pipeline import BraillePipeline
+                self._pipeline = BraillePipeline()
         return self._pipeline
 
-    def translate_braille_to_text(self, braille_text: str) -> Dict[str, Any]:
-        """Translate unicode braille string to plain text."""
+    def translate_braille_to_text(self, braille_text: str, grade: int = 1) -> Dict[str, Any]:
+        """Translate unicode braille string to plain text (grade 2 expands contractions)."""
         t0 = time.perf_counter()
-        result_chars = []
-        for ch in braille_text:
-            mapped = BRAILLE_TO_CHAR.get(ch, ch)
-            result_chars.append(mapped)
-        text = "".join(result_chars)
+        text, confidence = self._translate_scored(braille_text, grade)
         elapsed = (time.perf_counter() - t0) * 1000
 
-        known = sum(1 for ch in braille_text if ch in BRAILLE_TO_CHAR)
-        confidence = known / max(len(braille_text), 1)
-
         return {
             "text": text,
-            "grade": 1,
+            "grade": grade,
             "confidence": round(confidence, 4),
             "processing_time_ms": round(elapsed, 2),
         }
 
+    def translate_many(self, braille_texts: Sequence[str], grade: int = 1) -> List[Dict[str, Any]]:
+        """Translate many strings; Grade 2 words are decoded once across the whole batch."""
+        results = []
+        for braille_text in braille_texts:
+            text, confidence = self._translate_scored(braille_text, grade)
+            results.append({"text": text, "confidence": round(confidence, 4)})
+        return results
+
+    async def translate_stream(self, chunks: AsyncIterator[bytes], grade: int = 1) -> AsyncIterator[str]:
+        """Translate a UTF-8 byte stream of Unicode Braille chunk by chunk, in constant memory."""
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        pending = ""
+        async for chunk in chunks:
+            text = pending + decoder.decode(chunk)
+            cut = len(text)
+            if grade == 2:
+                match = _TRAILING_WORD.search(text)
+                if match:
+                    cut = match.start()
+            pending = text[cut:]
+            if cut:
+                yield self._translate(text[:cut], grade)
+        text = pending + decoder.decode(b"", final=True)
+        if text:
+            yield self._translate(text, grade)
+
+    def _translate(self, braille_text: str, grade: int) -> str:
+        return self._translate_scored(braille_text, grade)[0]
+
+    def _translate_scored(self, braille_text: str, grade: int) -> Tuple[str, float]:
+        """
+        (text, share of characters that are recognised cells). Grade 1 is one
+        vectorised table lookup over the code points; characters outside the
+        Braille block pass through unchanged.
+        """
+        if not braille_text:
+            return braille_text, 1.0
+        offsets = _block_offsets(braille_text)
+        in_block = offsets < 256
+        cell_offsets = offsets[in_block]
+        if grade == 2:
+            text, unread = self._get_grade2().decode_unicode_scored(braille_text)
+            known = np.count_nonzero(_GRADE2_CELLS[cell_offsets]) - unread
+        else:
+            codes = offsets + np.uint32(BRAILLE_BLOCK)
+            codes[in_block] = _GRADE1_LUT[cell_offsets]
+            text = codes.tobytes().decode("utf-32-le", "surrogatepass")
+            known = np.count_nonzero(_GRADE1_KNOWN[cell_offsets])
+        return text, known / len(braille_text)
+
+    def _get_grade2(self):
+        if self._grade2 is None:
+            from app.ml.inference.grade2 import Grade2Decoder
+
+            self._grade2 = Grade2Decoder()
+        return self._grade2
+
     def dot_pattern_to_char(self, dot_pattern: int) -> str:
         """Convert 6-bit dot pattern integer to character."""
         return DOT_PATTERN_TO_CHAR.get(dot_pattern, "?")
@@ -75,9 +179,16 @@ class BrailleService:
         document_path: str,
         options: Optional[Dict] = None,
     ) -> None:
-        """Background task: run full pipeline and update job in DB."""
+        """
+        Background task: recognise the document page by page, storing each page
+        as it completes. Pages already stored for this job are skipped, so a
+        re-run continues where a failed or interrupted run stopped. While it runs
+        the job heartbeats; if this process dies the reaper resubmits it.
+        """
         from app.db.session import AsyncSessionLocal
         from app.db.models.conversion_job import ConversionJob
+        from app.ml.inference.document_pipeline import process_document
+        from app.ml.preprocessing.ingest import page_count
         from sqlalchemy import select
         import datetime
 
@@ -90,15 +201,52 @@ class BrailleService:
             if not job:
                 logger.error(f"Job {job_id} not found")
                 return
-
-            job.status = "processing"
-            await db.commit()
+            if not await self._jobs.claim(db, job_id):
+                logger.info(f"Job {job_id} is already running elsewhere or finished, skipping")
+                return
+            await db.refresh(job)
+            heartbeat = asyncio.create_task(self._heartbeat(job_id))
 
             try:
-                pipeline = self._get_pipeline()
-                inference_result = await pipeline.run(document_path)
+                total = page_count(document_path)
+                done = await self._pages.completed_pages(db, job_id)
+                remaining = [i for i in range(total) if i not in done]
+                if done:
+                    logger.info(f"Job {job_id}: resuming, {len(done)}/{total} pages already done")
+
+                loop = asyncio.get_running_loop()
+                finished = len(done)
+
+                async def save(page: Dict[str, Any]) -> None:
+                    nonlocal finished
+                    async with AsyncSessionLocal() as page_db:
+                        await self._pages.save_page(page_db, job_id, job.document_id, page)
+                        finished += 1
+                        page_job = await page_db.get(ConversionJob, job_id)
+                        page_job.progress = int(100 * finished / max(total, 1))
+                        await page_db.commit()
+
+                def on_page(page: Dict[str, Any]) -> None:
+                    # Called on the worker thread; persist before the next page is consumed
+                    asyncio.run_coroutine_threadsafe(save(page), loop).result()
+
+                grade = job.braille_grade
+
+                def run() -> None:
+                    # Model loading on the first job happens here, off the event loop
+                    process_document(
+                        document_path,
+                        on_page=on_page,
+                        pages=remaining,
+                        pipeline=self._get_pipeline(),
+                        grade=grade,
+                    )
+
+                await asyncio.to_thread(run)
+                await db.refresh(job)
                 job.status = "completed"
-                job.result_text = inference_result.get("text", "")
+                job.progress = 100
+                job.result_text = await self._pages.assemble_text(db, job_id)
                 job.completed_at = datetime.datetime.utcnow()
                 logger.info(f"Job {job_id} completed successfully")
             except Exception as e:
@@ -106,5 +254,18 @@ class BrailleService:
                 job.status = "failed"
                 job.error_message = str(e)
                 job.completed_at = datetime.datetime.utcnow()
+            finally:
+                heartbeat.cancel()
+
+            await db.commit()
 
-            await db.commit()
\ No newline at end of file
+    async def _heartbeat(self, job_id: int) -> None:
+        from app.db.session import AsyncSessionLocal
+
+        while True:
+            await asyncio.sleep(settings.JOB_HEARTBEAT_SECONDS)
+            try:
+                async with AsyncSessionLocal() as db:
+                    await self._jobs.heartbeat(db, job_id)
+            except Exception as e:
+                logger.warning(f"Heartbeat for job {job_id} failed: {e}")
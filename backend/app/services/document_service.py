@@ -1,16 +1,20 @@
+import asyncio
 import logging
-import os
 from typing import List, Optional, Tuple
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
 
 from app.db.models.document import Document
+from app.services.storage_service import StorageService
 
 logger = logging.getLogger(__name__)
 
 
 class DocumentService:
+    def __init__(self):
+        self._storage = StorageService()
+
     async def get_by_id(
         self, db: AsyncSession, document_id: int, user_id: int
     ) -> Optional[Document]:
@@ -50,12 +54,47 @@ class DocumentService:
         doc = result.scalar_one_or_none()
         if not doc:
             return False
-        if os.path.exists(doc.file_path):
-            os.remove(doc.file_path)
+        file_path, digest = doc.file_path, doc.content_sha256
         await db.delete(doc)
         await db.commit()
+        await self._remove_if_unused(db, file_path, digest)
         return True
 
+    async def _remove_if_unused(self, db: AsyncSession, file_path: str, content_sha256: Optional[str]) -> None:
+        """
+        Uploads are deduplicated, so the file goes only with its last document.
+        It is moved aside before the final count: an upload of the same content
+        that commits before that count is seen here and the file is put back;
+        one that commits after it finds the file gone and restores its own copy
+        (StorageService.release).
+        """
+        if await self.file_in_use(db, file_path, content_sha256):
+            return
+        aside = await asyncio.to_thread(self._storage.detach, file_path)
+        if aside is None:
+            return
+        # End the read transaction so the recount sees rows committed since
+        await db.commit()
+        if await self.file_in_use(db, file_path, content_sha256):
+            await asyncio.to_thread(self._storage.restore, aside, file_path)
+        else:
+            await asyncio.to_thread(self._storage.delete_file, aside)
+
+    async def file_in_use(self, db: AsyncSession, file_path: str, content_sha256: Optional[str]) -> bool:
+        """True if any document still uses this stored file."""
+        if content_sha256 is None:
+            # Uploaded before deduplication: the file belonged to this document alone
+            return False
+        # Files are <sha256>.<ext>, so the same bytes under two extensions are two
+        # files; the hash narrows the search through its index, the path picks the file
+        result = await db.execute(
+            select(func.count()).select_from(Document).where(
+                Document.content_sha256 == content_sha256,
+                Document.file_path == file_path,
+            )
+        )
+        return result.scalar() > 0
+
     async def update_status(
         self, db: AsyncSession, document_id: int, status: str
     ) -> Optional[Document]:
@@ -1,20 +1,36 @@
+import asyncio
 import logging
+import os
 import time
 from typing import Any, Dict
 
+from app.core.config import settings
+from app.ml.inference.document_pipeline import JsonlPageWriter, merge_page_results, process_document
+from app.ml.preprocessing.ingest import MULTIPAGE_EXTENSIONS
+
 logger = logging.getLogger(__name__)
 
 
 class InferenceService:
     def __init__(self):
-        self._pipeline = None
+        self._pipelines = {}
         logger.info("InferenceService initialized")
 
-    def _get_pipeline(self):
-        if self._pipeline is None:
-            from app.ml.inference.pipeline import BrailleInferencePipeline
-            self._pipeline = BrailleInferencePipeline()
-        return self._pipeline
+    def _get_pipeline(self, use_onnx: bool = True):
+        if use_onnx not in self._pipelines:
+            from app.ml.inference.pipeline import BraillePipeline
+            self._pipelines[use_onnx] = BraillePipeline(use_onnx=use_onnx)
+        return self._pipelines[use_onnx]
+
+    def _run_document(self, path: str, pipeline, use_onnx: bool) -> Dict[str, Any]:
+        """Recognise a PDF/TIFF page by page, writing each page's result as it completes."""
+        name = os.path.splitext(os.path.basename(path))[0]
+        writer = JsonlPageWriter(os.path.join(settings.OUTPUT_DIR, "pages", f"{name}.jsonl"))
+        try:
+            pages = process_document(path, on_page=writer, use_onnx=use_onnx, pipeline=pipeline)
+        finally:
+            writer.close()
+        return merge_page_results(pages)
 
     async def run_full_pipeline(
         self,
@@ -24,8 +40,12 @@ class InferenceService:
         """Run the full braille detection + classification pipeline."""
         t0 = time.perf_counter()
         try:
-            pipeline = self._get_pipeline()
-            result = await pipeline.run(image_path, use_onnx=use_onnx)
+            pipeline = self._get_pipeline(use_onnx)
+            if image_path.rsplit(".", 1)[-1].lower() in MULTIPAGE_EXTENSIONS:
+                result = await asyncio.to_thread(self._run_document, image_path, pipeline, use_onnx)
+            else:
+                # The file is mmapped and decoded once by the pipeline's ingest layer
+                result = await asyncio.to_thread(pipeline.run_from_path, image_path)
             elapsed = (time.perf_counter() - t0) * 1000
             result["processing_time_ms"] = round(elapsed, 2)
             result["model_version"] = "1.0.0"
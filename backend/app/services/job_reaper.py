@@ -0,0 +1,69 @@
+import asyncio
+import datetime
+import logging
+from typing import Optional, Set
+
+from app.core.config import settings
+from app.services.braille_service import BrailleService
+from app.services.job_service import JobService
+
+logger = logging.getLogger(__name__)
+
+
+class JobReaper:
+    """
+    Periodically finds conversion jobs whose worker stopped heartbeating (crash,
+    deploy, OOM kill) and resubmits them. A resubmitted job skips the pages it
+    already stored, so only unfinished work is redone. Jobs that keep dying are
+    failed after JOB_MAX_ATTEMPTS runs instead of looping forever.
+    """
+
+    def __init__(self, braille_service: BrailleService, interval: int = None):
+        self.braille_service = braille_service
+        self.interval = interval or settings.JOB_REAPER_INTERVAL_SECONDS
+        self._jobs = JobService()
+        self._task: Optional[asyncio.Task] = None
+        self._running: Set[asyncio.Task] = set()
+
+    async def sweep(self) -> int:
+        """Resubmit or fail every stale job once; returns the number resubmitted."""
+        from app.db.session import AsyncSessionLocal
+
+        resubmitted = 0
+        async with AsyncSessionLocal() as db:
+            for job, document_path in await self._jobs.find_stale(db):
+                if job.attempts >= settings.JOB_MAX_ATTEMPTS:
+                    job.status = "failed"
+                    job.error_message = f"Abandoned after {job.attempts} attempts without completing"
+                    job.completed_at = datetime.datetime.utcnow()
+                    await db.commit()
+                    logger.warning(f"Job {job.id} failed: worker died {job.attempts} times")
+                    continue
+                logger.info(f"Resubmitting stale job {job.id} (attempt {job.attempts + 1})")
+                # process_conversion_job claims the job atomically, so a job picked up
+                # by another instance in the meantime is skipped there
+                task = asyncio.create_task(
+                    self.braille_service.process_conversion_job(job.id, document_path)
+                )
+                self._running.add(task)
+                task.add_done_callback(self._running.discard)
+                resubmitted += 1
+        return resubmitted
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                await self.sweep()
+            except Exception as e:
+                logger.error(f"Job reaper sweep failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+            logger.info(f"Job reaper started (every {self.interval}s, stale after {settings.JOB_STALE_SECONDS}s)")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
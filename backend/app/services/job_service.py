@@ -3,9 +3,11 @@ import logging
 from typing import List, Optional, Tuple
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import and_, or_, select, func, text, update
 
+from app.core.config import settings
 from app.db.models.conversion_job import ConversionJob
+from app.db.models.document import Document
 
 logger = logging.getLogger(__name__)
 
@@ -66,4 +68,68 @@ class JobService:
                 job.completed_at = datetime.datetime.utcnow()
             await db.commit()
             await db.refresh(job)
-        return job
\ No newline at end of file
+        return job
+
+    async def heartbeat(self, db: AsyncSession, job_id: int) -> None:
+        await db.execute(
+            update(ConversionJob)
+            .where(ConversionJob.id == job_id, ConversionJob.status == "processing")
+            .values(heartbeat_at=datetime.datetime.now(datetime.timezone.utc))
+        )
+        await db.commit()
+
+    async def claim(self, db: AsyncSession, job_id: int) -> bool:
+        """
+        Mark a job as running by this worker and count the attempt. The update
+        only matches a job nobody is heartbeating, so two workers (or a worker
+        and the reaper) cannot both pick it up.
+        """
+        now = datetime.datetime.now(datetime.timezone.utc)
+        cutoff = now - datetime.timedelta(seconds=settings.JOB_STALE_SECONDS)
+        result = await db.execute(
+            update(ConversionJob)
+            .where(
+                ConversionJob.id == job_id,
+                or_(
+                    ConversionJob.status.in_(("pending", "failed")),
+                    and_(
+                        ConversionJob.status == "processing",
+                        or_(ConversionJob.heartbeat_at.is_(None), ConversionJob.heartbeat_at < cutoff),
+                    ),
+                ),
+            )
+            .values(
+                status="processing",
+                heartbeat_at=now,
+                attempts=ConversionJob.attempts + 1,
+                error_message=None,
+            )
+        )
+        await db.commit()
+        return result.rowcount == 1
+
+    async def find_stale(self, db: AsyncSession) -> List[Tuple[ConversionJob, str]]:
+        """
+        (job, document path) for jobs whose worker stopped heartbeating, plus
+        pending jobs whose background task never started (e.g. lost in a deploy).
+        """
+        cutoff = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(
+            seconds=settings.JOB_STALE_SECONDS
+        )
+        # created_at is the server default now(), in the DB's own time zone, so
+        # its cutoff is computed by the DB too (heartbeat_at is written in UTC here)
+        created_cutoff = func.date_sub(func.now(), text(f"INTERVAL {int(settings.JOB_STALE_SECONDS)} SECOND"))
+        result = await db.execute(
+            select(ConversionJob, Document.file_path)
+            .join(Document, Document.id == ConversionJob.document_id)
+            .where(
+                or_(
+                    and_(
+                        ConversionJob.status == "processing",
+                        or_(ConversionJob.heartbeat_at.is_(None), ConversionJob.heartbeat_at < cutoff),
+                    ),
+                    and_(ConversionJob.status == "pending", ConversionJob.created_at < created_cutoff),
+                )
+            )
+        )
+        return [(job, path) for job, path in result.all()]
@@ -7,6 +7,7 @@ import pytesseract
 from PIL import Image
 
 from app.core.config import settings
+from app.ml.preprocessing.ingest import iter_pages
 
 logger = logging.getLogger(__name__)
 pytesseract.pytesseract.tesseract_cmd = settings.TESSERACT_PATH
@@ -24,24 +25,29 @@ class OCRService:
     ) -> Dict[str, Any]:
         t0 = time.perf_counter()
         try:
-            image = Image.open(file_path).convert("RGB")
-            if use_ml:
-                image = self._preprocess_image(image)
+            page_texts, text_parts, confs = [], [], []
+            # PDFs and multi-frame TIFFs are read one page at a time
+            for _, page, _ in iter_pages(file_path):
+                image = Image.fromarray(page)
+                if use_ml:
+                    image = self._preprocess_image(image)
 
-            data = pytesseract.image_to_data(
-                image,
-                lang=language,
-                output_type=pytesseract.Output.DICT,
-            )
-            text_parts = [
-                w for w, c in zip(data["text"], data["conf"])
-                if int(c) > 0 and w.strip()
-            ]
-            confs = [
-                int(c) for c in data["conf"]
-                if int(c) > 0
-            ]
-            text = " ".join(text_parts)
+                data = pytesseract.image_to_data(
+                    image,
+                    lang=language,
+                    output_type=pytesseract.Output.DICT,
+                )
+                words = [
+                    w for w, c in zip(data["text"], data["conf"])
+                    if int(c) > 0 and w.strip()
+                ]
+                confs.extend(
+                    int(c) for c in data["conf"]
+                    if int(c) > 0
+                )
+                text_parts.extend(words)
+                page_texts.append(" ".join(words))
+            text = "\f".join(page_texts)
             avg_conf = sum(confs) / max(len(confs), 1) / 100.0
             elapsed = (time.perf_counter() - t0) * 1000
 
@@ -68,12 +74,13 @@ class OCRService:
         }
 
     def _preprocess_image(self, image: Image.Image) -> Image.Image:
-        """Basic preprocessing: grayscale + threshold."""
+        """Basic preprocessing: grayscale + adaptive denoise + threshold."""
         import numpy as np
         import cv2
+        from app.ml.preprocessing.denoise import adaptive_denoise
 
-        arr = np.array(image)
-        gray = cv2.cvtColor(arr, cv2.COLOR_RGB2GRAY)
+        gray = np.array(image.convert("L"))
+        # Denoise before thresholding, and only as much as the estimated noise needs
+        gray = adaptive_denoise(gray)
         _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
-        denoised = cv2.fastNlMeansDenoising(binary, h=10)
-        return Image.fromarray(denoised)
\ No newline at end of file
+        return Image.fromarray(binary)
\ No newline at end of file
@@ -0,0 +1,74 @@
+import logging
+import zlib
+from typing import Any, Dict, List, Optional, Set
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.models.page_result import PageResult
+
+logger = logging.getLogger(__name__)
+
+# One record per cell: box (4 x float32), pattern (uint8), confidence (float16)
+CELL_DTYPE = np.dtype([("box", "<f4", (4,)), ("pattern", "u1"), ("confidence", "<f2")])
+
+
+def encode_cells(cells: List[Dict[str, Any]]) -> Optional[bytes]:
+    """Pack cell geometry into a compact zlib blob (~11 bytes per cell before compression)."""
+    if not cells:
+        return None
+    packed = np.empty(len(cells), dtype=CELL_DTYPE)
+    packed["box"] = [c["box"][:4] for c in cells]
+    packed["pattern"] = [c["pattern"] for c in cells]
+    packed["confidence"] = [c["confidence"] for c in cells]
+    return zlib.compress(packed.tobytes(), 6)
+
+
+def decode_cells(blob: Optional[bytes]) -> List[Dict[str, Any]]:
+    if not blob:
+        return []
+    packed = np.frombuffer(zlib.decompress(blob), dtype=CELL_DTYPE)
+    return [
+        {"box": box.tolist(), "pattern": int(pattern), "confidence": float(confidence)}
+        for box, pattern, confidence in zip(packed["box"], packed["pattern"], packed["confidence"])
+    ]
+
+
+class PageResultService:
+    async def save_page(
+        self, db: AsyncSession, job_id: int, document_id: int, result: Dict[str, Any]
+    ) -> PageResult:
+        page = PageResult(
+            job_id=job_id,
+            document_id=document_id,
+            page_index=result["page_index"],
+            text=result.get("text", ""),
+            cell_count=result.get("detected_cells", 0),
+            confidence=float(result.get("confidence", 0.0)),
+            processing_time_ms=float(result.get("page_time_ms", result.get("processing_time_ms", 0.0))),
+            cell_geometry=encode_cells(result.get("cells", [])) if settings.STORE_CELL_GEOMETRY else None,
+        )
+        db.add(page)
+        await db.commit()
+        return page
+
+    async def completed_pages(self, db: AsyncSession, job_id: int) -> Set[int]:
+        result = await db.execute(
+            select(PageResult.page_index).where(PageResult.job_id == job_id)
+        )
+        return set(result.scalars().all())
+
+    async def get_pages(self, db: AsyncSession, job_id: int) -> List[PageResult]:
+        result = await db.execute(
+            select(PageResult).where(PageResult.job_id == job_id).order_by(PageResult.page_index)
+        )
+        return result.scalars().all()
+
+    async def assemble_text(self, db: AsyncSession, job_id: int) -> str:
+        """Document text from the pages finished so far, in page order (form feed between pages)."""
+        result = await db.execute(
+            select(PageResult.text).where(PageResult.job_id == job_id).order_by(PageResult.page_index)
+        )
+        return "\f".join(text or "" for text in result.scalars().all())
@@ -1,9 +1,8 @@
-import io
+import asyncio
 import logging
 from typing import Any, Dict
 
-import numpy as np
-from PIL import Image
+from app.ml.preprocessing.ingest import Buffer
 
 logger = logging.getLogger(__name__)
 
@@ -15,13 +14,11 @@ class RecognitionService:
 
     def _get_pipeline(self):
         if self._pipeline is None:
-            from app.ml.inference.pipeline import BrailleInferencePipeline
-            self._pipeline = BrailleInferencePipeline()
+            from app.ml.inference.pipeline import BraillePipeline
+            self._pipeline = BraillePipeline()
         return self._pipeline
 
-    async def recognize_from_bytes(self, content: bytes) -> Dict[str, Any]:
-        image = Image.open(io.BytesIO(content)).convert("RGB")
-        arr = np.array(image)
+    async def recognize_from_bytes(self, content: Buffer) -> Dict[str, Any]:
+        # Decoded once, straight from the upload buffer, inside the pipeline's ingest layer
         pipeline = self._get_pipeline()
-        result = await pipeline.run_from_array(arr)
-        return result
\ No newline at end of file
+        return await asyncio.to_thread(pipeline.run_from_bytes, content)
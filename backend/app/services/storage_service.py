@@ -1,27 +1,139 @@
+import asyncio
+import hashlib
 import logging
 import os
 import shutil
 import uuid
-from typing import Tuple
+from typing import NamedTuple, Optional, Tuple
 
 from app.core.config import settings
+from app.core.exceptions import FileTooLargeError
 
 logger = logging.getLogger(__name__)
 
 
+class StoredFile(NamedTuple):
+    stored_filename: str
+    file_path: str
+    size: int
+    sha256: str
+    deduplicated: bool
+    # A deduplicated upload keeps its own copy here until release()
+    pending_path: Optional[str] = None
+
+
+def _extension(original_filename: str, default: str = "bin") -> str:
+    return original_filename.rsplit(".", 1)[-1].lower() if "." in original_filename else default
+
+
 class StorageService:
+    """
+    Uploads are stored content-addressed as <sha256>.<ext> under UPLOAD_DIR, so
+    identical files are written once and shared by every document that uses them.
+
+    A deduplicated upload must not rely on the shared file surviving until its
+    document row commits, since a concurrent delete of the last other document
+    may remove it. The upload keeps its temp copy until release(), which moves
+    the copy into place if the shared file has gone; deletes go through
+    detach()/restore() so a document committed meanwhile gets the file back.
+    """
+
     def __init__(self):
         os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
 
+    def _commit(self, tmp_path: str, digest: str, ext: str, size: int) -> StoredFile:
+        stored_name = f"{digest}.{ext}"
+        full_path = os.path.join(settings.UPLOAD_DIR, stored_name)
+        if os.path.exists(full_path):
+            logger.info(f"Deduplicated upload: {stored_name} ({size} bytes)")
+            return StoredFile(stored_name, full_path, size, digest, True, tmp_path)
+        # Same directory as the temp file, so the rename is atomic
+        os.replace(tmp_path, full_path)
+        logger.info(f"Saved file: {stored_name} ({size} bytes)")
+        return StoredFile(stored_name, full_path, size, digest, False)
+
+    async def save_stream(
+        self,
+        stream,
+        original_filename: str,
+        max_size: int = None,
+        chunk_size: int = None,
+    ) -> StoredFile:
+        """
+        Stream an upload (anything with an async read(n), e.g. UploadFile) to disk
+        in chunks, hashing as it goes. Raises FileTooLargeError as soon as more
+        than max_size bytes have arrived, so memory use is one chunk per upload.
+        File I/O runs on worker threads to keep the event loop free.
+        """
+        max_size = max_size or settings.MAX_FILE_SIZE
+        chunk_size = chunk_size or settings.UPLOAD_CHUNK_SIZE
+        tmp_path = os.path.join(settings.UPLOAD_DIR, f".{uuid.uuid4()}.part")
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            f = await asyncio.to_thread(open, tmp_path, "wb")
+            try:
+                while chunk := await stream.read(chunk_size):
+                    size += len(chunk)
+                    if size > max_size:
+                        raise FileTooLargeError(
+                            f"File size exceeds maximum allowed size ({max_size // (1024 * 1024)}MB)"
+                        )
+                    digest.update(chunk)
+                    await asyncio.to_thread(f.write, chunk)
+            finally:
+                await asyncio.to_thread(f.close)
+        except BaseException:
+            await asyncio.to_thread(self.delete_file, tmp_path)
+            raise
+        return await asyncio.to_thread(
+            self._commit, tmp_path, digest.hexdigest(), _extension(original_filename), size
+        )
+
     def save_file(self, content: bytes, original_filename: str) -> Tuple[str, str]:
         """Save bytes to disk. Returns (stored_filename, full_path)."""
-        ext = original_filename.rsplit(".", 1)[-1].lower() if "." in original_filename else "bin"
-        stored_name = f"{uuid.uuid4()}.{ext}"
-        full_path = os.path.join(settings.UPLOAD_DIR, stored_name)
-        with open(full_path, "wb") as f:
+        digest = hashlib.sha256(content).hexdigest()
+        tmp_path = os.path.join(settings.UPLOAD_DIR, f".{uuid.uuid4()}.part")
+        with open(tmp_path, "wb") as f:
             f.write(content)
-        logger.info(f"Saved file: {stored_name} ({len(content)} bytes)")
-        return stored_name, full_path
+        stored = self._commit(tmp_path, digest, _extension(original_filename), len(content))
+        self.release(stored)
+        return stored.stored_filename, stored.file_path
+
+    def release(self, stored: StoredFile) -> None:
+        """
+        Call once the document row pointing at stored.file_path has committed.
+        Drops a deduplicated upload's own copy, or moves it into place if a
+        concurrent delete removed the shared file in the meantime.
+        """
+        if stored.pending_path is None:
+            return
+        if os.path.exists(stored.file_path):
+            os.remove(stored.pending_path)
+        else:
+            os.replace(stored.pending_path, stored.file_path)
+            logger.warning(f"Restored {stored.file_path}, removed by a concurrent delete")
+
+    def discard(self, stored: StoredFile) -> None:
+        """Drop a deduplicated upload's own copy when its document was not saved."""
+        if stored.pending_path is not None:
+            self.delete_file(stored.pending_path)
+
+    def detach(self, file_path: str) -> Optional[str]:
+        """
+        Move a stored file aside ahead of deleting it; returns the new path, or
+        None if it was already gone. Uploads that commit afterwards restore it.
+        """
+        aside = os.path.join(os.path.dirname(file_path), f".{uuid.uuid4()}.deleted")
+        try:
+            os.rename(file_path, aside)
+        except FileNotFoundError:
+            return None
+        return aside
+
+    def restore(self, aside: str, file_path: str) -> None:
+        """Undo detach() because a document still uses the file."""
+        os.replace(aside, file_path)
 
     def delete_file(self, file_path: str) -> bool:
         if os.path.exists(file_path):
@@ -34,4 +146,4 @@ class StorageService:
         return os.path.exists(file_path)
 
     def get_file_size(self, file_path: str) -> int:
-        return os.path.getsize(file_path) if os.path.exists(file_path) else 0
\ No newline at end of file
+        return os.path.getsize(file_path) if os.path.exists(file_path) else 0
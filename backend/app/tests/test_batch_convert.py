@@ -0,0 +1,34 @@
+import json
+
+from app.ml.inference.batch_convert import collect_inputs, completed_pages
+from app.ml.inference.document_pipeline import JsonlPageWriter
+
+
+def test_inputs_from_directory_and_manifest(tmp_path):
+    (tmp_path / "scans" / "vol1").mkdir(parents=True)
+    for name in ("scans/a.png", "scans/vol1/b.PDF", "scans/notes.txt"):
+        (tmp_path / name).write_bytes(b"")
+    found = collect_inputs(str(tmp_path / "scans"))
+    assert [p.rsplit("/", 1)[-1] for p in found] == ["a.png", "b.PDF"]
+
+    manifest = tmp_path / "manifest.txt"
+    manifest.write_text("# backfill\nscans/a.png\n\n/abs/page.tif\n")
+    assert collect_inputs(str(manifest)) == [str(tmp_path / "scans/a.png"), "/abs/page.tif"]
+
+
+def test_resume_skips_written_pages_but_retries_failures(tmp_path):
+    output = tmp_path / "out.jsonl"
+    writer = JsonlPageWriter(str(output))
+    writer({"path": "a.pdf", "page_index": 0, "text": "x"})
+    writer({"path": "a.pdf", "page_index": 1, "error": "boom"})
+    writer.close()
+    with open(output, "a") as f:
+        f.write('{"path": "a.pdf", "page_')  # killed mid-write
+
+    assert completed_pages(str(output)) == {("a.pdf", 0)}
+
+    writer = JsonlPageWriter(str(output), append=True)
+    writer({"path": "a.pdf", "page_index": 1, "text": "y"})
+    writer.close()
+    assert completed_pages(str(output)) == {("a.pdf", 0), ("a.pdf", 1)}
+    assert json.loads(output.read_text().splitlines()[-1])["text"] == "y"
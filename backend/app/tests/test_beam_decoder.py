@@ -0,0 +1,56 @@
+import numpy as np
+
+from app.ml.inference.beam_decoder import BeamDecoder
+from app.ml.inference.postprocess import NUMBER_INDICATOR, PostProcessor
+from app.ml.nlp.char_lm import CharLanguageModel
+
+A, C, E, T, SPACE, CAPITAL = 0b000001, 0b001001, 0b010001, 0b011110, 0b000000, 0b100000
+
+
+def _cells(patterns):
+    return [{"box": [i * 20.0, 0.0, i * 20.0 + 15.0, 25.0], "pattern": p} for i, p in enumerate(patterns)]
+
+
+def _probs(rows):
+    probs = np.full((len(rows), 64), 1e-4, dtype=np.float32)
+    for i, row in enumerate(rows):
+        for pattern, p in row.items():
+            probs[i, pattern] = p
+    return probs / probs.sum(axis=1, keepdims=True)
+
+
+def _decoder(beam_width=4):
+    lm = CharLanguageModel.train([("cat", 100), ("ten", 50), ("act", 20)], order=3)
+    return BeamDecoder(lm=lm, beam_width=beam_width, top_k=3, lm_weight=1.0)
+
+
+def test_language_model_overrides_one_dot_confusion():
+    cells = _cells([C, E, T])
+    # "e" wins the argmax, but "a" (one dot away) is the runner-up
+    probs = _probs([{C: 0.9}, {E: 0.55, A: 0.4}, {T: 0.9}])
+    assert PostProcessor().decode(cells) == "cet"
+
+    text, patterns = _decoder().decode(cells, probs)
+    assert text == "cat"
+    assert patterns == [C, A, T]
+
+
+def test_confident_cells_decode_like_argmax_in_input_order():
+    sequence = [CAPITAL, C, A, T, SPACE, NUMBER_INDICATOR, A, C]
+    cells = _cells(sequence)
+    probs = _probs([{p: 0.99} for p in sequence])
+    shuffled = [7, 2, 0, 5, 1, 6, 3, 4]
+
+    text, patterns = _decoder().decode([cells[i] for i in shuffled], probs[shuffled])
+    assert text == PostProcessor().decode(cells) == "Cat 13"
+    assert patterns == [sequence[i] for i in shuffled]
+
+
+def test_load_beam_decoder_falls_back_without_language_model(monkeypatch):
+    from app.ml.inference import beam_decoder
+
+    def missing(*args, **kwargs):
+        raise ModuleNotFoundError("No module named 'symspellpy'")
+
+    monkeypatch.setattr(beam_decoder, "shared_char_lm", missing)
+    assert beam_decoder.load_beam_decoder() is None
@@ -41,4 +41,40 @@ def test_full_alphabet(service):
     braille_alphabet = "⠁⠃⠉⠙⠑⠋⠛⠓⠊⠚⠅⠇⠍⠝⠕⠏⠟⠗⠎⠞⠥⠧⠺⠭⠽⠵"
     result = service.translate_braille_to_text(braille_alphabet)
     assert result["confidence"] == 1.0
-    assert result["text"] == "abcdefghijklmnopqrstuvwxyz"
\ No newline at end of file
+    assert result["text"] == "abcdefghijklmnopqrstuvwxyz"
+
+
+def test_eight_dot_capitals_and_passthrough(service):
+    result = service.translate_braille_to_text("⡓⠑⠇⠇⠕ 1")
+    assert result["text"] == "Hello 1"
+    assert result["confidence"] == pytest.approx(5 / 7, abs=1e-4)
+
+
+def test_translate_many(service):
+    results = service.translate_many(["⠁⠉⠞", "", "⠠⠮"], grade=2)
+    assert [r["text"] for r in results] == ["act", "", "The"]
+    assert all(r["confidence"] == 1.0 for r in results)
+
+
+def test_grade2_confidence_counts_unread_cells(service):
+    # A trailing question mark (dots 236) is read; dots 4 inside a word is not
+    result = service.translate_braille_to_text("⠓⠊⠦⠀⠁⠈⠁", grade=2)
+    assert result["text"] == "hi? a?a"
+    assert result["confidence"] == pytest.approx(6 / 7, abs=1e-4)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("braille,grade,expected", [
+    ("⠁⠃⠉⠀⠙⠑⠋\n⠛", 1, "abc def\ng"),
+    ("⠁⠉⠞⠀⠮\n⠛", 2, "act the\ngo"),
+])
+async def test_translate_stream_across_chunk_boundaries(service, braille, grade, expected):
+    data = braille.encode("utf-8")
+
+    async def chunks():
+        # 2-byte chunks split every 3-byte UTF-8 character and every word
+        for i in range(0, len(data), 2):
+            yield data[i:i + 2]
+
+    out = [part async for part in service.translate_stream(chunks(), grade=grade)]
+    assert "".join(out) == expected
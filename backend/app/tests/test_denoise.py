@@ -0,0 +1,26 @@
+import numpy as np
+import pytest
+
+from app.ml.preprocessing.denoise import adaptive_denoise, estimate_noise_sigma, select_denoise_method
+
+
+@pytest.mark.parametrize("sigma", [2.0, 8.0, 20.0])
+def test_noise_estimate_tracks_gaussian_sigma(sigma):
+    rng = np.random.RandomState(0)
+    noisy = np.clip(128 + rng.randn(600, 800) * sigma, 0, 255).astype(np.uint8)
+    assert estimate_noise_sigma(noisy) == pytest.approx(sigma, rel=0.15)
+
+
+def test_clean_scan_skips_denoising():
+    image = np.full((200, 300, 3), 230, dtype=np.uint8)
+    image[50:60, 50:60] = 20
+    assert select_denoise_method(estimate_noise_sigma(image)) == "none"
+    assert adaptive_denoise(image) is image
+
+
+def test_noisy_scan_is_smoothed():
+    rng = np.random.RandomState(1)
+    noisy = np.clip(128 + rng.randn(200, 300) * 10, 0, 255).astype(np.uint8)
+    denoised = adaptive_denoise(noisy)
+    assert denoised.shape == noisy.shape
+    assert denoised.std() < noisy.std()
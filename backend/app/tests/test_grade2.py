@@ -0,0 +1,43 @@
+from app.ml.inference.grade2 import Grade2Decoder, cells
+from app.services.braille_service import BrailleService
+
+decoder = Grade2Decoder()
+
+
+def _decode(spec: str) -> str:
+    return decoder.decode_patterns(cells(spec))
+
+
+def test_wordsigns_shortforms_and_strong_contractions():
+    # "The child said that he would rather go out with them, and the people were quite happy."
+    spec = (
+        "6-2346-0-16-0-234-145-0-2345-0-125-15-0-2456-145-0-1235-0-1245-0-1256-0-23456-0-"
+        "2346-134-2-0-12346-0-2346-0-1234-0-2356-0-12345-0-125-1-1234-1234-13456-256"
+    )
+    assert _decode(spec) == (
+        "The child said that he would rather go out with them, and the people were quite happy."
+    )
+
+
+def test_position_dependent_signs():
+    assert _decode("23-14-135-134-15") == "become"        # 23 = be at the start
+    assert _decode("1-23-15-34") == "abbest"              # 23 = bb in the middle
+    assert _decode("1345-135-256") == "no."               # 256 = period at the end
+    assert _decode("256-14-135-1236-12456") == "discover"  # 256 = dis at the start
+    assert _decode("5-234-5-135") == "someone"            # initial-letter contractions
+    assert _decode("13-35-145-56-234") == "kindness"      # final-letter groupsign
+    assert _decode("34-1-56-1345") == "station"
+
+
+def test_indicators():
+    assert _decode("3456-1-12-14") == "123"
+    assert _decode("6-6-2346") == "THE"
+    assert _decode("56-12") == "b"                        # grade 1 letter, not "but"
+    assert _decode("12-0-12") == "but but"
+
+
+def test_translate_grade2_unicode():
+    result = BrailleService().translate_braille_to_text("⠠⠮⠀⠉⠁⠞", grade=2)
+    assert result["text"] == "The cat"
+    assert result["grade"] == 2
+    assert result["confidence"] == 1.0
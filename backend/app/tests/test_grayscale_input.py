@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+import torch
+
+from app.ml.export.export_torchscript import export_torchscript
+from app.ml.export.quantize_static import generate_calibration_cells
+from app.ml.inference.braille_classifier import BrailleClassifier, preprocess_cells
+from app.ml.inference.dot_detector_cnn import DotDetectorCNNModel, DotDetectorInference
+from app.ml.inference.model_loader import (
+    InferenceBackend,
+    build_classifier_arch,
+    clear_model_cache,
+    input_channels,
+    load_torchscript_module,
+)
+
+
+@pytest.mark.parametrize("arch", ["resnet18", "mobilenet_v3_small", "tiny"])
+def test_single_channel_classifiers(arch):
+    model = build_classifier_arch(arch, num_classes=64, in_channels=1).eval()
+    assert input_channels(model) == 1
+    with torch.no_grad():
+        assert model(torch.randn(2, 1, 32, 32)).shape == (2, 64)
+
+
+def test_gray_preprocessing_matches_rgb_layout():
+    cells, _ = generate_calibration_cells(num_samples=4)
+    gray = preprocess_cells(cells, in_channels=1)
+    rgb = preprocess_cells(cells)
+    assert gray.shape == (4, 1, 32, 32) and rgb.shape == (4, 3, 32, 32)
+    assert gray.dtype == np.float32
+    assert -1.0 <= gray.min() and gray.max() <= 1.0
+
+
+def test_serving_infers_channels_from_artefacts(tmp_path, monkeypatch):
+    torch.manual_seed(0)
+    weights = str(tmp_path / "classifier.pt")
+    torch.save(build_classifier_arch("resnet18", 64, in_channels=1).state_dict(), weights)
+    monkeypatch.setattr("app.core.config.settings.CLASSIFIER_ARCH", "resnet18")
+    monkeypatch.setattr("app.core.config.settings.CLASSIFIER_MODEL_PATH", weights)
+    clear_model_cache()
+
+    classifier = BrailleClassifier(backend="pytorch")
+    assert classifier.in_channels == 1
+    cells, _ = generate_calibration_cells(num_samples=3)
+    assert len(classifier.classify_batch(cells)) == 3
+
+    dot_path = str(tmp_path / "dot_ts.pt")
+    export_torchscript(DotDetectorCNNModel(in_channels=1).eval(), dot_path, cell_size=32, in_channels=1)
+    assert input_channels(load_torchscript_module(dot_path, optimize=True)) == 1
+
+    monkeypatch.setattr("app.core.config.settings.DOT_DETECTOR_TORCHSCRIPT_PATH", dot_path)
+    detector = DotDetectorInference(backend="torchscript")
+    assert detector.backend == InferenceBackend.TORCHSCRIPT
+    assert detector.in_channels == 1
+    assert len(detector.predict(cells)) == 3
+    clear_model_cache()
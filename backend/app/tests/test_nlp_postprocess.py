@@ -0,0 +1,86 @@
+import pytest
+
+from app.ml.nlp.nlp_postprocess import NLPPostProcessor
+
+
+@pytest.fixture
+def processor():
+    symspellpy = pytest.importorskip("symspellpy")
+    processor = NLPPostProcessor(cache_size=16)
+    symspell = symspellpy.SymSpell(max_dictionary_edit_distance=2, prefix_length=7)
+    for term, count in [("the", 1000), ("cat", 200), ("sat", 150), ("mat", 100)]:
+        symspell.create_dictionary_entry(term, count)
+    processor.symspell = symspell
+    processor._Verbosity = symspellpy.Verbosity
+    return processor
+
+
+def test_correction_uses_word_cache(processor):
+    text, confidence = processor.correct("Teh cat sat on teh mat.")
+    assert text == "The cat sat on the mat."
+    assert confidence < 1.0
+    stats = processor.cache_stats()
+    # "teh" is looked up twice but only computed once
+    assert stats["hits"] == 1
+    assert stats["misses"] == stats["size"]
+
+    assert processor.correct("Teh cat sat on teh mat.")[0] == text
+    assert processor.cache_stats()["misses"] == stats["misses"]
+
+
+def test_punctuation_only_words_are_kept(processor):
+    text, _ = processor.correct("cat -- (teh) 42")
+    assert text == "Cat -- (the) 42"
+
+
+def test_mapped_index_matches_in_memory_symspell(tmp_path):
+    symspellpy = pytest.importorskip("symspellpy")
+    from app.ml.nlp.symspell_index import build_index, index_is_current, load_index
+
+    dictionary = tmp_path / "dict.txt"
+    dictionary.write_text("the 1000\ncat 200\nsat 150\nmat 100\nbraille 80\nbrine 5\na 900\n")
+    index_dir = str(tmp_path / "index")
+    build_index(index_dir, str(dictionary))
+    assert index_is_current(index_dir, str(dictionary), 2, 7)
+    assert not index_is_current(index_dir, str(dictionary), 1, 7)
+
+    mapped = load_index(index_dir)
+    reference = symspellpy.SymSpell(max_dictionary_edit_distance=2, prefix_length=7)
+    reference.load_dictionary(str(dictionary), term_index=0, count_index=1)
+    assert mapped.word_count == reference.word_count
+    for word in ["teh", "brail", "bralle", "mat", "x", "zzzzzz", ""]:
+        for verbosity in (symspellpy.Verbosity.CLOSEST, symspellpy.Verbosity.ALL):
+            got = [(s.term, s.distance, s.count) for s in mapped.lookup(word, verbosity, 2)]
+            want = [(s.term, s.distance, s.count) for s in reference.lookup(word, verbosity, 2)]
+            assert got == want
+
+
+def test_correct_batch_matches_per_text_correction(processor):
+    texts = ["Teh cat sat.", "", "teh mat, teh cat!", "   ", "42 -- (sat)"]
+    expected = [NLPPostProcessor.correct(processor, t) for t in texts]
+    processor._lookup_cached.cache_clear()
+
+    assert processor.correct_batch(texts, workers=1) == expected
+    # Four distinct words across the batch, each looked up once
+    assert processor.cache_stats()["misses"] == 4
+
+
+def test_concurrent_cold_start_builds_index_once(tmp_path, monkeypatch):
+    pytest.importorskip("symspellpy")
+    from concurrent.futures import ThreadPoolExecutor
+
+    from app.ml.nlp import symspell_index
+
+    dictionary = tmp_path / "dict.txt"
+    dictionary.write_text("the 1000\ncat 200\nsat 150\n")
+    index_dir = str(tmp_path / "index")
+    builds = []
+    build = symspell_index._build_index
+    monkeypatch.setattr(symspell_index, "_build_index", lambda *args: builds.append(args) or build(*args))
+
+    # flock locks separate open files even within one process, so threads race like workers
+    load = symspell_index.shared_symspell.__wrapped__
+    with ThreadPoolExecutor(4) as pool:
+        loaded = list(pool.map(lambda _: load(index_dir, str(dictionary)), range(4)))
+    assert len(builds) == 1
+    assert all(s.word_count == 3 for s in loaded)
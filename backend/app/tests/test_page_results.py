@@ -0,0 +1,19 @@
+import pytest
+
+from app.services.page_result_service import decode_cells, encode_cells
+
+
+def test_cell_geometry_round_trip():
+    cells = [
+        {"box": [10.0 + i, 20.0, 30.5 + i, 44.25], "pattern": i % 64, "confidence": 0.5 + i / 400, "character": "a"}
+        for i in range(150)
+    ]
+    blob = encode_cells(cells)
+    assert len(blob) < 150 * 11
+
+    decoded = decode_cells(blob)
+    assert len(decoded) == 150
+    assert decoded[7]["box"] == cells[7]["box"]
+    assert decoded[7]["pattern"] == 7
+    assert decoded[7]["confidence"] == pytest.approx(cells[7]["confidence"], abs=1e-3)
+    assert encode_cells([]) is None and decode_cells(None) == []
@@ -0,0 +1,238 @@
+import cv2
+import numpy as np
+import pytest
+
+from app.ml.preprocessing import (
+    binarize_image,
+    correct_perspective,
+    decode_file,
+    decode_image,
+    denoise_image,
+    resize_image,
+    to_gray,
+    unwarp_image,
+)
+from app.ml.preprocessing.binarize import _sauvola_threshold
+from app.ml.preprocessing.ingest import iter_pages, page_count
+from app.ml.preprocessing.denoise import enhance_contrast
+from app.ml.preprocessing.resize import estimate_dot_pitch, normalize_resolution
+from app.ml.preprocessing.unwarp import build_unwarp_maps
+
+
+def _gray_page() -> np.ndarray:
+    rng = np.random.RandomState(0)
+    page = np.full((240, 320), 220, dtype=np.uint8)
+    for y in range(20, 220, 24):
+        for x in range(20, 300, 16):
+            if rng.rand() > 0.5:
+                cv2.circle(page, (x, y), 3, 40, -1)
+    return page
+
+
+def test_to_gray_returns_gray_input_unchanged():
+    gray = _gray_page()
+    assert to_gray(gray) is gray
+    bgr = cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR)
+    np.testing.assert_array_equal(to_gray(bgr), gray)
+
+
+@pytest.mark.parametrize("stage", [
+    correct_perspective,
+    lambda img: denoise_image(img, method="auto"),
+    lambda img: denoise_image(img, method="bilateral"),
+    enhance_contrast,
+    binarize_image,
+    resize_image,
+    unwarp_image,
+])
+def test_stages_keep_single_channel_uint8(stage):
+    out = stage(_gray_page())
+    assert out.ndim == 2
+    assert out.dtype == np.uint8
+
+
+def _braille_page(dpi: int) -> np.ndarray:
+    """A4-width strip of random cells with standard 2.5 mm dot and 6.2 mm cell pitch."""
+    rng = np.random.RandomState(1)
+    px_per_mm = dpi / 25.4
+    page = np.full((int(80 * px_per_mm), int(150 * px_per_mm)), 235, dtype=np.uint8)
+    for line in range(6):
+        for col in range(22):
+            pattern = rng.randint(1, 64)
+            for bit in range(6):
+                if pattern >> bit & 1:
+                    x = (10 + col * 6.2 + (bit // 3) * 2.5) * px_per_mm
+                    y = (10 + line * 10 + (bit % 3) * 2.5) * px_per_mm
+                    cv2.circle(page, (int(x), int(y)), int(0.75 * px_per_mm), 50, -1)
+    return page
+
+
+@pytest.mark.parametrize("dpi", [150, 300, 600])
+def test_dot_pitch_estimate_and_normalisation(dpi):
+    page = _braille_page(dpi)
+    expected_pitch = 2.5 * dpi / 25.4
+    assert estimate_dot_pitch(page) == pytest.approx(expected_pitch, rel=0.1)
+
+    normalized, scale, pitch = normalize_resolution(page, target_pitch=10.0)
+    assert scale == pytest.approx(10.0 / expected_pitch, rel=0.1)
+    assert pitch == pytest.approx(10.0, rel=0.1)
+    assert estimate_dot_pitch(normalized) == pytest.approx(10.0, rel=0.15)
+
+
+def test_blank_page_keeps_native_resolution():
+    page = np.full((300, 400), 230, dtype=np.uint8)
+    assert estimate_dot_pitch(page) is None
+    normalized, scale, pitch = normalize_resolution(page)
+    assert normalized is page and scale == 1.0 and pitch is None
+
+
+def test_perspective_skips_warp_for_rectified_pages():
+    page = _gray_page()
+    assert correct_perspective(page) is page
+
+    photo = np.full((600, 500), 30, dtype=np.uint8)
+    photo[100:340, 90:410] = page
+    cropped = correct_perspective(photo, max_side=256)
+    assert np.shares_memory(cropped, photo)
+    assert abs(cropped.shape[0] - 240) <= 3 and abs(cropped.shape[1] - 320) <= 3
+
+
+def test_perspective_warps_skewed_page():
+    page = _gray_page()
+    src = np.float32([[0, 0], [319, 0], [319, 239], [0, 239]])
+    dst = np.float32([[120, 80], [440, 110], [430, 360], [100, 330]])
+    photo = cv2.warpPerspective(
+        page, cv2.getPerspectiveTransform(src, dst), (560, 440), borderValue=30
+    )
+    warped = correct_perspective(photo, max_side=256)
+    assert not np.shares_memory(warped, photo)
+    assert warped.shape[1] > warped.shape[0]
+
+
+def test_unwarp_maps_match_row_loop():
+    h, w = 300, 200
+    coeffs = np.array([1e-3, -0.2, 140.0])
+    expected = np.tile(np.arange(h, dtype=np.float32)[:, None], (1, w))
+    correction = h / 2.0 - np.polyval(coeffs, np.arange(w, dtype=np.float32))
+    for row in range(h):
+        expected[row] += correction * np.sin(np.pi * row / h)
+
+    map_x, map_y = build_unwarp_maps(h, w, coeffs)
+    np.testing.assert_allclose(map_y, expected, atol=1e-3)
+    np.testing.assert_array_equal(map_x[7], np.arange(w))
+
+    _, coarse = build_unwarp_maps(h, w, coeffs, step=4)
+    assert np.abs(coarse - expected).max() < 0.5
+
+
+def test_sauvola_matches_float64_reference_and_tiles_seamlessly():
+    rng = np.random.RandomState(2)
+    page = cv2.GaussianBlur(rng.randint(0, 256, (300, 260)).astype(np.uint8), (0, 0), 2)
+    page = (page * np.linspace(0.5, 1.0, 260)[None, :]).astype(np.uint8)
+
+    gray_f = page.astype(np.float64)
+    mean = cv2.boxFilter(gray_f, -1, (25, 25))
+    std = np.sqrt(np.maximum(cv2.boxFilter(gray_f ** 2, -1, (25, 25)) - mean ** 2, 0))
+    expected = np.where(gray_f < mean * (1 + 0.2 * (std / 128.0 - 1)), 255, 0).astype(np.uint8)
+
+    whole = _sauvola_threshold(page, tile_rows=0)
+    assert (whole == expected).mean() > 0.999
+    np.testing.assert_array_equal(_sauvola_threshold(page, tile_rows=64), whole)
+
+
+@pytest.mark.parametrize("dpi", [150, 300, 600])
+def test_fallback_cell_count_is_independent_of_dpi(dpi):
+    from app.ml.inference.braille_detector import BrailleDetector
+
+    detector = BrailleDetector.__new__(BrailleDetector)
+    page, scale, pitch = normalize_resolution(_braille_page(dpi))
+    boxes = detector._detect_fallback(page, binarize_image(page), dot_pitch=pitch)
+    # 6 lines x 22 cells; cells whose dots are two rows apart may split in two
+    assert 132 <= len(boxes) <= 165
+
+
+@pytest.mark.parametrize(
+    "stage",
+    [
+        lambda img: denoise_image(img, method="bilateral"),
+        lambda img: denoise_image(img, method="nlmeans"),
+        lambda img: binarize_image(img, method="adaptive"),
+        lambda img: binarize_image(img, method="sauvola"),
+    ],
+)
+def test_tiled_filters_match_whole_page(stage, monkeypatch):
+    page = _gray_page()
+    monkeypatch.setattr("app.core.config.settings.PREPROCESS_WORKERS", 1)
+    whole = stage(page)
+    monkeypatch.setattr("app.core.config.settings.PREPROCESS_WORKERS", 3)
+    monkeypatch.setattr("app.core.config.settings.PREPROCESS_TILE_SIZE", 64)
+    np.testing.assert_array_equal(stage(page), whole)
+
+
+def test_tiled_clahe_matches_whole_page(monkeypatch):
+    page = _gray_page()[:, :317]
+    monkeypatch.setattr("app.core.config.settings.PREPROCESS_WORKERS", 3)
+    monkeypatch.setattr("app.core.config.settings.PREPROCESS_TILE_SIZE", 64)
+    expected = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8, 8)).apply(page)
+    diff = np.abs(enhance_contrast(page).astype(int) - expected)
+    assert diff.max() <= 1
+
+
+def test_ingest_decodes_once_with_reduced_jpeg(tmp_path):
+    page = cv2.resize(_gray_page(), (5000, 600), interpolation=cv2.INTER_NEAREST)
+    jpeg = cv2.imencode(".jpg", page)[1].tobytes()
+
+    image, scale = decode_image(memoryview(jpeg), max_side=2400)
+    assert image.shape == (300, 2500) and scale == pytest.approx(0.5)
+
+    path = tmp_path / "page.jpg"
+    path.write_bytes(jpeg)
+    from_file, file_scale = decode_file(str(path), max_side=2400)
+    np.testing.assert_array_equal(from_file, image)
+    assert file_scale == scale
+
+    png = cv2.imencode(".png", page)[1].tobytes()
+    full, png_scale = decode_image(png, max_side=2400)
+    assert full.shape == page.shape and png_scale == 1.0
+    with pytest.raises(ValueError):
+        decode_image(b"not an image")
+    bad = tmp_path / "bad.jpg"
+    bad.write_bytes(b"not an image")
+    with pytest.raises(ValueError, match="Cannot read image"):
+        decode_file(str(bad))
+
+
+def test_reduced_jpeg_scale_ignores_exif_rotation():
+    import io
+    from PIL import Image
+
+    exif = Image.Exif()
+    exif[0x0112] = 6  # rotate 90 degrees clockwise on display
+    buf = io.BytesIO()
+    Image.fromarray(np.full((600, 5000), 200, dtype=np.uint8)).save(buf, "JPEG", exif=exif)
+
+    image, scale = decode_image(buf.getvalue(), max_side=1200)
+    assert image.shape == (1250, 150) and scale == pytest.approx(0.25)
+
+
+def test_multipage_documents_are_read_lazily(tmp_path):
+    pymupdf = pytest.importorskip("pymupdf")
+    page = _gray_page()
+
+    tiff = str(tmp_path / "book.tiff")
+    cv2.imwritemulti(tiff, [page, 255 - page, page])
+    assert page_count(tiff) == 3
+    frames = list(iter_pages(tiff))
+    assert [i for i, _, _ in frames] == [0, 1, 2]
+    np.testing.assert_array_equal(frames[1][1], 255 - page)
+
+    pdf = str(tmp_path / "book.pdf")
+    doc = pymupdf.open()
+    for _ in range(2):
+        # 320x240 px placed on a page sized for 100 dpi
+        pdf_page = doc.new_page(width=320 * 72 / 100, height=240 * 72 / 100)
+        pdf_page.insert_image(pdf_page.rect, stream=cv2.imencode(".png", page)[1].tobytes())
+    doc.save(pdf)
+    assert page_count(pdf) == 2
+    rendered = [image for _, image, _ in iter_pages(pdf, dpi=200)]
+    assert len(rendered) == 2 and rendered[0].shape == (480, 640)
@@ -0,0 +1,39 @@
+import pytest
+import torch
+
+from app.ml.export.prune_channels import count_flops, default_weights_path, prune_model, run_pruning
+from app.ml.inference.model_loader import build_classifier_arch
+
+
+def test_pruning_shrinks_resnet_and_keeps_output_shape():
+    model = build_classifier_arch("resnet18").eval()
+    flops_before = count_flops(model)
+
+    removed = prune_model(model, ratio=0.5)
+
+    assert removed > 0
+    assert count_flops(model) < flops_before
+    with torch.no_grad():
+        assert model(torch.randn(2, 3, 32, 32)).shape == (2, 64)
+
+
+def test_pruning_sequential_classifier_preserves_kept_channels():
+    torch.manual_seed(0)
+    model = build_classifier_arch("tiny").eval()
+    first_conv = model.features[0]
+    norms = first_conv.weight.detach().abs().sum(dim=(1, 2, 3))
+    expected = torch.sort(torch.argsort(norms, descending=True)[:12]).values
+
+    prune_model(model, ratio=0.25)
+
+    assert model.features[0].out_channels == 12
+    assert torch.equal(model.features[0].weight, first_conv.weight[expected])
+    assert model.features[3].in_channels == 12
+    with torch.no_grad():
+        assert model(torch.randn(2, 3, 32, 32)).shape == (2, 64)
+
+
+def test_run_pruning_resolves_weights_per_arch_and_rejects_mobilenet(tmp_path):
+    assert default_weights_path("tiny").endswith("classifier_tiny_best.pt")
+    with pytest.raises(ValueError, match="mobilenet_v3_small"):
+        run_pruning("mobilenet_v3_small", output_dir=str(tmp_path))
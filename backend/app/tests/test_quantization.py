@@ -0,0 +1,64 @@
+import numpy as np
+import torch
+
+from app.ml.export.quantize_static import (
+    generate_calibration_cells,
+    quantize_classifier_static,
+    quantize_dot_detector_static,
+)
+from app.ml.inference.braille_classifier import BrailleClassifier
+from app.ml.inference.dot_detector_cnn import DotDetectorInference, preprocess_dot_cells
+from app.ml.inference.model_loader import InferenceBackend, clear_model_cache
+
+
+def test_calibration_cells_are_class_balanced():
+    cells, patterns = generate_calibration_cells(num_samples=128, cell_size=32)
+    assert len(cells) == 128
+    assert cells[0].shape == (32, 32)
+    assert np.bincount(patterns, minlength=64).tolist() == [2] * 64
+
+
+def test_static_quantized_dot_detector_is_loadable(tmp_path, monkeypatch):
+    output_path = str(tmp_path / "dot_detector_quantized.pt")
+    quantize_dot_detector_static(
+        weights_path=str(tmp_path / "missing.pt"),
+        output_path=output_path,
+        num_calibration_samples=64,
+    )
+
+    model = torch.jit.load(output_path)
+    cells, _ = generate_calibration_cells(num_samples=4)
+    with torch.no_grad():
+        logits = model(torch.from_numpy(preprocess_dot_cells(cells)))
+    assert logits.shape == (4, 6)
+    assert torch.isfinite(logits).all()
+
+    monkeypatch.setattr("app.core.config.settings.DOT_DETECTOR_QUANTIZED_PATH", output_path)
+    detector = DotDetectorInference(backend="pytorch-int8")
+    results = detector.predict(cells)
+    assert len(results) == 4
+    assert all(0 <= pattern < 64 for pattern, _ in results)
+
+
+def test_classifier_backend_loads_int8_and_falls_back(tmp_path, monkeypatch):
+    monkeypatch.setattr("app.core.config.settings.CLASSIFIER_MODEL_PATH", str(tmp_path / "missing.pt"))
+    monkeypatch.setattr("app.core.config.settings.CLASSIFIER_QUANTIZED_PATH", str(tmp_path / "int8.pt"))
+    clear_model_cache()
+
+    classifier = BrailleClassifier(backend="pytorch-int8")
+    assert classifier.backend == InferenceBackend.PYTORCH
+
+    quantize_classifier_static(
+        weights_path=str(tmp_path / "missing.pt"),
+        output_path=str(tmp_path / "int8.pt"),
+        num_calibration_samples=64,
+    )
+    clear_model_cache()
+    classifier = BrailleClassifier(backend="pytorch-int8")
+    assert classifier.backend == InferenceBackend.PYTORCH_INT8
+
+    cells, _ = generate_calibration_cells(num_samples=3)
+    results = classifier.classify_batch(cells)
+    assert len(results) == 3
+    assert all(0 <= r["pattern"] < 64 for r in results)
+    clear_model_cache()
@@ -0,0 +1,48 @@
+import os
+
+import torch
+
+from app.ml.export.promote_model import promote_classifier
+from app.ml.inference.cell_classifier_cnn import TinyCellClassifier
+from app.ml.inference.model_loader import (
+    build_classifier_arch,
+    clear_model_cache,
+    load_pytorch_classifier,
+    resolve_serving_classifier,
+)
+
+
+def _save_weights(arch, path):
+    torch.save(build_classifier_arch(arch).state_dict(), path)
+    return str(path)
+
+
+def test_promotion_is_gated_on_accuracy_drop(tmp_path, monkeypatch):
+    manifest = str(tmp_path / "serving_model.json")
+    monkeypatch.setattr("app.core.config.settings.SERVING_MANIFEST_PATH", manifest)
+    monkeypatch.setattr("app.core.config.settings.CLASSIFIER_ARCH", "auto")
+    teacher = _save_weights("resnet18", tmp_path / "teacher.pt")
+    student = _save_weights("tiny", tmp_path / "tiny.pt")
+
+    report = promote_classifier(
+        "tiny", student, teacher_path=teacher, max_accuracy_drop=-1.0,
+        num_eval_samples=64, manifest_path=manifest,
+    )
+    assert not report["promoted"]
+    assert not os.path.exists(manifest)
+    assert resolve_serving_classifier()["arch"] == "resnet18"
+
+    report = promote_classifier(
+        "tiny", student, teacher_path=teacher, max_accuracy_drop=1.0,
+        num_eval_samples=64, manifest_path=manifest,
+    )
+    assert report["promoted"]
+    serving = resolve_serving_classifier()
+    assert serving["arch"] == "tiny"
+    assert serving["weights_path"] == student
+
+    clear_model_cache()
+    model = load_pytorch_classifier(torch.device("cpu"))
+    assert isinstance(model, TinyCellClassifier)
+    assert model(torch.randn(2, 3, 32, 32)).shape == (2, 64)
+    clear_model_cache()
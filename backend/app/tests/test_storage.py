@@ -0,0 +1,54 @@
+import io
+import os
+import hashlib
+
+import pytest
+from starlette.datastructures import UploadFile
+
+from app.core.exceptions import FileTooLargeError
+from app.services.storage_service import StorageService
+
+
+@pytest.fixture
+def storage(tmp_path, monkeypatch):
+    monkeypatch.setattr("app.core.config.settings.UPLOAD_DIR", str(tmp_path))
+    return StorageService()
+
+
+@pytest.mark.asyncio
+async def test_stream_upload_is_hashed_and_deduplicated(storage, tmp_path):
+    content = os.urandom(300_000)
+    first = await storage.save_stream(UploadFile(io.BytesIO(content), filename="page.jpg"), "page.jpg", chunk_size=65536)
+    assert first.sha256 == hashlib.sha256(content).hexdigest()
+    assert first.size == len(content) and not first.deduplicated
+    with open(first.file_path, "rb") as f:
+        assert f.read() == content
+
+    again = await storage.save_stream(UploadFile(io.BytesIO(content), filename="copy.jpg"), "copy.jpg")
+    assert again.deduplicated and again.file_path == first.file_path
+    storage.release(again)
+    assert sorted(os.listdir(tmp_path)) == [first.stored_filename]
+
+
+@pytest.mark.asyncio
+async def test_stream_upload_rejected_past_limit(storage, tmp_path):
+    upload = UploadFile(io.BytesIO(b"x" * 5000), filename="big.png")
+    with pytest.raises(FileTooLargeError):
+        await storage.save_stream(upload, "big.png", max_size=4096, chunk_size=1024)
+    assert os.listdir(tmp_path) == []
+
+
+@pytest.mark.asyncio
+async def test_deduplicated_upload_survives_concurrent_delete(storage, tmp_path):
+    content = os.urandom(10_000)
+    first = await storage.save_stream(UploadFile(io.BytesIO(content), filename="a.png"), "a.png")
+    again = await storage.save_stream(UploadFile(io.BytesIO(content), filename="b.png"), "b.png")
+    assert again.deduplicated and os.path.exists(again.pending_path)
+
+    # The last other document is deleted before the new document row commits
+    aside = storage.detach(first.file_path)
+    storage.delete_file(aside)
+    storage.release(again)
+    with open(again.file_path, "rb") as f:
+        assert f.read() == content
+    assert sorted(os.listdir(tmp_path)) == [first.stored_filename]
@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+import torch
+
+from app.ml.export.export_torchscript import export_torchscript
+from app.ml.inference.cell_classifier_cnn import build_mobilenet_classifier
+from app.ml.inference.dot_detector_cnn import DotDetectorCNNModel, DotDetectorInference
+from app.ml.inference.model_loader import InferenceBackend, _build_classifier_arch, clear_model_cache
+
+
+@pytest.mark.parametrize("builder", [DotDetectorCNNModel, _build_classifier_arch, build_mobilenet_classifier])
+def test_torchscript_matches_eager(builder, tmp_path):
+    torch.manual_seed(0)
+    model = builder().eval()
+    path = export_torchscript(model, str(tmp_path / "model.pt"), cell_size=32)
+
+    scripted = torch.jit.optimize_for_inference(torch.jit.load(path))
+    batch = torch.randn(8, 3, 32, 32)
+    with torch.no_grad():
+        np.testing.assert_allclose(scripted(batch).numpy(), model(batch).numpy(), atol=1e-4)
+
+
+def test_dot_detector_torchscript_backend_matches_eager(tmp_path, monkeypatch):
+    torch.manual_seed(0)
+    weights = str(tmp_path / "dot.pt")
+    torch.save(DotDetectorCNNModel().state_dict(), weights)
+    scripted_path = str(tmp_path / "dot_ts.pt")
+    monkeypatch.setattr("app.core.config.settings.DOT_DETECTOR_TORCHSCRIPT_PATH", scripted_path)
+    clear_model_cache()
+
+    eager = DotDetectorInference(model_path=weights, backend="pytorch")
+    export_torchscript(eager.model, scripted_path, cell_size=32)
+    scripted = DotDetectorInference(model_path=weights, backend="torchscript")
+    assert scripted.backend == InferenceBackend.TORCHSCRIPT
+
+    cells = [np.random.randint(0, 255, (32, 32), dtype=np.uint8) for _ in range(5)]
+    assert scripted.predict(cells) == eager.predict(cells)
+    clear_model_cache()
@@ -85,12 +85,26 @@ logger.info("✅ Step 6 Done!")
 
 # ── STEP 7: Quantize Models ───────────────────────────────────────────────
 logger.info("\n🔵 Step 7: Quantizing Models...")
-from app.ml.export.quantize_dynamic import quantize_classifier
-quantize_classifier(
+from app.ml.export.quantize_static import (
+    quantize_classifier_static,
+    quantize_dot_detector_static,
+    quantize_onnx_static,
+    evaluate_static_quantization,
+)
+quantize_classifier_static(
     weights_path="app/ml/artifacts/classifier_best.pt",
     output_path="app/ml/artifacts/classifier_quantized.pt",
     num_classes=256,
 )
+quantize_dot_detector_static(
+    weights_path="app/ml/artifacts/dot_detector_best.pt",
+    output_path="app/ml/artifacts/dot_detector_quantized.pt",
+)
+quantize_onnx_static(
+    onnx_path="app/ml/artifacts/classifier.onnx",
+    output_path="app/ml/artifacts/classifier_int8.onnx",
+)
+evaluate_static_quantization(num_classes=256)
 logger.info("✅ Step 7 Done!")
 
 # ── STEP 8: Evaluate Pipeline ─────────────────────────────────────────────